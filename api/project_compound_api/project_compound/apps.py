@@ -1,5 +1,11 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class ProjectCompoundConfig(AppConfig):
     name = 'project_compound'
+
+    def ready(self):
+        from .tracing import install_query_recorder
+
+        connection_created.connect(install_query_recorder, dispatch_uid='project_compound.tracing')
@@ -0,0 +1,315 @@
+"""Synthetic data, workloads and an HTTP load driver for benchmarking the API.
+
+``make_rows`` generates drug-like compounds: valid SMILES of realistic length
+(roughly 15 to 130 characters, most around 50) and properties that are null
+about as often as in assay exports. Workloads turn a project into a list of
+HTTP requests; ``run_load`` replays them from concurrent clients and reports
+latency percentiles, throughput, SQL queries per request and peak RSS.
+"""
+import dataclasses
+import http.client
+import json
+import math
+import random
+import resource
+import threading
+import time
+from contextlib import contextmanager
+from typing import NamedTuple
+from urllib.parse import urlsplit
+
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.db import connection
+
+from .ingest import insert_batch
+from .models import Project, Compound
+from .pagination import encode_cursor
+from .schema_compound import CompoundInput
+from .stats import recompute_project_stats
+
+# Fragments are joined end to end: the attachment atom of a start fragment is
+# its last atom, of an end fragment its first, and linkers have both.
+START_FRAGMENTS = [
+    'C', 'CC', 'Cl', 'N#C', 'FC(F)(F)', 'O=C(O)', 'CN(C)', 'C1CC1', 'COc1ccc(cc1)', 'c1ccc(cc1)', 'O=C1CCCN1'
+]
+LINKERS = [
+    'C', 'CC', 'O', 'N', 'C(=O)', 'C(=O)N', 'NC(=O)', 'S(=O)(=O)', 'C(C)', 'C(O)', 'N(C)',
+    'c1ccc(cc1)', 'c1ccc(nc1)', 'c1cc(ccc1F)', 'C1CCN(CC1)', 'C1CCC(CC1)'
+]
+END_FRAGMENTS = [
+    'C', 'CC', 'Cl', 'F', 'O', 'N', 'C#N', 'C(F)(F)F', 'C(=O)O', 'C(=O)N', 'c1ccccc1', 'c1ccncc1',
+    'C1CC1', 'N1CCOCC1', 'N(C)C'
+]
+MAX_LINKERS = 10
+NULL_RATES = {'mw': 0.02, 'logD': 0.25, 'logP': 0.08}
+
+SEED_BATCH_SIZE = 10000
+PAGE_SIZE = 100
+INSERT_ROWS = 100
+
+
+def make_smiles(rng: random.Random) -> str:
+    linkers = min(max(round(rng.gauss(5, 2.5)), 1), MAX_LINKERS)
+    return ''.join([rng.choice(START_FRAGMENTS), *rng.choices(LINKERS, k=linkers), rng.choice(END_FRAGMENTS)])
+
+
+def make_rows(count: int, seed: int = 0) -> list[CompoundInput]:
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        smiles = make_smiles(rng)
+        log_p = rng.gauss(2.5, 1.5)
+        values = {
+            'mw': round(len(smiles) * 7.2 + rng.gauss(0, 25), 2),
+            'logD': round(log_p - abs(rng.gauss(0.8, 0.6)), 2),
+            'logP': round(log_p, 2),
+        }
+        for name, rate in NULL_RATES.items():
+            if rng.random() < rate:
+                values[name] = None
+        rows.append(CompoundInput(smiles=smiles, **values))
+    return rows
+
+
+def seed_project(name: str, size: int, seed: int = 0) -> Project:
+    """Return project ``name`` holding ``size`` synthetic compounds, creating them if needed.
+
+    Rows go straight through ``insert_batch``, so structure keys and
+    fingerprints are left empty; the stats are rebuilt once at the end.
+    """
+    project = Project.objects.filter(name=name).first()
+    if project is not None and Compound.objects.filter(project=project).count() == size:
+        return project
+    if project is None:
+        project = Project.objects.create(name=name, description=f"{size} synthetic compounds for benchmarks")
+    Compound.objects.filter(project=project).delete()
+
+    for start in range(0, size, SEED_BATCH_SIZE):
+        insert_batch([
+            Compound(project=project, smiles=row.smiles, mw=row.mw, logD=row.logD, logP=row.logP)
+            for row in make_rows(min(SEED_BATCH_SIZE, size - start), seed=seed + start)
+        ])
+    recompute_project_stats(project.id)
+    return project
+
+
+class Request(NamedTuple):
+    method: str
+    path: str
+    body: bytes | None = None
+
+
+def graphql_request(query: str, variables: dict) -> Request:
+    return Request('POST', '/graphql/', json.dumps({'query': query, 'variables': variables}).encode())
+
+
+PAGE_QUERY = """
+query Page($projectId: ID!, $after: String, $filter: CompoundFilter) {
+    compoundsConnection(projectId: $projectId, first: %d, after: $after, filter: $filter) {
+        edges { node { id smiles mw logD logP } }
+        pageInfo { hasNextPage endCursor }
+    }
+}
+""" % PAGE_SIZE
+
+
+def id_range(project) -> tuple[int, int]:
+    ids = Compound.objects.filter(project=project).order_by('id').values_list('id', flat=True)
+    return ids.first() or 0, ids.last() or 0
+
+
+def list_requests(project, count: int, rng: random.Random) -> list[Request]:
+    """Pages of ``PAGE_SIZE`` compounds starting at random cursors."""
+    low, high = id_range(project)
+    return [
+        graphql_request(PAGE_QUERY, {'projectId': project.id, 'after': encode_cursor(rng.randint(low, high))})
+        for _ in range(count)
+    ]
+
+
+def filter_requests(project, count: int, rng: random.Random) -> list[Request]:
+    """Pages of compounds in a random mw window with a logP cut-off."""
+    requests = []
+    for _ in range(count):
+        low = rng.uniform(150, 650)
+        compound_filter = {'mw': {'gte': low, 'lt': low + 50}, 'logP': {'lt': rng.uniform(1, 5)}}
+        requests.append(graphql_request(PAGE_QUERY, {'projectId': project.id, 'filter': compound_filter}))
+    return requests
+
+
+def insert_requests(project, count: int, rng: random.Random) -> list[Request]:
+    """``bulkCreateCompounds`` calls of ``INSERT_ROWS`` new compounds each."""
+    query = """
+    mutation Insert($projectId: ID!, $compounds: [CompoundInput!]!) {
+        bulkCreateCompounds(projectId: $projectId, compounds: $compounds) { id }
+    }
+    """
+    return [
+        graphql_request(query, {
+            'projectId': project.id,
+            'compounds': [dataclasses.asdict(row) for row in make_rows(INSERT_ROWS, seed=rng.getrandbits(32))]
+        })
+        for _ in range(count)
+    ]
+
+
+def delete_requests(project, count: int, rng: random.Random) -> list[Request]:
+    """``deleteCompound`` calls, each for a compound inserted beforehand."""
+    compounds = insert_batch([
+        Compound(project=project, smiles=row.smiles, mw=row.mw, logD=row.logD, logP=row.logP)
+        for row in make_rows(count, seed=rng.getrandbits(32))
+    ])
+    recompute_project_stats(project.id)
+    query = 'mutation Delete($id: ID!) { deleteCompound(id: $id) { id } }'
+    return [graphql_request(query, {'id': compound.id}) for compound in compounds]
+
+
+def export_requests(project, count: int, rng: random.Random) -> list[Request]:
+    """Full CSV exports of the project."""
+    return [Request('GET', f'/compounds/export/{project.id}/?format=csv') for _ in range(count)]
+
+
+class Workload(NamedTuple):
+    build: object
+    # Workloads on the seeded projects run once per size; the others run
+    # against a scratch project they may write to.
+    per_size: bool = True
+    # Fraction of --requests to send, for workloads whose requests are long.
+    request_share: float = 1.0
+
+
+WORKLOADS = {
+    'list': Workload(list_requests),
+    'filter': Workload(filter_requests),
+    'insert': Workload(insert_requests, per_size=False),
+    'delete': Workload(delete_requests, per_size=False),
+    'export': Workload(export_requests, request_share=0.05),
+}
+
+
+class QueryCounter:
+    """WSGI middleware counting the SQL queries run while serving requests."""
+
+    def __init__(self, application):
+        self.application = application
+        self.queries = 0
+        self.lock = threading.Lock()
+
+    def count(self, execute, sql, params, many, context):
+        with self.lock:
+            self.queries += 1
+        return execute(sql, params, many, context)
+
+    def __call__(self, environ, start_response):
+        # A generator, so queries run while a streaming response is iterated
+        # are counted as well.
+        with connection.execute_wrapper(self.count):
+            response = self.application(environ, start_response)
+            try:
+                yield from response
+            finally:
+                if hasattr(response, 'close'):
+                    response.close()
+
+
+class _QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def local_server(application):
+    """Serve ``application`` on a free local port from a background thread; yields its URL."""
+    server = ThreadedWSGIServer(('127.0.0.1', 0), _QuietRequestHandler, allow_reuse_address=False)
+    server.daemon_threads = True
+    server.set_app(application)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_port}'
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float | None:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    return sorted_values[max(math.ceil(fraction * len(sorted_values)) - 1, 0)]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _failed(status: int, content_type: str, body: bytes) -> bool:
+    if status >= 400:
+        return True
+    if content_type.startswith('application/json'):
+        result = json.loads(body)
+        return any('errors' in item for item in (result if isinstance(result, list) else [result]))
+    return False
+
+
+def run_load(base_url: str, requests: list[Request], concurrency: int, counter: QueryCounter | None = None) -> dict:
+    """Send ``requests`` to ``base_url`` from ``concurrency`` keep-alive clients.
+
+    SQL queries per request are reported when ``counter`` wraps the server;
+    peak RSS is that of this process, so only meaningful for a local server.
+    """
+    url = urlsplit(base_url)
+    pending = iter(requests)
+    lock = threading.Lock()
+    latencies = []
+    errors = 0
+
+    def client():
+        nonlocal errors
+        conn = http.client.HTTPConnection(url.hostname, url.port, timeout=300)
+        try:
+            while True:
+                with lock:
+                    request = next(pending, None)
+                if request is None:
+                    return
+                headers = {'Content-Type': 'application/json'} if request.body is not None else {}
+                start = time.perf_counter()
+                conn.request(request.method, request.path, body=request.body, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+                elapsed = time.perf_counter() - start
+                failed = _failed(response.status, response.getheader('Content-Type', ''), body)
+                with lock:
+                    latencies.append(elapsed)
+                    errors += failed
+        finally:
+            conn.close()
+
+    queries_before = counter.queries if counter is not None else 0
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(min(concurrency, len(requests)))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'seconds': round(seconds, 3),
+        'requests_per_second': round(len(latencies) / seconds, 1) if seconds else None,
+        'latency_ms': {
+            name: round(percentile(latencies, fraction) * 1000, 2) if latencies else None
+            for name, fraction in (('p50', 0.50), ('p95', 0.95), ('p99', 0.99))
+        },
+        'sql_queries_per_request': (
+            round((counter.queries - queries_before) / len(latencies), 2)
+            if counter is not None and latencies else None
+        ),
+        'peak_rss_mb': round(peak_rss_mb(), 1) if counter is not None else None,
+    }
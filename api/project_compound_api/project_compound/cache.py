@@ -0,0 +1,229 @@
+"""Versioned result cache for GraphQL reads.
+
+Cached results are keyed by operation, arguments and the current version of
+every namespace they depend on (``projects`` for the project listing,
+``project:<id>`` for one project's compounds). Mutations bump the versions
+they affect once their transaction commits, so stale entries are simply never
+looked up again and expire through LRU eviction or the backend timeout.
+
+Versions always live in a Django cache alias, also for the in-process
+``local`` backend: the import worker and management commands write from other
+processes, and their bumps must reach the server's cache. Point that alias at
+a shared cache (``CACHE_REDIS_URL``) whenever they run.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.models import QuerySet
+
+PROJECTS_NAMESPACE = 'projects'
+DEFAULT_RESULT_CACHE_SIZE = 1024
+
+
+class LRUCache:
+    """Thread-safe bounded LRU mapping with hit/miss counters."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def values(self) -> list:
+        """Snapshot of the cached values, without touching recency or counters."""
+        with self._lock:
+            return list(self._entries.values())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+class CacheVersions:
+    """Namespace version counters in a Django cache alias."""
+
+    key_prefix = 'graphql-result:version:'
+
+    def __init__(self, alias: str = 'default'):
+        self.cache = caches[alias]
+
+    def get(self, namespace: str) -> int:
+        # Counters start from the clock rather than 0, so a counter the cache
+        # evicted never restarts at a version that still has entries cached.
+        return self.cache.get_or_set(self.key_prefix + namespace, time.time_ns, None)
+
+    def bump(self, namespace: str):
+        key = self.key_prefix + namespace
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            if not self.cache.add(key, time.time_ns(), None):
+                self.cache.incr(key)
+
+
+class LocalResultCache:
+    """In-process backend: an LRU of results, with versions in a Django cache
+    alias shared with the processes that write."""
+
+    def __init__(self, maxsize: int = DEFAULT_RESULT_CACHE_SIZE, alias: str = 'default'):
+        self.results = LRUCache(maxsize)
+        self.versions = CacheVersions(alias)
+
+    def get(self, key):
+        return self.results.get(key)
+
+    def set(self, key, value):
+        self.results.set(key, value)
+
+    def get_version(self, namespace: str) -> int:
+        return self.versions.get(namespace)
+
+    def bump_version(self, namespace: str):
+        self.versions.bump(namespace)
+
+    def stats(self) -> dict:
+        return self.results.stats()
+
+
+class DjangoResultCache:
+    """Backend on Django's cache framework, shared by every worker using it."""
+
+    key_prefix = 'graphql-result:'
+
+    def __init__(self, alias: str = 'default', timeout: int | None = None):
+        self.cache = caches[alias]
+        self.timeout = timeout
+        self.versions = CacheVersions(alias)
+
+    def get(self, key):
+        return self.cache.get(self.key_prefix + key)
+
+    def set(self, key, value):
+        self.cache.set(self.key_prefix + key, value, self.timeout)
+
+    def get_version(self, namespace: str) -> int:
+        return self.versions.get(namespace)
+
+    def bump_version(self, namespace: str):
+        self.versions.bump(namespace)
+
+    def stats(self) -> dict:
+        return {}
+
+
+_result_cache = None
+
+
+def get_result_cache():
+    """Return the configured backend, or ``None`` when ``RESULT_CACHE`` is off."""
+    global _result_cache
+    if _result_cache is None:
+        config = getattr(settings, 'RESULT_CACHE', {})
+        backend = config.get('BACKEND', 'off')
+        if backend == 'local':
+            _result_cache = LocalResultCache(
+                config.get('MAXSIZE', DEFAULT_RESULT_CACHE_SIZE), config.get('ALIAS', 'default')
+            )
+        elif backend == 'django':
+            _result_cache = DjangoResultCache(config.get('ALIAS', 'default'), config.get('TIMEOUT'))
+        elif backend != 'off':
+            raise ValueError(f"Unknown RESULT_CACHE backend: {backend}")
+        else:
+            return None
+    return _result_cache
+
+
+def _reset_result_cache(setting, **kwargs):
+    global _result_cache
+    if setting == 'RESULT_CACHE':
+        _result_cache = None
+
+
+setting_changed.connect(_reset_result_cache)
+
+
+def project_namespace(project_id) -> str:
+    return f'project:{project_id}'
+
+
+def cached_result(operation: str, arguments: tuple, namespaces: list[str], compute, select_related=()):
+    """Return ``compute()``, served from the result cache when enabled.
+
+    QuerySets are evaluated (joined with ``select_related``) before being
+    stored so a hit never touches the database.
+    """
+    cache = get_result_cache()
+    if cache is None:
+        return compute()
+
+    versions = ','.join(f'{namespace}={cache.get_version(namespace)}' for namespace in namespaces)
+    digest = hashlib.sha256(repr(arguments).encode()).hexdigest()
+    key = f'{operation}:{digest}:{versions}'
+
+    result = cache.get(key)
+    if result is None:
+        result = compute()
+        if isinstance(result, QuerySet):
+            result = list(result.select_related(*select_related))
+        cache.set(key, result)
+    return result
+
+
+def invalidate(*namespaces: str):
+    """Bump the given namespaces once the current transaction commits.
+
+    Bumping before commit would let a concurrent read cache pre-commit data
+    under the new version.
+    """
+    cache = get_result_cache()
+    if cache is None:
+        return
+
+    def bump():
+        for namespace in namespaces:
+            cache.bump_version(namespace)
+
+    transaction.on_commit(bump)
+
+
+def invalidate_project(project_id, listing: bool = False):
+    namespaces = [project_namespace(project_id)]
+    if listing:
+        namespaces.append(PROJECTS_NAMESPACE)
+    invalidate(*namespaces)
@@ -0,0 +1,77 @@
+"""Compound change events behind the ``compoundChanges`` subscription.
+
+Write paths call ``publish_inserted``, ``publish_deleted`` or
+``publish_resync`` inside their transaction. The event is sent to the
+project's channel-layer group once the transaction commits, so subscribers
+never see rolled-back rows. With the default in-memory layer only
+subscribers in the publishing process are reached; ``CHANNEL_REDIS_URL``
+switches every process to a shared Redis layer (see ``settings.py``).
+
+Events are plain dicts so any channel layer can carry them. Inserts and
+deletes of more than ``MAX_DELTA_COMPOUNDS`` rows, and changes to existing
+rows, are sent as ``resync``: refetching is cheaper for clients than applying
+such a delta.
+"""
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+CHANGE_MESSAGE_TYPE = 'compound.change'
+MAX_DELTA_COMPOUNDS = 1000
+
+INSERTED = 'inserted'
+DELETED = 'deleted'
+RESYNC = 'resync'
+
+logger = logging.getLogger(__name__)
+
+
+def project_group(project_id) -> str:
+    return f'project-compounds-{int(project_id)}'
+
+
+def _publish(project_id, kind: str, ids=(), compounds=()):
+    event = {
+        'type': CHANGE_MESSAGE_TYPE,
+        'kind': kind,
+        'project_id': int(project_id),
+        'ids': [int(id) for id in ids],
+        'compounds': list(compounds),
+    }
+
+    def send():
+        try:
+            async_to_sync(get_channel_layer().group_send)(project_group(project_id), event)
+        except Exception:
+            # Subscribers can miss an event; the write itself has committed.
+            logger.exception("Could not publish compound change for project %s", project_id)
+
+    transaction.on_commit(send)
+
+
+def publish_inserted(project_id, compounds):
+    if len(compounds) > MAX_DELTA_COMPOUNDS:
+        publish_resync(project_id)
+        return
+    _publish(
+        project_id,
+        INSERTED,
+        ids=[compound.pk for compound in compounds],
+        compounds=[
+            [compound.pk, compound.smiles, compound.mw, compound.logD, compound.logP]
+            for compound in compounds
+        ]
+    )
+
+
+def publish_deleted(project_id, ids):
+    if len(ids) > MAX_DELTA_COMPOUNDS:
+        publish_resync(project_id)
+        return
+    _publish(project_id, DELETED, ids=ids)
+
+
+def publish_resync(project_id):
+    _publish(project_id, RESYNC)
@@ -0,0 +1,111 @@
+"""Static cost estimate of a GraphQL operation, taken before it executes.
+
+Every field is charged its weight once per item it resolves. Object fields
+weigh 1 and scalars 0 unless a ``FieldCost`` hint says otherwise, and a list
+field multiplies its own weight and everything selected below it by its
+expected size. Aliases are counted like separate fields, so forty aliased
+``compounds`` lists cost forty times one.
+"""
+from typing import NamedTuple
+
+from graphql import (
+    FieldNode, FragmentDefinitionNode, FragmentSpreadNode, GraphQLSchema, InlineFragmentNode,
+    OperationDefinitionNode, get_named_type, get_nullable_type, is_leaf_type, is_list_type
+)
+from graphql.execution.values import get_argument_values
+
+DEFAULT_LIST_SIZE = 100
+
+
+class FieldCost(NamedTuple):
+    """Cost hint for one field, keyed by ``'Type.fieldName'``.
+
+    ``size`` is the expected length of a list field; ``size_argument`` names
+    an argument that bounds it instead, such as ``first`` (a list argument
+    counts its items). With ``sized_fields`` the size applies to those child
+    fields rather than to this one, as for the ``edges`` of a connection.
+    """
+    weight: int | None = None
+    size: int | None = None
+    size_argument: str | None = None
+    sized_fields: tuple[str, ...] = ()
+
+
+class OperationCost(NamedTuple):
+    cost: int
+    depth: int
+
+
+def operation_cost(
+    schema: GraphQLSchema,
+    operation: OperationDefinitionNode,
+    fragments: dict[str, FragmentDefinitionNode],
+    variables: dict,
+    costs: dict[str, FieldCost]
+) -> OperationCost:
+    """Estimate ``operation`` with coerced ``variables`` and the ``costs`` hints.
+
+    Introspection fields are free and do not count towards the depth.
+    """
+    estimator = _Estimator(schema, fragments, variables, costs)
+    return estimator.selection_set(schema.get_root_type(operation.operation), operation.selection_set, {})
+
+
+class _Estimator:
+    def __init__(self, schema, fragments, variables, costs):
+        self.schema = schema
+        self.fragments = fragments
+        self.variables = variables
+        self.costs = costs
+
+    def fields(self, parent_type, selection_set, visited=frozenset()):
+        """Yield ``(type, field node)`` for the fields of ``selection_set``, through fragments."""
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                yield parent_type, selection
+            elif isinstance(selection, InlineFragmentNode):
+                condition = selection.type_condition
+                fragment_type = self.schema.get_type(condition.name.value) if condition else parent_type
+                yield from self.fields(fragment_type, selection.selection_set, visited)
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = self.fragments.get(name)
+                if fragment is not None and name not in visited:
+                    fragment_type = self.schema.get_type(fragment.type_condition.name.value)
+                    yield from self.fields(fragment_type, fragment.selection_set, visited | {name})
+
+    def selection_set(self, parent_type, selection_set, sizes) -> OperationCost:
+        cost = depth = 0
+        for field_type, node in self.fields(parent_type, selection_set):
+            name = node.name.value
+            if name.startswith('__'):
+                continue
+            field = field_type.fields[name]
+            hint = self.costs.get(f'{field_type.name}.{name}', FieldCost())
+            named_type = get_named_type(field.type)
+            weight = hint.weight if hint.weight is not None else (0 if is_leaf_type(named_type) else 1)
+
+            size = self.size(field, node, hint)
+            child_sizes = {}
+            if hint.sized_fields:
+                child_sizes = dict.fromkeys(hint.sized_fields, size)
+                size = 1
+            if name in sizes:
+                size = sizes[name]
+
+            child = OperationCost(0, 0)
+            if node.selection_set is not None:
+                child = self.selection_set(named_type, node.selection_set, child_sizes)
+                child = child._replace(depth=child.depth + 1)
+            cost += size * (weight + child.cost)
+            depth = max(depth, child.depth)
+        return OperationCost(cost, depth)
+
+    def size(self, field, node, hint: FieldCost) -> int:
+        if hint.size_argument is not None:
+            value = get_argument_values(field, node, self.variables).get(hint.size_argument)
+            if value is not None:
+                return len(value) if isinstance(value, list) else max(value, 0)
+        if hint.size is not None:
+            return hint.size
+        return DEFAULT_LIST_SIZE if is_list_type(get_nullable_type(field.type)) else 1
@@ -0,0 +1,80 @@
+"""Descriptor calculation from SMILES.
+
+``mw`` is RDKit's average molecular weight and ``logP`` the Wildman-Crippen
+atom-contribution estimate. logD depends on pH and pKa and is not computed.
+
+Large inputs are split into chunks and mapped over a process pool, so every
+core is used; small inputs are computed inline to avoid the pool start-up
+cost. This module imports nothing from Django so pool workers stay light
+whatever the multiprocessing start method.
+"""
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from rdkit.Chem import Crippen, Descriptors
+
+from .smiles import parse_smiles
+
+DESCRIPTORS = ('mw', 'logP')
+DEFAULT_CHUNK_SIZE = 500
+MIN_PARALLEL_SIZE = 500
+
+
+def compute_descriptors(smiles: str) -> tuple[float | None, float | None]:
+    """Return ``(mw, logP)``, or ``(None, None)`` for unparseable SMILES."""
+    mol = parse_smiles(smiles)
+    if mol is None:
+        return None, None
+    return round(Descriptors.MolWt(mol), 3), round(Crippen.MolLogP(mol), 3)
+
+
+def _compute_chunk(smiles: list[str]) -> list[tuple[float | None, float | None]]:
+    return [compute_descriptors(s) for s in smiles]
+
+
+class DescriptorCalculator:
+    """Computes descriptors for lists of SMILES, in a lazily started process
+    pool once a list is large enough. Use as a context manager so the pool is
+    shut down."""
+
+    def __init__(self, workers: int | None = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.executor = None
+
+    def compute(self, smiles: list[str]) -> list[tuple[float | None, float | None]]:
+        if self.workers == 1 or len(smiles) < MIN_PARALLEL_SIZE:
+            return _compute_chunk(smiles)
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        # At least one chunk per worker, so a single ingest batch spreads too.
+        chunk_size = min(self.chunk_size, math.ceil(len(smiles) / self.workers))
+        chunks = [smiles[i:i + chunk_size] for i in range(0, len(smiles), chunk_size)]
+        return [result for chunk in self.executor.map(_compute_chunk, chunks) for result in chunk]
+
+    def fill_missing(self, compounds) -> list[tuple[object, tuple[str, ...]]]:
+        """Set ``mw``/``logP`` where they are ``None``. Returns the changed
+        compounds with the names of the fields that were filled."""
+        missing = [c for c in compounds if any(getattr(c, name) is None for name in DESCRIPTORS)]
+        changed = []
+        for compound, values in zip(missing, self.compute([c.smiles for c in missing])):
+            filled = []
+            for name, value in zip(DESCRIPTORS, values):
+                if getattr(compound, name) is None and value is not None:
+                    setattr(compound, name, value)
+                    filled.append(name)
+            if filled:
+                changed.append((compound, tuple(filled)))
+        return changed
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
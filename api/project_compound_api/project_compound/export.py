@@ -0,0 +1,131 @@
+"""Streaming export of a project's compounds.
+
+Rows are read with ``QuerySet.iterator`` (a server-side cursor where the
+database supports one) and encoded chunk by chunk, so memory stays flat
+however large the project is. Text formats yield one string per chunk; the
+columnar formats write one Arrow record batch (or Parquet row group) per
+chunk through ``_Drain``, which hands the encoded bytes straight on.
+"""
+import csv
+import io
+import json
+from itertools import islice
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .models import Compound
+from .parsers import CSV_HEADER
+
+EXPORT_FIELDS = ('id', 'smiles', 'mw', 'logD', 'logP')
+CURSOR_CHUNK_SIZE = 2000
+TEXT_CHUNK_ROWS = 2000
+COLUMNAR_CHUNK_ROWS = 65536
+
+ARROW_SCHEMA = pa.schema([
+    ('id', pa.int64()),
+    ('smiles', pa.string()),
+    ('mw', pa.float64()),
+    ('logD', pa.float64()),
+    ('logP', pa.float64()),
+])
+
+
+def iter_compound_rows(project, chunk_size: int):
+    """Lists of ``(id, smiles, mw, logD, logP)`` tuples in id order."""
+    rows = (
+        Compound.objects
+        .filter(project=project)
+        .order_by('id')
+        .values_list(*EXPORT_FIELDS)
+        .iterator(chunk_size=CURSOR_CHUNK_SIZE)
+    )
+    while chunk := list(islice(rows, chunk_size)):
+        yield chunk
+
+
+def _number(value: float | None) -> str:
+    return '' if value is None else repr(value)
+
+
+def export_csv(project):
+    """The upload template layout; the compound id fills Compound_Name."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(CSV_HEADER)
+    for chunk in iter_compound_rows(project, TEXT_CHUNK_ROWS):
+        writer.writerows(
+            (id, smiles, _number(mw), _number(logD), _number(logP))
+            for id, smiles, mw, logD, logP in chunk
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def export_ndjson(project):
+    for chunk in iter_compound_rows(project, TEXT_CHUNK_ROWS):
+        yield ''.join(
+            json.dumps({'id': str(id), 'smiles': smiles, 'mw': mw, 'logD': logD, 'logP': logP}) + '\n'
+            for id, smiles, mw, logD, logP in chunk
+        )
+
+
+def record_batch(chunk) -> pa.RecordBatch:
+    columns = list(zip(*chunk))
+    return pa.record_batch(
+        [pa.array(column, type=field.type) for column, field in zip(columns, ARROW_SCHEMA)],
+        schema=ARROW_SCHEMA
+    )
+
+
+class _Drain(io.RawIOBase):
+    """Write-only file that collects bytes until ``take`` is called."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def take(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _export_columnar(project, open_writer):
+    sink = _Drain()
+    with open_writer(sink) as writer:
+        for chunk in iter_compound_rows(project, COLUMNAR_CHUNK_ROWS):
+            writer.write_batch(record_batch(chunk))
+            yield sink.take()
+    yield sink.take()
+
+
+def export_arrow(project):
+    """Arrow IPC stream, one record batch per chunk."""
+    return _export_columnar(project, lambda sink: pa.ipc.new_stream(sink, ARROW_SCHEMA))
+
+
+def export_parquet(project):
+    """Parquet, one row group per chunk; the footer follows the last one."""
+    return _export_columnar(project, lambda sink: pq.ParquetWriter(sink, ARROW_SCHEMA))
+
+
+EXPORTERS = {
+    'csv': (export_csv, 'text/csv; charset=utf-8', 'csv'),
+    'ndjson': (export_ndjson, 'application/x-ndjson', 'ndjson'),
+    'arrow': (export_arrow, 'application/vnd.apache.arrow.stream', 'arrows'),
+    'parquet': (export_parquet, 'application/vnd.apache.parquet', 'parquet'),
+}
@@ -0,0 +1,290 @@
+import hashlib
+import logging
+import time
+from inspect import isawaitable
+
+from django.conf import settings
+from graphql import FragmentDefinitionNode, GraphQLError
+from graphql.execution.values import get_variable_values
+from graphql.utilities import get_operation_ast
+from strawberry.extensions import SchemaExtension
+from strawberry.extensions.tracing.utils import should_skip_tracing
+from strawberry.types.graphql import OperationType
+
+from . import metrics
+from .cache import LRUCache
+from .cost import FieldCost, operation_cost
+from .tracing import Trace, current_trace
+
+DEFAULT_DOCUMENT_CACHE_SIZE = 256
+DEFAULT_PERSISTED_QUERY_CACHE_SIZE = 1024
+TIMING_HEADER = 'X-GraphQL-Timing'
+
+logger = logging.getLogger(__name__)
+
+
+def query_hash(query: str) -> str:
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+class DocumentCache(SchemaExtension):
+    """Automatic Persisted Queries plus a cache of parsed and validated documents.
+
+    Clients may send ``extensions.persistedQuery.sha256Hash`` instead of the
+    query text (Apollo APQ protocol). Unknown hashes fail with
+    ``PersistedQueryNotFound`` so the client retries with the full query, which
+    is then registered. Parsed documents and their validation errors are cached
+    by query hash and validation rules, so repeated operations skip both steps.
+
+    Use ``DocumentCache.for_schema()`` to give each schema its own caches.
+    """
+
+    documents: LRUCache
+    queries: LRUCache
+
+    @classmethod
+    def for_schema(
+        cls,
+        document_cache_size: int = DEFAULT_DOCUMENT_CACHE_SIZE,
+        persisted_query_cache_size: int = DEFAULT_PERSISTED_QUERY_CACHE_SIZE
+    ) -> type['DocumentCache']:
+        return type(cls.__name__, (cls,), {
+            'documents': LRUCache(document_cache_size),
+            'queries': LRUCache(persisted_query_cache_size),
+        })
+
+    @classmethod
+    def stats(cls) -> dict:
+        return {'documents': cls.documents.stats(), 'persistedQueries': cls.queries.stats()}
+
+    def on_operation(self):
+        execution_context = self.execution_context
+        persisted_query = (execution_context.operation_extensions or {}).get('persistedQuery')
+
+        if persisted_query is not None:
+            if persisted_query.get('version') != 1:
+                raise GraphQLError(
+                    "Unsupported persisted query version.",
+                    extensions={'code': 'PERSISTED_QUERY_NOT_SUPPORTED'}
+                )
+            sha256_hash = persisted_query.get('sha256Hash')
+            if execution_context.query:
+                if query_hash(execution_context.query) != sha256_hash:
+                    raise GraphQLError("Provided sha256Hash does not match query.")
+                self.queries.set(sha256_hash, execution_context.query)
+            else:
+                execution_context.query = self.queries.get(sha256_hash)
+                if execution_context.query is None:
+                    raise GraphQLError(
+                        "PersistedQueryNotFound",
+                        extensions={'code': 'PERSISTED_QUERY_NOT_FOUND'}
+                    )
+        yield
+
+    def on_parse(self):
+        execution_context = self.execution_context
+        self.document_key = None
+        self.cached = None
+
+        if execution_context.query and execution_context.graphql_document is None:
+            # Validation rules are part of the key because other extensions may
+            # add rules per operation; a document validated without them must
+            # not be reused.
+            self.document_key = (
+                query_hash(execution_context.query),
+                tuple(execution_context.validation_rules),
+            )
+            self.cached = self.documents.get(self.document_key)
+            if self.cached is not None:
+                execution_context.graphql_document = self.cached[0]
+        yield
+
+    def on_validate(self):
+        execution_context = self.execution_context
+        if self.cached is not None:
+            execution_context.pre_execution_errors = list(self.cached[1])
+            yield
+            return
+
+        yield
+        if self.document_key is not None and execution_context.graphql_document is not None:
+            self.documents.set(
+                self.document_key,
+                (execution_context.graphql_document, execution_context.pre_execution_errors or [])
+            )
+
+
+class QueryCost(SchemaExtension):
+    """Rejects operations whose estimated cost or depth is over budget.
+
+    The estimate (``cost.operation_cost``) is taken after validation and
+    before execution, from the field hints in ``costs`` with the operation's
+    variables applied. Each operation's cost is logged. Limits come from
+    ``settings.GRAPHQL_LIMITS``; with ``ENFORCE`` off, over-budget operations
+    are logged but still run, so the limits can be tuned on real traffic.
+    When the context counts ``cost`` (``loaders.RequestContext``), the
+    operations of a batched request share one ``MAX_COST`` budget.
+
+    Use ``QueryCost.for_schema(costs)`` to give each schema its hints.
+    """
+
+    costs: dict[str, FieldCost] = {}
+
+    @classmethod
+    def for_schema(cls, costs: dict[str, FieldCost]) -> type['QueryCost']:
+        return type(cls.__name__, (cls,), {'costs': costs})
+
+    def on_execute(self):
+        execution_context = self.execution_context
+        schema = execution_context.schema._schema
+        document = execution_context.graphql_document
+        operation = get_operation_ast(document, execution_context.operation_name)
+
+        # Unknown operations and invalid variables are left to execution to report.
+        if operation is not None:
+            variables = get_variable_values(
+                schema, operation.variable_definitions or [], execution_context.variables or {}
+            )
+            if not isinstance(variables, list):
+                fragments = {
+                    definition.name.value: definition
+                    for definition in document.definitions
+                    if isinstance(definition, FragmentDefinitionNode)
+                }
+                self.check(operation, operation_cost(schema, operation, fragments, variables, self.costs))
+        yield
+
+    def check(self, operation, estimate):
+        limits = settings.GRAPHQL_LIMITS
+        context = self.execution_context.context
+        spent = getattr(context, 'cost', 0)
+        name = operation.name.value if operation.name else None
+        errors = []
+        if estimate.cost > limits['MAX_COST']:
+            errors.append(GraphQLError(
+                f"Query cost {estimate.cost} exceeds the maximum of {limits['MAX_COST']}.",
+                extensions={'code': 'QUERY_TOO_COMPLEX', 'cost': estimate.cost, 'maximumCost': limits['MAX_COST']}
+            ))
+        elif spent + estimate.cost > limits['MAX_COST']:
+            remaining = limits['MAX_COST'] - spent
+            errors.append(GraphQLError(
+                f"Query cost {estimate.cost} exceeds the {remaining} left of the request's maximum of "
+                f"{limits['MAX_COST']}.",
+                extensions={'code': 'QUERY_TOO_COMPLEX', 'cost': estimate.cost, 'maximumCost': remaining}
+            ))
+        if estimate.depth > limits['MAX_DEPTH']:
+            errors.append(GraphQLError(
+                f"Query depth {estimate.depth} exceeds the maximum of {limits['MAX_DEPTH']}.",
+                extensions={'code': 'QUERY_TOO_DEEP', 'depth': estimate.depth, 'maximumDepth': limits['MAX_DEPTH']}
+            ))
+
+        logger.log(
+            logging.WARNING if errors else logging.INFO,
+            "%s %s cost=%d depth=%d%s",
+            operation.operation.value, name or '<anonymous>', estimate.cost, estimate.depth,
+            " over budget" if errors else ""
+        )
+        if errors and limits['ENFORCE']:
+            raise errors[0]
+        if hasattr(context, 'cost'):
+            context.cost += estimate.cost
+
+
+class RequestScope(SchemaExtension):
+    """Clears the request's loaders around mutations.
+
+    Rows loaded by earlier operations of a batch may be changed by a
+    mutation, so neither the mutation nor the operations after it reuse them.
+    """
+
+    def on_execute(self):
+        loaders = getattr(self.execution_context.context, 'loaders', None)
+        mutation = self.execution_context.operation_type == OperationType.MUTATION
+        if loaders is not None and mutation:
+            loaders.clear()
+        yield
+        if loaders is not None and mutation:
+            loaders.clear()
+
+
+def operation_labels(execution_context) -> dict:
+    operation_type = 'unknown'
+    if execution_context.graphql_document is not None:
+        try:
+            operation_type = execution_context.operation_type.value
+        except RuntimeError:
+            # No operation of that name; execution reports it.
+            pass
+    return {'operation_type': operation_type, 'operation_name': execution_context.operation_name or ''}
+
+
+class Tracing(SchemaExtension):
+    """Records the wall time, resolver time and SQL of each operation.
+
+    Operation totals, SQL query counts and SQL time go to the histograms in
+    ``metrics`` labelled by operation, resolver times by ``Type.field``
+    (default resolvers are skipped). A request sent with the
+    ``X-GraphQL-Timing: 1`` header also gets the operation's breakdown in
+    ``extensions.timing``: execution time less resolver time is spent by
+    graphql-core completing and serializing the result, resolver time less
+    SQL time mostly in the ORM.
+    """
+
+    def on_operation(self):
+        self.trace = Trace()
+        self.seconds = self.execution_seconds = 0.0
+        token = current_trace.set(self.trace)
+        try:
+            yield
+        finally:
+            current_trace.reset(token)
+            self.seconds = time.perf_counter() - self.trace.start
+
+        labels = operation_labels(self.execution_context)
+        # A subscription's operation lasts as long as the client stays subscribed.
+        if labels['operation_type'] == OperationType.SUBSCRIPTION.value:
+            return
+        metrics.OPERATION_DURATION.observe(self.seconds, **labels)
+        metrics.OPERATION_SQL_QUERIES.observe(self.trace.sql_queries, **labels)
+        metrics.OPERATION_SQL_DURATION.observe(self.trace.sql_seconds, **labels)
+
+    def on_execute(self):
+        labels = operation_labels(self.execution_context)
+        self.trace.operation = f"{labels['operation_type']} {labels['operation_name'] or '<anonymous>'}"
+        start = time.perf_counter()
+        yield
+        self.execution_seconds = time.perf_counter() - start
+
+    def resolve(self, _next, root, info, *args, **kwargs):
+        if should_skip_tracing(_next, info):
+            return _next(root, info, *args, **kwargs)
+        field = f'{info.parent_type.name}.{info.field_name}'
+        start = time.perf_counter()
+        result = None
+        self.trace.field = field
+        try:
+            result = _next(root, info, *args, **kwargs)
+            if isawaitable(result):
+                return self.await_resolver(result, field, start)
+            return result
+        finally:
+            if not isawaitable(result):
+                self.record_resolver(field, start)
+
+    async def await_resolver(self, result, field, start):
+        try:
+            return await result
+        finally:
+            self.record_resolver(field, start)
+
+    def record_resolver(self, field, start):
+        seconds = time.perf_counter() - start
+        self.trace.record_resolver(field, seconds)
+        metrics.RESOLVER_DURATION.observe(seconds, field=field)
+
+    def get_results(self):
+        request = getattr(self.execution_context.context, 'request', None)
+        headers = getattr(request, 'headers', None) or {}
+        if headers.get(TIMING_HEADER) != '1':
+            return {}
+        return {'timing': self.trace.breakdown(self.seconds, self.execution_seconds)}
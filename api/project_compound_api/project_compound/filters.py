@@ -0,0 +1,94 @@
+from enum import Enum
+from typing import List
+
+import strawberry
+from django.db.models import F
+
+from .smiles import structure_key
+
+
+@strawberry.input
+class FloatRange:
+    gt: float | None = None
+    gte: float | None = None
+    lt: float | None = None
+    lte: float | None = None
+    is_null: bool | None = None
+
+
+@strawberry.input
+class CompoundFilter:
+    structure: str | None = strawberry.field(
+        default=None,
+        description="SMILES; matches compounds with the same canonical structure."
+    )
+    mw: FloatRange | None = None
+    logD: FloatRange | None = None
+    logP: FloatRange | None = None
+
+
+@strawberry.enum
+class CompoundOrderField(Enum):
+    ID = 'id'
+    SMILES = 'smiles'
+    MW = 'mw'
+    LOG_D = 'logD'
+    LOG_P = 'logP'
+
+
+@strawberry.enum
+class OrderDirection(Enum):
+    ASC = 'asc'
+    DESC = 'desc'
+
+
+@strawberry.input
+class CompoundOrder:
+    field: CompoundOrderField
+    direction: OrderDirection = OrderDirection.ASC
+
+
+RANGE_LOOKUPS = ('gt', 'gte', 'lt', 'lte')
+FILTER_FIELDS = ('mw', 'logD', 'logP')
+
+
+def apply_compound_filter(queryset, compound_filter: CompoundFilter | None):
+    """Translate a ``CompoundFilter`` into ORM lookups so it runs in SQL."""
+    if compound_filter is None:
+        return queryset
+
+    lookups = {}
+    if compound_filter.structure is not None:
+        lookups['smiles_key'], lookups['smiles_hash'] = structure_key(compound_filter.structure)
+
+    for field in FILTER_FIELDS:
+        value_range = getattr(compound_filter, field)
+        if value_range is None:
+            continue
+        for lookup in RANGE_LOOKUPS:
+            bound = getattr(value_range, lookup)
+            if bound is not None:
+                lookups[f'{field}__{lookup}'] = bound
+        if value_range.is_null is not None:
+            lookups[f'{field}__isnull'] = value_range.is_null
+
+    return queryset.filter(**lookups)
+
+
+def apply_compound_order(queryset, order_by: List[CompoundOrder] | None):
+    """Order by the requested keys, nulls last, with ``id`` as the final tiebreaker."""
+    if not order_by:
+        return queryset
+
+    ordering = []
+    for order in order_by:
+        expression = F(order.field.value)
+        if order.direction == OrderDirection.DESC:
+            ordering.append(expression.desc(nulls_last=True))
+        else:
+            ordering.append(expression.asc(nulls_last=True))
+
+    if not any(order.field == CompoundOrderField.ID for order in order_by):
+        ordering.append(F('id').asc())
+
+    return queryset.order_by(*ordering)
@@ -0,0 +1,44 @@
+"""Bit-packed structural fingerprints.
+
+Fingerprints are stored as bits packed little-endian into bytes, so they can
+be viewed directly as ``uint64`` words.
+
+* The pattern fingerprint (``PATTERN_FP_BITS``) screens substructure searches:
+  every bit set for a substructure is also set for any molecule containing it,
+  so a compound lacking one of the query's bits cannot match.
+* The Morgan fingerprint (radius 2, ``MORGAN_FP_BITS``) is used for Tanimoto
+  similarity.
+"""
+import numpy as np
+from rdkit import Chem, DataStructs
+from rdkit.Chem import rdFingerprintGenerator
+
+PATTERN_FP_BITS = 1024
+PATTERN_FP_WORDS = PATTERN_FP_BITS // 64
+MORGAN_FP_BITS = 2048
+MORGAN_FP_WORDS = MORGAN_FP_BITS // 64
+
+_morgan_generator = rdFingerprintGenerator.GetMorganGenerator(radius=2, fpSize=MORGAN_FP_BITS)
+
+
+def pack_bits(bit_vector) -> bytes:
+    bits = np.zeros((bit_vector.GetNumBits(),), dtype=np.uint8)
+    DataStructs.ConvertToNumpyArray(bit_vector, bits)
+    return np.packbits(bits, bitorder='little').tobytes()
+
+
+def pattern_fingerprint(mol) -> bytes:
+    return pack_bits(Chem.PatternFingerprint(mol, fpSize=PATTERN_FP_BITS))
+
+
+def morgan_fingerprint(mol) -> bytes:
+    return np.packbits(_morgan_generator.GetFingerprintAsNumPy(mol), bitorder='little').tobytes()
+
+
+def as_words(packed: bytes) -> np.ndarray:
+    return np.frombuffer(packed, dtype='<u8')
+
+
+def screen(fingerprints: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Boolean mask of rows containing every bit set in ``query``."""
+    return ((fingerprints & query) == query).all(axis=1)
@@ -0,0 +1,203 @@
+"""Per-process, per-project in-memory indexes over compound rows.
+
+An index keeps one growable NumPy array per column. It is built lazily on
+first use and kept in a bounded LRU per process. Inserts and deletes made in
+this process are applied once their transaction commits (see
+``index_compounds`` / ``unindex_compounds``). Before each use, ``refresh()``
+loads rows with higher ids than the index has seen, which covers inserts by
+other workers and by streaming uploads. It rebuilds from scratch if the
+project's ``ProjectStats.compound_count`` still disagrees, which covers
+deletes made elsewhere, or, for indexes that store a property, if
+``ProjectStats.property_revision`` moved, which means existing rows' properties
+were modified. Indexes of structures only (fingerprints) are unaffected by
+property edits.
+"""
+import threading
+
+import numpy as np
+from django.db import transaction
+
+from .cache import LRUCache
+from .models import Compound, ProjectStats
+from .stats import PROPERTIES
+
+INITIAL_CAPACITY = 1024
+
+
+class ProjectIndex:
+    """Base class. Subclasses set ``fields`` (``Compound`` fields loaded per
+    row after ``id``) and ``columns`` (name -> (dtype, row shape)), and
+    implement ``convert`` to turn rows into column arrays."""
+
+    fields: tuple[str, ...] = ()
+    columns: dict[str, tuple] = {}
+
+    def __init__(self, project_id):
+        self.project_id = project_id
+        self.lock = threading.Lock()
+        self.property_revision = None
+        self._clear()
+
+    def accepts(self, row) -> bool:
+        """Whether a row is stored; rejected rows still count as seen."""
+        return True
+
+    def convert(self, rows) -> dict[str, np.ndarray]:
+        raise NotImplementedError
+
+    def column(self, name: str) -> np.ndarray:
+        return self.arrays[name][:self.size]
+
+    def memory_bytes(self) -> int:
+        return sum(array.nbytes for array in self.arrays.values())
+
+    def _clear(self):
+        self.arrays = {
+            'id': np.empty(INITIAL_CAPACITY, dtype=np.int64),
+            **{
+                name: np.empty((INITIAL_CAPACITY,) + shape, dtype=dtype)
+                for name, (dtype, shape) in self.columns.items()
+            },
+        }
+        self.size = 0
+        # Every compound seen, stored or not, for the staleness check.
+        self.compound_count = 0
+        self.last_id = 0
+
+    def _reserve(self, extra: int):
+        needed = self.size + extra
+        capacity = len(self.arrays['id'])
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, old in self.arrays.items():
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            self.arrays[name] = new
+
+    def _add(self, rows):
+        """Add ``(id, *fields)`` rows not seen before."""
+        rows = [row for row in rows if row[0] > self.last_id]
+        if not rows:
+            return
+        self.compound_count += len(rows)
+        self.last_id = max(row[0] for row in rows)
+
+        rows = [row for row in rows if self.accepts(row)]
+        if not rows:
+            return
+        self._reserve(len(rows))
+        start, end = self.size, self.size + len(rows)
+        self.arrays['id'][start:end] = [row[0] for row in rows]
+        for name, values in self.convert(rows).items():
+            self.arrays[name][start:end] = values
+        self.size = end
+
+    def _remove(self, ids):
+        """Drop rows by id, compacting the columns in one vectorized pass."""
+        ids = [id for id in ids if id <= self.last_id]
+        self.compound_count -= len(ids)
+        removed = np.isin(self.column('id'), ids)
+        if not removed.any():
+            return
+        kept = np.flatnonzero(~removed)
+        for array in self.arrays.values():
+            array[:len(kept)] = array[kept]
+        self.size = len(kept)
+
+    def _load(self, queryset):
+        self._add(
+            queryset
+            .order_by('id')
+            .values_list('id', *self.fields)
+            .iterator(chunk_size=2000)
+        )
+
+    def add(self, rows):
+        with self.lock:
+            self._add(rows)
+
+    def remove(self, ids):
+        with self.lock:
+            self._remove(ids)
+
+    def refresh(self):
+        compounds = Compound.objects.filter(project_id=self.project_id)
+        with self.lock:
+            stats = (
+                ProjectStats.objects
+                .filter(project_id=self.project_id)
+                .values_list('compound_count', 'property_revision')
+                .first()
+            )
+            count, property_revision = stats if stats is not None else (compounds.count(), 0)
+            if property_revision != self.property_revision and set(self.fields) & set(PROPERTIES):
+                self._clear()
+            self.property_revision = property_revision
+            self._load(compounds.filter(id__gt=self.last_id))
+            if count != self.compound_count:
+                self._clear()
+                self._load(compounds)
+
+
+class IndexRegistry:
+    """Bounded LRU of one index class, keyed by project id."""
+
+    def __init__(self, index_class: type[ProjectIndex], maxsize: int):
+        self.index_class = index_class
+        self.indexes = LRUCache(maxsize)
+        self.lock = threading.Lock()
+        registries.append(self)
+
+    def get(self, project_id) -> ProjectIndex:
+        """Return the project's index, building or refreshing it as needed."""
+        project_id = int(project_id)
+        with self.lock:
+            index = self.indexes.get(project_id)
+            if index is None:
+                index = self.index_class(project_id)
+                self.indexes.set(project_id, index)
+        index.refresh()
+        return index
+
+    def loaded(self, project_id) -> ProjectIndex | None:
+        with self.lock:
+            return self.indexes.get(int(project_id))
+
+    def loaded_indexes(self) -> list[ProjectIndex]:
+        with self.lock:
+            return self.indexes.values()
+
+    def clear(self):
+        self.indexes.clear()
+
+
+registries: list[IndexRegistry] = []
+
+
+def index_compounds(project_id, compounds: list[Compound]):
+    """Add freshly inserted compounds to every loaded index once committed."""
+    def apply():
+        for registry in registries:
+            index = registry.loaded(project_id)
+            if index is not None:
+                index.add([
+                    (compound.pk, *(getattr(compound, field) for field in index.fields))
+                    for compound in compounds
+                ])
+
+    transaction.on_commit(apply)
+
+
+def unindex_compounds(project_id, ids: list[int]):
+    """Drop deleted compounds from every loaded index once committed."""
+    ids = [int(id) for id in ids]
+
+    def apply():
+        for registry in registries:
+            index = registry.loaded(project_id)
+            if index is not None:
+                index.remove(ids)
+
+    transaction.on_commit(apply)
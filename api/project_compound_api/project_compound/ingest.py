@@ -0,0 +1,329 @@
+from contextlib import nullcontext
+from itertools import islice
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+
+from .cache import invalidate_project
+from .changes import MAX_DELTA_COMPOUNDS, publish_deleted, publish_inserted, publish_resync
+from .descriptors import DESCRIPTORS, DescriptorCalculator
+from .filters import CompoundFilter, apply_compound_filter
+from .models import Compound
+from .indexes import index_compounds, unindex_compounds
+from .pgcopy import copy_insert
+from .stats import (
+    PROPERTIES, CompoundSummary, PropertySummary, record_deleted, record_filled, record_inserted, record_updated
+)
+
+DEFAULT_BATCH_SIZE = 1000
+# Below this, a single INSERT ... RETURNING beats COPY's extra id round trip.
+COPY_MIN_ROWS = 100
+
+
+def get_batch_size(batch_size: int | None = None) -> int:
+    if batch_size is None:
+        batch_size = getattr(settings, 'COMPOUND_BULK_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    if batch_size < 1:
+        raise ValueError("Batch size must be a positive integer.")
+    return batch_size
+
+
+def descriptor_calculator(descriptors: bool | DescriptorCalculator = True):
+    """Context yielding the calculator for an ingest: a new one sized by
+    ``settings.DESCRIPTOR_WORKERS`` for ``True``, a caller's own (left open)
+    for an instance, or ``None`` for ``False``."""
+    if isinstance(descriptors, DescriptorCalculator):
+        return nullcontext(descriptors)
+    if not descriptors:
+        return nullcontext()
+    return DescriptorCalculator(settings.DESCRIPTOR_WORKERS)
+
+
+def iter_batches(iterable, batch_size: int):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+
+def insert_batch(compounds: list[Compound]) -> list[Compound]:
+    """Insert one batch of unsaved compounds with a single multi-row INSERT,
+    or with COPY on PostgreSQL when the batch is large enough.
+
+    Either way the primary keys are set on the instances without re-querying
+    (via RETURNING on SQLite >= 3.35 and PostgreSQL).
+    """
+    if connection.vendor == 'postgresql' and len(compounds) >= COPY_MIN_ROWS:
+        return copy_insert(compounds)
+    return Compound.objects.bulk_create(compounds, batch_size=len(compounds) or None)
+
+
+class Duplicate(NamedTuple):
+    row: object
+    compound_id: int
+
+
+def _existing_ids(project, compounds: list[Compound]) -> dict[str, int]:
+    """Map the structure keys of a batch already stored in the project to
+    their lowest compound id, with one lookup on the hash index."""
+    existing = {}
+    for key, id in (
+        Compound.objects
+        .filter(project=project, smiles_hash__in={compound.smiles_hash for compound in compounds})
+        .order_by('-id')
+        .values_list('smiles_key', 'id')
+    ):
+        existing[key] = id
+    return existing
+
+
+def _insert_rows(
+    project,
+    rows,
+    batch_size: int | None,
+    skip_duplicates: bool = False,
+    on_duplicate=None,
+    descriptors: DescriptorCalculator | None = None
+):
+    batch_size = get_batch_size(batch_size)
+    for batch in iter_batches(rows, batch_size):
+        compounds = []
+        for row in batch:
+            compound = Compound(
+                project=project,
+                smiles=row.smiles,
+                mw=row.mw,
+                logD=row.logD,
+                logP=row.logP
+            )
+            compound.set_structure()
+            compounds.append(compound)
+
+        duplicates = []
+        to_insert = compounds
+        # Duplicates are only looked up when they are skipped or reported.
+        if skip_duplicates or on_duplicate is not None:
+            existing = _existing_ids(project, compounds)
+            first_in_batch = {}
+            to_insert = []
+            for row, compound in zip(batch, compounds):
+                key = compound.smiles_key
+                if key in existing or key in first_in_batch:
+                    # Ids of rows first seen in this batch are only known after
+                    # the insert, so keep the instance and resolve it below.
+                    duplicates.append((row, existing.get(key) or first_in_batch[key]))
+                    if skip_duplicates:
+                        continue
+                else:
+                    first_in_batch[key] = compound
+                to_insert.append(compound)
+
+        if descriptors is not None:
+            descriptors.fill_missing(to_insert)
+        inserted = insert_batch(to_insert)
+        if on_duplicate is not None:
+            for row, original in duplicates:
+                on_duplicate(Duplicate(row, original if isinstance(original, int) else original.pk))
+        yield inserted
+
+
+def bulk_insert_compounds(
+    project,
+    rows,
+    batch_size: int | None = None,
+    skip_duplicates: bool = False,
+    on_duplicate=None,
+    compute_descriptors: bool | DescriptorCalculator = False
+) -> list[Compound]:
+    """Insert compound rows for a project in chunks inside one transaction.
+
+    ``rows`` is any iterable of objects exposing ``smiles``, ``mw``, ``logD`` and
+    ``logP`` attributes (e.g. ``CompoundInput``). Rows whose structure already
+    exists in the project, or earlier in the input, are passed to
+    ``on_duplicate`` as ``Duplicate`` tuples and left out when
+    ``skip_duplicates`` is set. With ``compute_descriptors`` missing ``mw`` and
+    ``logP`` values are calculated from the SMILES before insertion.
+    """
+    created = []
+    with transaction.atomic(), descriptor_calculator(compute_descriptors) as descriptors:
+        for batch in _insert_rows(project, rows, batch_size, skip_duplicates, on_duplicate, descriptors):
+            created.extend(batch)
+        record_inserted(project.id, CompoundSummary().add(created))
+        index_compounds(project.id, created)
+        publish_inserted(project.id, created)
+        invalidate_project(project.id, listing=True)
+    return created
+
+
+def stream_insert_compounds(
+    project,
+    rows,
+    batch_size: int | None = None,
+    skip_duplicates: bool = False,
+    on_duplicate=None,
+    compute_descriptors: bool | DescriptorCalculator = False
+) -> int:
+    """Like ``bulk_insert_compounds`` but keeps no references to inserted rows.
+
+    Only one batch is held in memory at a time, so ``rows`` may be a lazy
+    generator over an arbitrarily large input. Returns the number inserted.
+    Loaded in-memory indexes pick the new rows up on their next refresh and
+    subscribers are told to resync.
+    """
+    inserted = CompoundSummary()
+    with transaction.atomic(), descriptor_calculator(compute_descriptors) as descriptors:
+        for batch in _insert_rows(project, rows, batch_size, skip_duplicates, on_duplicate, descriptors):
+            inserted.add(batch)
+        record_inserted(project.id, inserted)
+        if inserted.count:
+            publish_resync(project.id)
+        invalidate_project(project.id, listing=True)
+    return inserted.count
+
+
+def backfill_descriptors(
+    project, batch_size: int | None = None, descriptors: bool | DescriptorCalculator = True
+) -> int:
+    """Compute missing ``mw``/``logP`` for a project's existing compounds.
+
+    Compounds are walked in id order, one batch per transaction. Each batch is
+    computed by the calculator (in its process pool when large enough) and
+    written back with one ``bulk_update``; project stats are updated
+    incrementally. Returns the number of compounds updated.
+    """
+    batch_size = get_batch_size(batch_size)
+    missing = (
+        Compound.objects
+        .filter(project=project)
+        .filter(Q(mw__isnull=True) | Q(logP__isnull=True))
+        .order_by('id')
+        .only('id', 'smiles', *DESCRIPTORS)
+    )
+    updated = 0
+    last_id = 0
+    with descriptor_calculator(descriptors) as calculator:
+        while batch := list(missing.filter(id__gt=last_id)[:batch_size]):
+            last_id = batch[-1].id
+            changed = calculator.fill_missing(batch)
+            if not changed:
+                continue
+
+            filled = CompoundSummary(0, {name: PropertySummary() for name in DESCRIPTORS})
+            for compound, names in changed:
+                for name in names:
+                    filled.properties[name].add(getattr(compound, name))
+            with transaction.atomic():
+                Compound.objects.bulk_update([c for c, _ in changed], DESCRIPTORS, batch_size=batch_size)
+                record_filled(project.id, filled)
+                invalidate_project(project.id, listing=True)
+            updated += len(changed)
+    if updated:
+        publish_resync(project.id)
+    return updated
+
+
+def _locked_batches(queryset, ids, batch_size: int, fields):
+    """Lock and load the compounds of ``queryset`` (only ``id`` and
+    ``fields``) ``batch_size`` at a time, restricted to ``ids`` unless that is
+    ``None``. Without ids the queryset is walked in keyset order (``id > last
+    ORDER BY id LIMIT batch_size``), so neither the statement count nor the
+    memory held grows with the number of rows beyond one batch."""
+    queryset = queryset.select_for_update().order_by('id').only('id', *fields)
+    if ids is not None:
+        for batch in iter_batches(dict.fromkeys(int(id) for id in ids), batch_size):
+            if compounds := list(queryset.filter(id__in=batch)):
+                yield compounds
+        return
+    last_id = 0
+    while compounds := list(queryset.filter(id__gt=last_id)[:batch_size]):
+        last_id = compounds[-1].pk
+        yield compounds
+
+
+def bulk_delete_compounds(
+    project,
+    ids=None,
+    compound_filter: CompoundFilter | None = None,
+    batch_size: int | None = None,
+    on_deleted=None,
+    load_structures: bool = False
+) -> int:
+    """Delete a project's compounds, given either their ids or a filter.
+
+    Matching rows are locked and read a batch at a time, summarized for the
+    stats and removed with one ``DELETE ... WHERE id IN`` per batch. Ids not
+    in the project are ignored. Each deleted batch is passed to
+    ``on_deleted``, with only id and properties loaded (plus SMILES with
+    ``load_structures``). Returns the number deleted. Beyond
+    ``MAX_DELTA_COMPOUNDS`` rows, loaded in-memory indexes reload on their
+    next refresh and subscribers are told to resync.
+    """
+    if (ids is None) == (compound_filter is None):
+        raise ValueError("Pass either ids or a filter.")
+    batch_size = get_batch_size(batch_size)
+    fields = ('smiles', *PROPERTIES) if load_structures else PROPERTIES
+    deleted = CompoundSummary()
+    deleted_ids = []
+    with transaction.atomic():
+        compounds = apply_compound_filter(Compound.objects.filter(project=project), compound_filter)
+        for batch in _locked_batches(compounds, ids, batch_size, fields):
+            batch_ids = [compound.pk for compound in batch]
+            Compound.objects.filter(id__in=batch_ids).delete()
+            deleted.add(batch)
+            if deleted_ids is not None:
+                deleted_ids.extend(batch_ids)
+                if len(deleted_ids) > MAX_DELTA_COMPOUNDS:
+                    deleted_ids = None
+            if on_deleted is not None:
+                for compound in batch:
+                    compound.project = project
+                on_deleted(batch)
+        if deleted.count:
+            record_deleted(project.id, deleted)
+            if deleted_ids is not None:
+                unindex_compounds(project.id, deleted_ids)
+                publish_deleted(project.id, deleted_ids)
+            else:
+                publish_resync(project.id)
+            invalidate_project(project.id, listing=True)
+    return deleted.count
+
+
+def bulk_update_properties(project, changes: dict[int, dict], batch_size: int | None = None) -> list[Compound]:
+    """Set properties of a project's existing compounds.
+
+    ``changes`` maps compound ids to the ``mw``/``logD``/``logP`` values to
+    set; properties left out keep their value. Rows are locked and read in
+    batches, then written with one ``bulk_update`` (an ``UPDATE ... CASE``)
+    per batch; project stats are updated incrementally. Ids not in the
+    project, and compounds whose values are already the ones given, are left
+    alone. Returns the compounds that changed.
+    """
+    batch_size = get_batch_size(batch_size)
+    with transaction.atomic():
+        # Old and new values of the properties that actually change.
+        before, after = CompoundSummary(), CompoundSummary()
+        fields = set()
+        updated = []
+        for batch in _locked_batches(Compound.objects.filter(project=project), changes, batch_size, PROPERTIES):
+            for compound in batch:
+                changed = False
+                for name, value in changes[compound.pk].items():
+                    if getattr(compound, name) == value:
+                        continue
+                    before.properties[name].add(getattr(compound, name))
+                    after.properties[name].add(value)
+                    setattr(compound, name, value)
+                    fields.add(name)
+                    changed = True
+                if changed:
+                    updated.append(compound)
+        if updated:
+            Compound.objects.bulk_update(
+                updated, [name for name in PROPERTIES if name in fields], batch_size=batch_size
+            )
+            record_updated(project.id, before, after)
+            publish_resync(project.id)
+            invalidate_project(project.id, listing=True)
+    return updated
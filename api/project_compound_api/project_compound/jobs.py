@@ -0,0 +1,138 @@
+"""Database-backed background compound imports.
+
+``enqueue_import`` stores the input rows as ``ImportBatch`` rows and returns
+the queued ``ImportJob`` at once. Workers (``manage.py run_import_worker``)
+claim jobs with a lease and insert one batch per transaction, deleting the
+batch and recording progress in that same transaction. A job interrupted by
+a crash or restart therefore resumes after its last committed batch, once
+its lease expires. No broker is needed; the jobs table is the queue.
+"""
+import time
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .ingest import bulk_insert_compounds, descriptor_calculator, get_batch_size, iter_batches
+from .models import ImportBatch, ImportJob
+from .parsers import CompoundRow
+
+LEASE_SECONDS = 60
+MAX_REPORTED_DUPLICATES = 100
+
+
+class LeaseLost(Exception):
+    """The job was deleted or taken over by another worker."""
+
+
+def enqueue_import(
+    project,
+    rows,
+    batch_size: int | None = None,
+    skip_duplicates: bool = False,
+    compute_descriptors: bool = False
+) -> ImportJob:
+    """Queue ``rows`` (objects with ``smiles``, ``mw``, ``logD`` and ``logP``)
+    for import into ``project`` and return the job."""
+    batch_size = get_batch_size(batch_size)
+    rows = list(rows)
+    with transaction.atomic():
+        job = ImportJob.objects.create(
+            project=project,
+            batch_size=batch_size,
+            skip_duplicates=skip_duplicates,
+            compute_descriptors=compute_descriptors,
+            total_rows=len(rows)
+        )
+        offset = 0
+        batches = []
+        for batch in iter_batches(rows, batch_size):
+            batches.append(ImportBatch(
+                job=job,
+                offset=offset,
+                rows=[[row.smiles, row.mw, row.logD, row.logP] for row in batch]
+            ))
+            offset += len(batch)
+        ImportBatch.objects.bulk_create(batches, batch_size=100)
+    return job
+
+
+def _claimable(now):
+    return Q(status=ImportJob.Status.QUEUED) | Q(status=ImportJob.Status.RUNNING, locked_until__lt=now)
+
+
+def claim_job() -> ImportJob | None:
+    """Lease the oldest queued job, or a running job whose worker went away."""
+    now = timezone.now()
+    lease = now + timedelta(seconds=LEASE_SECONDS)
+    candidates = ImportJob.objects.filter(_claimable(now)).order_by('id').values_list('id', flat=True)[:10]
+    for job_id in candidates:
+        # Compare-and-set, so concurrent workers never claim the same job.
+        claimed = ImportJob.objects.filter(_claimable(now), id=job_id).update(
+            status=ImportJob.Status.RUNNING,
+            locked_until=lease,
+            started_at=Coalesce('started_at', now)
+        )
+        if claimed:
+            return ImportJob.objects.select_related('project').get(id=job_id)
+    return None
+
+
+def _run_batch(job: ImportJob, batch: ImportBatch, descriptors):
+    start = time.perf_counter()
+    rows = [CompoundRow(batch.offset + i + 1, *row) for i, row in enumerate(batch.rows)]
+    duplicates = []
+    with transaction.atomic():
+        created = bulk_insert_compounds(
+            job.project, rows, job.batch_size, job.skip_duplicates, duplicates.append, descriptors
+        )
+        batch.delete()
+
+        for duplicate in duplicates[:MAX_REPORTED_DUPLICATES - len(job.duplicate_rows)]:
+            job.duplicate_rows.append({'line': duplicate.row.line, 'compoundId': str(duplicate.compound_id)})
+        lease = timezone.now() + timedelta(seconds=LEASE_SECONDS)
+        updated = ImportJob.objects.filter(id=job.id, locked_until=job.locked_until).update(
+            processed_rows=job.processed_rows + len(rows),
+            inserted=job.inserted + len(created),
+            duplicates=job.duplicates + len(duplicates),
+            duplicate_rows=job.duplicate_rows,
+            elapsed_seconds=job.elapsed_seconds + time.perf_counter() - start,
+            locked_until=lease
+        )
+        if not updated:
+            raise LeaseLost
+    job.refresh_from_db()
+
+
+def run_job(job: ImportJob):
+    """Process a claimed job's remaining batches in offset order."""
+    try:
+        with descriptor_calculator(job.compute_descriptors) as descriptors:
+            while (batch := job.batches.order_by('offset').first()) is not None:
+                _run_batch(job, batch, descriptors)
+    except LeaseLost:
+        return
+    except Exception as error:
+        ImportJob.objects.filter(id=job.id, locked_until=job.locked_until).update(
+            status=ImportJob.Status.FAILED,
+            error=str(error),
+            locked_until=None,
+            finished_at=timezone.now()
+        )
+        return
+    ImportJob.objects.filter(id=job.id, locked_until=job.locked_until).update(
+        status=ImportJob.Status.SUCCEEDED,
+        locked_until=None,
+        finished_at=timezone.now()
+    )
+
+
+def run_pending_jobs() -> int:
+    """Run claimable jobs until none are left; returns how many were run."""
+    count = 0
+    while (job := claim_job()) is not None:
+        run_job(job)
+        count += 1
+    return count
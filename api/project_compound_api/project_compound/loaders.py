@@ -0,0 +1,53 @@
+"""Request-scoped loaders shared by every operation of an HTTP request.
+
+A batched POST runs all of its operations with one context, so the project a
+page's first operation loads is reused by the next ones instead of fetched
+again. Loaders only live as long as the request, and ``extensions.RequestScope``
+clears them around mutations so no operation sees rows from before a write.
+"""
+from dataclasses import dataclass, field
+
+from strawberry.django.context import StrawberryDjangoContext
+
+from .models import Project
+
+
+class RequestLoaders:
+    """Rows loaded by earlier operations of the request, by id."""
+
+    def __init__(self):
+        self.projects = {}
+
+    def project(self, project_id) -> Project:
+        key = str(project_id)
+        project = self.projects.get(key)
+        if project is None:
+            project = self.projects[key] = get_project(project_id)
+        return project
+
+    def clear(self):
+        self.projects.clear()
+
+
+def get_project(project_id) -> Project:
+    return Project.objects.select_related('stats').get(id=project_id)
+
+
+def load_project(info, project_id) -> Project:
+    """``Project`` by id through the request's loaders, if it has any."""
+    loaders = getattr(info.context, 'loaders', None)
+    if loaders is None:
+        return get_project(project_id)
+    return loaders.project(project_id)
+
+
+@dataclass
+class RequestContext(StrawberryDjangoContext):
+    """GraphQL context of one HTTP request, shared by the operations of a batch.
+
+    ``cost`` is the estimated cost of the operations run so far; ``QueryCost``
+    holds the whole request to one budget, so a batch cannot spread a query
+    past the limit over many operations.
+    """
+    loaders: RequestLoaders = field(default_factory=RequestLoaders)
+    cost: int = 0
@@ -0,0 +1,131 @@
+import datetime
+import json
+import platform
+import random
+import subprocess
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+
+from project_compound.benchmark import WORKLOADS, QueryCounter, local_server, run_load, seed_project
+from project_compound.models import Project, Compound
+
+
+def current_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def column(value, width: int, precision: int = 1) -> str:
+    return f"{value:>{width}.{precision}f}" if value is not None else f"{'-':>{width}}"
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the HTTP API with scripted workloads on synthetic projects and write "
+        "latency percentiles, throughput, SQL queries per request and peak RSS to a JSON file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='1000,100000,1000000',
+            help="Comma separated project sizes; seeded projects are kept and reused by later runs."
+        )
+        parser.add_argument(
+            '--workloads', default=','.join(WORKLOADS),
+            help="Comma separated workloads to run."
+        )
+        parser.add_argument('--requests', type=int, default=200, help="Requests per workload and size.")
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default='benchmark-results.json')
+        parser.add_argument('--baseline', help="Results file of an earlier run to compare against.")
+        parser.add_argument(
+            '--url',
+            help="Load-test a running server instead of an in-process one; "
+                 "SQL queries and peak RSS are then not reported."
+        )
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        names = options['workloads'].split(',')
+        unknown = set(names) - set(WORKLOADS)
+        if unknown:
+            raise CommandError(f"Unknown workloads: {', '.join(sorted(unknown))}")
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as file:
+                baseline = {
+                    (result['workload'], result['project_size']): result
+                    for result in json.load(file)['results']
+                }
+
+        projects = {}
+        for size in sizes:
+            projects[size] = seed_project(f"benchmark-{size}", size, seed=options['seed'])
+            self.stdout.write(f"project benchmark-{size} ready")
+        scratch = Project.objects.create(name="benchmark-scratch", description="benchmark writes")
+
+        self.stdout.write(
+            f"{'workload':>10} {'size':>9} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+            f"{'errors':>7} {'SQL/req':>8} {'RSS MB':>8}"
+        )
+        if options['url']:
+            counter, server = None, nullcontext(options['url'])
+        else:
+            counter = QueryCounter(get_wsgi_application())
+            server = local_server(counter)
+        results = []
+        try:
+            with server as base_url:
+                for name in names:
+                    workload = WORKLOADS[name]
+                    count = max(1, int(options['requests'] * workload.request_share))
+                    targets = [(size, projects[size]) for size in sizes] if workload.per_size else [(None, scratch)]
+                    for size, project in targets:
+                        requests = workload.build(project, count, random.Random(options['seed']))
+                        result = {'workload': name, 'project_size': size, **run_load(
+                            base_url, requests, options['concurrency'], counter
+                        )}
+                        results.append(result)
+                        self.write_result(result, baseline)
+        finally:
+            Compound.objects.filter(project=scratch).delete()
+            scratch.delete()
+
+        with open(options['output'], 'w') as file:
+            json.dump({
+                'commit': current_commit(),
+                'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+                'database': connection.vendor,
+                'python': platform.python_version(),
+                'concurrency': options['concurrency'],
+                'url': options['url'],
+                'results': results,
+            }, file, indent=2)
+        self.stdout.write(f"results written to {options['output']}")
+
+    def write_result(self, result, baseline):
+        latency = result['latency_ms']
+        self.stdout.write(
+            f"{result['workload']:>10} {column(result['project_size'], 9, 0)} "
+            f"{column(result['requests_per_second'], 9)} {column(latency['p50'], 9)} "
+            f"{column(latency['p95'], 9)} {column(latency['p99'], 9)} {result['errors']:>7} "
+            f"{column(result['sql_queries_per_request'], 8)} {column(result['peak_rss_mb'], 8, 0)}"
+        )
+        previous = baseline and baseline.get((result['workload'], result['project_size']))
+        if previous:
+            changes = []
+            for label, new, old in (
+                ('p95', latency['p95'], previous['latency_ms']['p95']),
+                ('req/s', result['requests_per_second'], previous['requests_per_second']),
+            ):
+                if new is not None and old:
+                    changes.append(f"{label} {(new - old) / old:+.1%}")
+            self.stdout.write(f"{'':>21}vs baseline: {', '.join(changes)}")
@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from project_compound.benchmark import make_rows
+from project_compound.ingest import bulk_insert_compounds, get_batch_size
+from project_compound.models import Project, Compound
+
+def insert_row_by_row(project, rows):
+    """The pre-bulk ingest path: one autocommitted INSERT per row."""
+    for row in rows:
+        Compound.objects.create(
+            project=project,
+            smiles=row.smiles,
+            mw=row.mw,
+            logD=row.logD,
+            logP=row.logP
+        )
+
+
+class Command(BaseCommand):
+    help = "Compare rows/second of the row-by-row and the chunked bulk compound insert paths."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='1000,10000,100000',
+            help="Comma separated row counts to benchmark."
+        )
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument(
+            '--legacy-max', type=int, default=100000,
+            help="Skip the row-by-row path for sizes above this count."
+        )
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        batch_size = get_batch_size(options['batch_size'])
+        project = Project.objects.create(name="benchmark", description="bulk insert benchmark")
+
+        try:
+            self.stdout.write(f"{'rows':>10} {'path':>12} {'seconds':>10} {'rows/s':>12}")
+            for size in sizes:
+                rows = make_rows(size)
+
+                if size <= options['legacy_max']:
+                    self._report(size, 'row-by-row', lambda: insert_row_by_row(project, rows))
+                    Compound.objects.filter(project=project).delete()
+
+                self._report(size, 'bulk', lambda: bulk_insert_compounds(project, rows, batch_size))
+                Compound.objects.filter(project=project).delete()
+        finally:
+            project.delete()
+
+    def _report(self, size, label, run):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"{size:>10} {label:>12} {elapsed:>10.3f} {size / elapsed:>12.0f}")
@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from project_compound.benchmark import make_rows, peak_rss_mb
+from project_compound.export import EXPORTERS
+from project_compound.ingest import insert_batch
+from project_compound.models import Project, Compound
+
+SEED_BATCH_SIZE = 10000
+
+
+class Command(BaseCommand):
+    help = "Measure throughput and peak RSS of the streaming compound export per format."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000)
+        parser.add_argument(
+            '--formats', default=','.join(EXPORTERS),
+            help="Comma separated export formats to benchmark."
+        )
+
+    def handle(self, *args, **options):
+        project = Project.objects.create(name="benchmark", description="export benchmark")
+        try:
+            # Structure keys and fingerprints are not exported, so they are skipped.
+            for start in range(0, options['rows'], SEED_BATCH_SIZE):
+                size = min(SEED_BATCH_SIZE, options['rows'] - start)
+                insert_batch([
+                    Compound(project=project, smiles=row.smiles, mw=row.mw, logD=row.logD, logP=row.logP)
+                    for row in make_rows(size, seed=start)
+                ])
+
+            self.stdout.write(f"seeded {options['rows']} rows, peak RSS {peak_rss_mb():.0f} MB")
+            self.stdout.write(
+                f"{'format':>10} {'seconds':>10} {'rows/s':>12} {'MB':>10} {'peak RSS MB':>12}"
+            )
+            for file_format in options['formats'].split(','):
+                exporter = EXPORTERS[file_format][0]
+                start = time.perf_counter()
+                size = 0
+                for chunk in exporter(project):
+                    size += len(chunk.encode() if isinstance(chunk, str) else chunk)
+                elapsed = time.perf_counter() - start
+                self.stdout.write(
+                    f"{file_format:>10} {elapsed:>10.2f} {options['rows'] / elapsed:>12.0f} "
+                    f"{size / 2 ** 20:>10.1f} {peak_rss_mb():>12.0f}"
+                )
+        finally:
+            Compound.objects.filter(project=project).delete()
+            project.delete()
@@ -0,0 +1,40 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from project_compound.descriptors import DescriptorCalculator
+from project_compound.ingest import backfill_descriptors, get_batch_size
+from project_compound.models import Project
+
+
+class Command(BaseCommand):
+    help = (
+        "Compute missing mw/logP values from SMILES for existing compounds. With the result "
+        "cache on, run it with the server's RESULT_CACHE and CACHE_REDIS_URL so its reads are invalidated."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--project', type=int, action='append', dest='projects',
+            help="Project id to backfill; repeat for several. Defaults to all projects."
+        )
+        parser.add_argument(
+            '--workers', type=int, default=settings.DESCRIPTOR_WORKERS,
+            help="Worker processes. Defaults to one per core."
+        )
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        batch_size = get_batch_size(options['batch_size'])
+        projects = Project.objects.order_by('id')
+        if options['projects']:
+            projects = projects.filter(id__in=options['projects'])
+
+        with DescriptorCalculator(options['workers']) as calculator:
+            self.stdout.write(f"{'project':>10} {'updated':>10} {'seconds':>10}")
+            for project in projects:
+                start = time.perf_counter()
+                updated = backfill_descriptors(project, batch_size, calculator)
+                elapsed = time.perf_counter() - start
+                self.stdout.write(f"{project.id:>10} {updated:>10} {elapsed:>10.3f}")
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from project_compound.jobs import claim_job, run_job, run_pending_jobs
+from project_compound.purge import claim_purge, run_pending_purges, run_purge
+
+
+class Command(BaseCommand):
+    help = (
+        "Process queued compound import jobs and purges of deleted projects, "
+        "resuming any whose worker stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--poll-interval', type=float, default=2.0,
+            help="Seconds to wait before checking again when no job or purge is queued."
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Run the jobs and purges queued now and exit instead of polling."
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            count = run_pending_jobs()
+            self.stdout.write(f"Ran {count} import job{'s' if count != 1 else ''}.")
+            count = run_pending_purges()
+            self.stdout.write(f"Ran {count} project purge{'s' if count != 1 else ''}.")
+            return
+
+        while True:
+            # Imports first: they are what users wait on.
+            job = claim_job()
+            if job is not None:
+                self.stdout.write(
+                    f"Running import job {job.id} ({job.processed_rows}/{job.total_rows} rows done)."
+                )
+                run_job(job)
+                continue
+            purge = claim_purge()
+            if purge is not None:
+                self.stdout.write(
+                    f"Purging project {purge.project_id} "
+                    f"({purge.purged_compounds}/{purge.total_compounds} compounds done)."
+                )
+                run_purge(purge)
+                continue
+            time.sleep(options['poll_interval'])
@@ -0,0 +1,105 @@
+"""Process-local Prometheus histograms, rendered in the text format at ``/metrics``.
+
+Each worker process keeps its own registry, so with several workers every
+scrape sees the process that served it; scrape them individually or run one
+worker per target.
+"""
+import math
+import threading
+
+# Label values beyond this many series per histogram are reported as OTHER,
+# so clients choosing operation names cannot grow the registry without bound.
+MAX_SERIES = 200
+OTHER = '_other'
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+SIZE_BUCKETS = tuple(256 * 4 ** exponent for exponent in range(9))
+
+REGISTRY = []
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(pairs) -> str:
+    return '{' + ','.join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = (), buckets=DURATION_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(buckets) + (math.inf,)
+        self.series = {}
+        self.lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                if len(self.series) >= MAX_SERIES:
+                    key = (OTHER,) * len(self.labels)
+                series = self.series.setdefault(key, [[0] * len(self.buckets), 0, 0.0])
+            counts = series[0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            series[1] += 1
+            series[2] += value
+
+    def clear(self):
+        with self.lock:
+            self.series.clear()
+
+    def render(self) -> list[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self.lock:
+            series = sorted((key, ([*counts], count, total)) for key, (counts, count, total) in self.series.items())
+        for key, (counts, count, total) in series:
+            pairs = list(zip(self.labels, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(
+                    f'{self.name}_bucket{_format_labels([*pairs, ("le", _format_value(bound))])} {cumulative}'
+                )
+            lines.append(f'{self.name}_sum{_format_labels(pairs)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(pairs)} {count}')
+        return lines
+
+
+def render() -> str:
+    return ''.join(line + '\n' for histogram in REGISTRY for line in histogram.render())
+
+
+OPERATION_DURATION = Histogram(
+    'graphql_operation_duration_seconds', "Wall time of GraphQL operations, from parsing to result.",
+    ('operation_type', 'operation_name')
+)
+OPERATION_SQL_QUERIES = Histogram(
+    'graphql_operation_sql_queries', "SQL queries run by GraphQL operations.",
+    ('operation_type', 'operation_name'), COUNT_BUCKETS
+)
+OPERATION_SQL_DURATION = Histogram(
+    'graphql_operation_sql_duration_seconds', "Time GraphQL operations spent executing SQL.",
+    ('operation_type', 'operation_name')
+)
+RESOLVER_DURATION = Histogram(
+    'graphql_resolver_duration_seconds', "Wall time of GraphQL field resolvers, default resolvers excluded.",
+    ('field',)
+)
+RESPONSE_SIZE = Histogram(
+    'graphql_response_size_bytes', "Size of GraphQL HTTP response bodies.", buckets=SIZE_BUCKETS
+)
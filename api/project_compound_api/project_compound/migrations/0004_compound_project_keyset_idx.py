@@ -0,0 +1,17 @@
+# Generated by Django 6.1.2 on 2026-10-18 01:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project_compound', '0003_compound'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='compound',
+            index=models.Index(fields=['project', 'id'], name='compound_project_keyset_idx'),
+        ),
+    ]
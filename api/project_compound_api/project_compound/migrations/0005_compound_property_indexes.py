@@ -0,0 +1,25 @@
+# Generated by Django 6.1.2 on 2026-10-18 01:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project_compound', '0004_compound_project_keyset_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='compound',
+            index=models.Index(fields=['project', 'mw'], name='compound_project_mw_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='compound',
+            index=models.Index(fields=['project', 'logD'], name='compound_project_logd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='compound',
+            index=models.Index(fields=['project', 'logP'], name='compound_project_logp_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 6.1.2 on 2026-10-18 01:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Sum
+
+PROPERTIES = ('mw', 'logD', 'logP')
+
+
+def backfill_project_stats(apps, schema_editor):
+    Project = apps.get_model('project_compound', 'Project')
+    ProjectStats = apps.get_model('project_compound', 'ProjectStats')
+
+    aggregates = {'compound_count': Count('compounds')}
+    for name in PROPERTIES:
+        aggregates[f'{name}_count'] = Count(f'compounds__{name}')
+        aggregates[f'{name}_sum'] = Sum(f'compounds__{name}', default=0.0)
+        aggregates[f'{name}_min'] = Min(f'compounds__{name}')
+        aggregates[f'{name}_max'] = Max(f'compounds__{name}')
+
+    rows = Project.objects.annotate(**aggregates).values('id', *aggregates)
+    ProjectStats.objects.bulk_create(
+        [ProjectStats(project_id=row.pop('id'), **row) for row in rows],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project_compound', '0005_compound_property_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectStats',
+            fields=[
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='project_compound.project')),
+                ('compound_count', models.BigIntegerField(default=0)),
+                ('mw_count', models.BigIntegerField(default=0)),
+                ('mw_sum', models.FloatField(default=0)),
+                ('mw_min', models.FloatField(blank=True, null=True)),
+                ('mw_max', models.FloatField(blank=True, null=True)),
+                ('logD_count', models.BigIntegerField(default=0)),
+                ('logD_sum', models.FloatField(default=0)),
+                ('logD_min', models.FloatField(blank=True, null=True)),
+                ('logD_max', models.FloatField(blank=True, null=True)),
+                ('logP_count', models.BigIntegerField(default=0)),
+                ('logP_sum', models.FloatField(default=0)),
+                ('logP_min', models.FloatField(blank=True, null=True)),
+                ('logP_max', models.FloatField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_project_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 6.1.2 on 2026-10-18 01:16
+
+from django.db import migrations, models
+
+from project_compound.smiles import structure_key
+
+
+def backfill_structure_keys(apps, schema_editor):
+    Compound = apps.get_model('project_compound', 'Compound')
+    batch = []
+    for compound in Compound.objects.only('id', 'smiles').iterator(chunk_size=1000):
+        compound.smiles_key, compound.smiles_hash = structure_key(compound.smiles)
+        batch.append(compound)
+        if len(batch) == 1000:
+            Compound.objects.bulk_update(batch, ['smiles_key', 'smiles_hash'])
+            batch = []
+    if batch:
+        Compound.objects.bulk_update(batch, ['smiles_key', 'smiles_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project_compound', '0006_project_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='compound',
+            name='smiles_hash',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='compound',
+            name='smiles_key',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.RunPython(backfill_structure_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='compound',
+            index=models.Index(fields=['project', 'smiles_hash'], name='compound_project_hash_idx'),
+        ),
+    ]
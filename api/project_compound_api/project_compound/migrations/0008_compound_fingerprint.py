@@ -0,0 +1,36 @@
+# Generated by Django 6.1.2 on 2026-10-18 01:18
+
+from django.db import migrations, models
+
+from project_compound.fingerprints import pattern_fingerprint
+from project_compound.smiles import parse_smiles
+
+
+def backfill_fingerprints(apps, schema_editor):
+    Compound = apps.get_model('project_compound', 'Compound')
+    batch = []
+    for compound in Compound.objects.only('id', 'smiles').iterator(chunk_size=1000):
+        mol = parse_smiles(compound.smiles)
+        compound.fingerprint = pattern_fingerprint(mol) if mol is not None else None
+        batch.append(compound)
+        if len(batch) == 1000:
+            Compound.objects.bulk_update(batch, ['fingerprint'])
+            batch = []
+    if batch:
+        Compound.objects.bulk_update(batch, ['fingerprint'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project_compound', '0007_compound_structure_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='compound',
+            name='fingerprint',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_fingerprints, migrations.RunPython.noop),
+    ]
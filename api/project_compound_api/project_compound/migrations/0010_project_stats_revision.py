@@ -0,0 +1,18 @@
+# Generated by Django 6.1.2 on 2026-10-18 01:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project_compound', '0009_compound_morgan_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectstats',
+            name='revision',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 6.1.2 on 2026-10-18 01:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project_compound', '0010_project_stats_revision'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('batch_size', models.PositiveIntegerField()),
+                ('skip_duplicates', models.BooleanField(default=False)),
+                ('compute_descriptors', models.BooleanField(default=False)),
+                ('total_rows', models.PositiveIntegerField()),
+                ('processed_rows', models.PositiveIntegerField(default=0)),
+                ('inserted', models.PositiveIntegerField(default=0)),
+                ('duplicates', models.PositiveIntegerField(default=0)),
+                ('duplicate_rows', models.JSONField(default=list)),
+                ('error', models.TextField(blank=True, default='')),
+                ('elapsed_seconds', models.FloatField(default=0)),
+                ('locked_until', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='import_jobs', to='project_compound.project')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ImportBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('offset', models.PositiveIntegerField()),
+                ('rows', models.JSONField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='batches', to='project_compound.importjob')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='importjob',
+            index=models.Index(fields=['status', 'id'], name='import_job_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='importbatch',
+            index=models.Index(fields=['job', 'offset'], name='import_batch_job_offset_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.1.2 on 2026-10-18 09:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project_compound', '0012_project_purge'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='projectstats',
+            old_name='revision',
+            new_name='property_revision',
+        ),
+    ]
@@ -1,8 +1,24 @@
 from django.db import models
 
+from .fingerprints import morgan_fingerprint, pattern_fingerprint
+from .smiles import parse_smiles, structure_key
+
+class ActiveProjectManager(models.Manager):
+    """Projects that have not been deleted."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at=None)
+
+
 class Project(models.Model):
     name = models.CharField(max_length=20, blank=False, null=False)
     description = models.CharField(max_length=200, blank=False, null=False)
+    # Set by deleteProject. The row stays, hidden from ``objects``, until
+    # ``purge.py`` has removed the project's compounds.
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ActiveProjectManager()
+    all_objects = models.Manager()
 
 
 class Compound(models.Model):
@@ -13,3 +29,122 @@ class Compound(models.Model):
     mw = models.FloatField(null=True, blank=True)
     logD = models.FloatField(null=True, blank=True)
     logP = models.FloatField(null=True, blank=True)
+    smiles_key = models.TextField(blank=True, default='')
+    smiles_hash = models.BigIntegerField(null=True, blank=True)
+    fingerprint = models.BinaryField(null=True, blank=True)
+    morgan_fingerprint = models.BinaryField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['project', 'id'], name='compound_project_keyset_idx'),
+            models.Index(fields=['project', 'smiles_hash'], name='compound_project_hash_idx'),
+            models.Index(fields=['project', 'mw'], name='compound_project_mw_idx'),
+            models.Index(fields=['project', 'logD'], name='compound_project_logd_idx'),
+            models.Index(fields=['project', 'logP'], name='compound_project_logp_idx'),
+        ]
+
+    def set_structure(self):
+        """Derive the structure key, hash and fingerprints from ``smiles``."""
+        mol = parse_smiles(self.smiles)
+        self.smiles_key, self.smiles_hash = structure_key(self.smiles, mol)
+        self.fingerprint = pattern_fingerprint(mol) if mol is not None else None
+        self.morgan_fingerprint = morgan_fingerprint(mol) if mol is not None else None
+
+    def save(self, *args, **kwargs):
+        self.set_structure()
+        super().save(*args, **kwargs)
+
+
+class ProjectStats(models.Model):
+    """Compound count and mw/logD/logP aggregates of a project, maintained
+    incrementally by the compound write paths (see ``stats.py``)."""
+    project = models.OneToOneField(
+        Project, on_delete=models.CASCADE, primary_key=True, related_name='stats'
+    )
+    compound_count = models.BigIntegerField(default=0)
+    # Bumped whenever properties (mw/logD/logP) of existing compounds change,
+    # so in-memory indexes holding them know to reload. Inserts and deletes
+    # show up in compound_count, and structures are never rewritten in place.
+    property_revision = models.BigIntegerField(default=0)
+    mw_count = models.BigIntegerField(default=0)
+    mw_sum = models.FloatField(default=0)
+    mw_min = models.FloatField(null=True, blank=True)
+    mw_max = models.FloatField(null=True, blank=True)
+    logD_count = models.BigIntegerField(default=0)
+    logD_sum = models.FloatField(default=0)
+    logD_min = models.FloatField(null=True, blank=True)
+    logD_max = models.FloatField(null=True, blank=True)
+    logP_count = models.BigIntegerField(default=0)
+    logP_sum = models.FloatField(default=0)
+    logP_min = models.FloatField(null=True, blank=True)
+    logP_max = models.FloatField(null=True, blank=True)
+
+
+class ImportJob(models.Model):
+    """A compound import processed in the background by ``run_import_worker``
+    (see ``jobs.py``). Pending rows live in ``ImportBatch`` rows, each deleted
+    in the transaction that inserts its compounds."""
+
+    class Status(models.TextChoices):
+        QUEUED = 'queued'
+        RUNNING = 'running'
+        SUCCEEDED = 'succeeded'
+        FAILED = 'failed'
+
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='import_jobs')
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    batch_size = models.PositiveIntegerField()
+    skip_duplicates = models.BooleanField(default=False)
+    compute_descriptors = models.BooleanField(default=False)
+    total_rows = models.PositiveIntegerField()
+    processed_rows = models.PositiveIntegerField(default=0)
+    inserted = models.PositiveIntegerField(default=0)
+    duplicates = models.PositiveIntegerField(default=0)
+    duplicate_rows = models.JSONField(default=list)
+    error = models.TextField(blank=True, default='')
+    # Time spent processing batches, summed across worker restarts.
+    elapsed_seconds = models.FloatField(default=0)
+    # Lease of the worker running the job; an expired lease lets another
+    # worker resume it.
+    locked_until = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id'], name='import_job_status_idx'),
+        ]
+
+
+class ImportBatch(models.Model):
+    job = models.ForeignKey(ImportJob, on_delete=models.CASCADE, related_name='batches')
+    # Index of the first row of the batch in the job's input.
+    offset = models.PositiveIntegerField()
+    # [smiles, mw, logD, logP] per row.
+    rows = models.JSONField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['job', 'offset'], name='import_batch_job_offset_idx'),
+        ]
+
+
+class ProjectPurge(models.Model):
+    """Background removal of a deleted project and its compounds, run by
+    ``run_import_worker`` (see ``purge.py``). Kept once the project row is
+    gone, as the record of the deletion."""
+    # A plain id rather than a foreign key: the purge outlives the project.
+    project_id = models.BigIntegerField(unique=True)
+    name = models.CharField(max_length=20)
+    total_compounds = models.BigIntegerField()
+    purged_compounds = models.BigIntegerField(default=0)
+    # Lease of the worker running the purge, as for ``ImportJob``.
+    locked_until = models.DateTimeField(null=True, blank=True)
+    deleted_at = models.DateTimeField()
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['finished_at', 'id'], name='project_purge_pending_idx'),
+        ]
@@ -0,0 +1,35 @@
+import base64
+
+MAX_PAGE_SIZE = 1000
+CURSOR_PREFIX = 'compound:'
+
+
+def encode_cursor(pk) -> str:
+    return base64.b64encode(f'{CURSOR_PREFIX}{pk}'.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        value = base64.b64decode(cursor.encode(), validate=True).decode()
+        if not value.startswith(CURSOR_PREFIX):
+            raise ValueError
+        return int(value[len(CURSOR_PREFIX):])
+    except ValueError:
+        raise ValueError("Invalid cursor.") from None
+
+
+def keyset_page(queryset, first: int, after: str | None = None):
+    """Return ``(rows, has_next_page)`` for the page following ``after``.
+
+    Rows are ordered by primary key and the page starts with a ``pk > cursor``
+    range condition instead of an OFFSET, so every page costs the same index
+    seek no matter how deep it is.
+    """
+    if not 1 <= first <= MAX_PAGE_SIZE:
+        raise ValueError(f"first must be between 1 and {MAX_PAGE_SIZE}.")
+
+    if after is not None:
+        queryset = queryset.filter(pk__gt=decode_cursor(after))
+
+    rows = list(queryset.order_by('pk')[:first + 1])
+    return rows[:first], len(rows) > first
@@ -0,0 +1,175 @@
+"""Streaming parsers for compound library files.
+
+Every parser takes an iterable of text lines and lazily yields one
+``CompoundRow`` or ``RejectedRow`` per input record, so arbitrarily large
+files can be ingested in constant memory.
+"""
+import csv
+import re
+from itertools import chain
+from typing import NamedTuple
+
+from .models import Compound
+
+SMILES_MAX_LENGTH = Compound._meta.get_field('smiles').max_length
+
+# Column layout of the upload template: Compound_Name,SMILES,MW,LogD,LogP
+CSV_HEADER = ('Compound_Name', 'SMILES', 'MW', 'LogD', 'LogP')
+CSV_DEFAULT_COLUMNS = {'smiles': 1, 'mw': 2, 'logd': 3, 'logp': 4}
+CSV_HEADER_NAMES = {name.lower() for name in CSV_HEADER}
+
+SDF_FIELD = re.compile(r'^>.*<([^>]+)>')
+
+
+class CompoundRow(NamedTuple):
+    line: int
+    smiles: str
+    mw: float | None
+    logD: float | None
+    logP: float | None
+
+
+class RejectedRow(NamedTuple):
+    line: int
+    reason: str
+
+
+def parse_float_or_none(value: str | None) -> float | None:
+    if value is None or not value.strip():
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def make_row(line: int, smiles: str | None, mw=None, logD=None, logP=None) -> CompoundRow | RejectedRow:
+    smiles = (smiles or '').strip()
+    if not smiles:
+        return RejectedRow(line, "Missing SMILES.")
+    if len(smiles) > SMILES_MAX_LENGTH:
+        return RejectedRow(line, f"SMILES longer than {SMILES_MAX_LENGTH} characters.")
+    return CompoundRow(
+        line,
+        smiles,
+        parse_float_or_none(mw),
+        parse_float_or_none(logD),
+        parse_float_or_none(logP)
+    )
+
+
+def parse_csv(lines):
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+
+    names = [name.strip().lower() for name in header]
+    if 'smiles' in names:
+        columns = {key: names.index(key) if key in names else None for key in CSV_DEFAULT_COLUMNS}
+    else:
+        columns = CSV_DEFAULT_COLUMNS
+    # A first line naming none of the template's columns is already data.
+    records = reader if CSV_HEADER_NAMES.intersection(names) else chain([header], reader)
+
+    def value(values, key):
+        index = columns[key]
+        if index is None or index >= len(values):
+            return None
+        return values[index].strip()
+
+    for values in records:
+        if not any(v.strip() for v in values):
+            continue
+        yield make_row(
+            reader.line_num,
+            value(values, 'smiles'),
+            value(values, 'mw'),
+            value(values, 'logd'),
+            value(values, 'logp')
+        )
+
+
+def parse_smi(lines):
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        yield make_row(line_number, line.split()[0])
+
+
+def parse_sdf(lines):
+    """Parse SD files using the SMILES/MW/LogD/LogP data items of each record.
+
+    The connection table itself is not interpreted, so records without a
+    SMILES data item are rejected.
+    """
+    fields = {}
+    field_name = None
+    record_start = 1
+
+    for line_number, line in enumerate(lines, start=1):
+        line = line.rstrip('\r\n')
+
+        if line.startswith('$$$$'):
+            yield make_row(
+                record_start,
+                fields.get('smiles'),
+                fields.get('mw'),
+                fields.get('logd'),
+                fields.get('logp')
+            )
+            fields = {}
+            field_name = None
+            record_start = line_number + 1
+            continue
+
+        match = SDF_FIELD.match(line)
+        if match:
+            field_name = match.group(1).strip().lower()
+            fields[field_name] = ''
+        elif field_name is not None:
+            if line.strip():
+                fields[field_name] = fields[field_name] or line.strip()
+            else:
+                field_name = None
+
+    if any(fields.values()):
+        yield make_row(
+            record_start,
+            fields.get('smiles'),
+            fields.get('mw'),
+            fields.get('logd'),
+            fields.get('logp')
+        )
+
+
+PARSERS = {
+    'csv': parse_csv,
+    'smi': parse_smi,
+    'sdf': parse_sdf,
+}
+
+EXTENSION_FORMATS = {
+    'csv': 'csv',
+    'smi': 'smi',
+    'smiles': 'smi',
+    'sdf': 'sdf',
+    'sd': 'sdf',
+}
+
+CONTENT_TYPE_FORMATS = {
+    'text/csv': 'csv',
+    'chemical/x-daylight-smiles': 'smi',
+    'chemical/x-mdl-sdfile': 'sdf',
+}
+
+
+def detect_format(filename: str | None = None, content_type: str | None = None) -> str | None:
+    if filename and '.' in filename:
+        extension = filename.rsplit('.', 1)[1].lower()
+        if extension in EXTENSION_FORMATS:
+            return EXTENSION_FORMATS[extension]
+    if content_type:
+        return CONTENT_TYPE_FORMATS.get(content_type.split(';')[0].strip().lower())
+    return None
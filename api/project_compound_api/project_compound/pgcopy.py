@@ -0,0 +1,42 @@
+"""Bulk inserts through PostgreSQL ``COPY ... FROM STDIN``.
+
+COPY streams rows without per-statement parsing and planning, so it beats a
+multi-row INSERT on large batches. It cannot return generated keys, so ids
+are drawn from the table's sequence first, in one round trip, and written
+explicitly; callers get saved instances with primary keys set, as with
+``bulk_create``.
+"""
+from django.db import connections
+from psycopg import sql
+
+
+def copy_insert(objs: list, using: str = 'default') -> list:
+    """Insert unsaved model instances of one model with a single COPY."""
+    if not objs:
+        return objs
+    connection = connections[using]
+    opts = type(objs[0])._meta
+    fields = [field for field in opts.concrete_fields if not field.primary_key]
+    statement = sql.SQL("COPY {} ({}) FROM STDIN").format(
+        sql.Identifier(opts.db_table),
+        sql.SQL(', ').join(sql.Identifier(column) for column in [opts.pk.column, *(f.column for f in fields)])
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)",
+            [opts.db_table, opts.pk.column, len(objs)]
+        )
+        ids = sorted(row[0] for row in cursor.fetchall())
+        with cursor.copy(statement) as copy:
+            for obj, pk in zip(objs, ids):
+                setattr(obj, opts.pk.attname, pk)
+                copy.write_row([
+                    pk,
+                    *(field.get_db_prep_save(field.pre_save(obj, True), connection) for field in fields)
+                ])
+
+    for obj in objs:
+        obj._state.adding = False
+        obj._state.db = using
+    return objs
@@ -0,0 +1,142 @@
+"""Columnar mw/logD/logP store answering property slices without SQL.
+
+Each loaded project holds contiguous ``id``, ``mw``, ``logD`` and ``logP``
+arrays plus one boolean null mask per property (nulls are stored as NaN, so
+range comparisons exclude them like SQL does). Range filters become boolean
+masks, counts and aggregates run over the masked columns and orderings use
+``np.lexsort``; no model instances are built. See ``indexes.py`` for how the
+columns are loaded and kept in sync.
+
+``property_slice`` falls back to SQL when the store is disabled or the request
+needs something the columns do not hold (a structure filter or SMILES order).
+"""
+from typing import NamedTuple
+
+import numpy as np
+from django.conf import settings
+
+from .filters import (
+    FILTER_FIELDS, RANGE_LOOKUPS, CompoundFilter, CompoundOrder, CompoundOrderField, OrderDirection,
+    apply_compound_filter, apply_compound_order
+)
+from .indexes import IndexRegistry, ProjectIndex
+from .models import Compound
+from .stats import PROPERTIES, CompoundSummary, PropertySummary
+
+MAX_SLICE_SIZE = 1000
+
+COMPARISONS = {
+    'gt': np.greater,
+    'gte': np.greater_equal,
+    'lt': np.less,
+    'lte': np.less_equal,
+}
+
+
+class PropertySlice(NamedTuple):
+    total_count: int
+    rows: list[tuple]
+    summary: CompoundSummary
+
+
+class PropertyColumns(ProjectIndex):
+    fields = PROPERTIES
+    columns = {
+        **{name: (np.float64, ()) for name in PROPERTIES},
+        **{f'{name}_null': (np.bool_, ()) for name in PROPERTIES},
+    }
+
+    def convert(self, rows) -> dict[str, np.ndarray]:
+        columns = {}
+        for position, name in enumerate(PROPERTIES, 1):
+            values = np.array([row[position] for row in rows], dtype=np.float64)
+            columns[name] = values
+            columns[f'{name}_null'] = np.isnan(values)
+        return columns
+
+    def mask(self, compound_filter: CompoundFilter | None) -> np.ndarray:
+        mask = np.ones(self.size, dtype=np.bool_)
+        if compound_filter is None:
+            return mask
+        for field in FILTER_FIELDS:
+            value_range = getattr(compound_filter, field)
+            if value_range is None:
+                continue
+            values = self.column(field)
+            for lookup in RANGE_LOOKUPS:
+                bound = getattr(value_range, lookup)
+                if bound is not None:
+                    mask &= COMPARISONS[lookup](values, bound)
+            if value_range.is_null is not None:
+                nulls = self.column(f'{field}_null')
+                mask &= nulls if value_range.is_null else ~nulls
+        return mask
+
+    def order(self, positions: np.ndarray, order_by: list[CompoundOrder] | None) -> np.ndarray:
+        """Sort ``positions`` like ``apply_compound_order``: nulls last, id last."""
+        ids = self.column('id')[positions]
+        order_by = order_by or []
+        keys = [] if any(o.field == CompoundOrderField.ID for o in order_by) else [ids]
+        for order in reversed(order_by):
+            descending = order.direction == OrderDirection.DESC
+            if order.field == CompoundOrderField.ID:
+                keys.append(-ids if descending else ids)
+                continue
+            values = self.column(order.field.value)[positions]
+            nulls = self.column(f'{order.field.value}_null')[positions]
+            values = np.where(nulls, 0.0, values)
+            keys.append(-values if descending else values)
+            keys.append(nulls)
+        return positions[np.lexsort(keys)]
+
+    def slice(self, compound_filter, order_by, first: int) -> PropertySlice:
+        with self.lock:
+            positions = np.flatnonzero(self.mask(compound_filter))
+            summary = CompoundSummary(len(positions), {})
+            for name in PROPERTIES:
+                values = self.column(name)[positions]
+                values = values[~self.column(f'{name}_null')[positions]]
+                summary.properties[name] = PropertySummary(
+                    len(values),
+                    float(values.sum()),
+                    float(values.min()) if len(values) else None,
+                    float(values.max()) if len(values) else None
+                )
+            page = self.order(positions, order_by)[:first]
+            columns = [self.column('id')[page]] + [self.column(name)[page] for name in PROPERTIES]
+            nulls = [self.column(f'{name}_null')[page] for name in PROPERTIES]
+
+        rows = []
+        for i in range(len(page)):
+            rows.append((int(columns[0][i]),) + tuple(
+                None if nulls[j][i] else float(columns[j + 1][i]) for j in range(len(PROPERTIES))
+            ))
+        return PropertySlice(len(positions), rows, summary)
+
+
+property_columns = IndexRegistry(PropertyColumns, settings.PROPERTY_STORE['MAX_PROJECTS'])
+
+
+def _supported(compound_filter: CompoundFilter | None, order_by: list[CompoundOrder] | None) -> bool:
+    if compound_filter is not None and compound_filter.structure is not None:
+        return False
+    return not any(order.field == CompoundOrderField.SMILES for order in order_by or [])
+
+
+def _sql_slice(project, compound_filter, order_by, first: int) -> PropertySlice:
+    compounds = apply_compound_filter(Compound.objects.filter(project=project), compound_filter)
+    summary = CompoundSummary.of_queryset(compounds)
+    rows = apply_compound_order(compounds, order_by)
+    if not order_by:
+        rows = rows.order_by('id')
+    return PropertySlice(summary.count, list(rows.values_list('id', *PROPERTIES)[:first]), summary)
+
+
+def property_slice(project, compound_filter, order_by, first: int) -> PropertySlice:
+    """Filtered count, per-property aggregates and the first ``first`` rows
+    (id plus properties) of a project, ordered like ``compounds``."""
+    if not 1 <= first <= MAX_SLICE_SIZE:
+        raise ValueError(f"first must be between 1 and {MAX_SLICE_SIZE}.")
+    if settings.PROPERTY_STORE['ENABLED'] and _supported(compound_filter, order_by):
+        return property_columns.get(project.id).slice(compound_filter, order_by, first)
+    return _sql_slice(project, compound_filter, order_by, first)
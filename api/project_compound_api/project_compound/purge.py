@@ -0,0 +1,119 @@
+"""Project deletion with a deferred, batched purge of the compounds.
+
+``soft_delete_project`` only marks the project deleted, which hides it from
+``Project.objects`` and so from every query and mutation, and queues a
+``ProjectPurge``. Workers (``manage.py run_import_worker``) claim purges with
+a lease, like import jobs. Each batch deletes the project's next
+``PURGE_BATCH_SIZE`` compounds with one set-based DELETE over an id range and
+records its progress in the same transaction. When none are left, the project
+row is deleted with its stats and import jobs.
+"""
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .cache import invalidate_project
+from .jobs import LEASE_SECONDS, LeaseLost
+from .models import Compound, ImportJob, Project, ProjectPurge
+from .stats import get_project_stats
+
+PURGE_BATCH_SIZE = 5000
+
+logger = logging.getLogger(__name__)
+
+
+def soft_delete_project(project: Project) -> ProjectPurge:
+    """Hide ``project`` at once and queue the purge of its compounds."""
+    now = timezone.now()
+    with transaction.atomic():
+        # Compare-and-set, so a project is only queued for purging once.
+        if not Project.objects.filter(id=project.id).update(deleted_at=now):
+            raise Project.DoesNotExist("Project matching query does not exist.")
+        project.deleted_at = now
+        # A running import loses its lease and stops before its next batch commits.
+        ImportJob.objects.filter(
+            project=project, status__in=[ImportJob.Status.QUEUED, ImportJob.Status.RUNNING]
+        ).update(
+            status=ImportJob.Status.FAILED,
+            error="The project was deleted.",
+            locked_until=None,
+            finished_at=now
+        )
+        purge = ProjectPurge.objects.create(
+            project_id=project.id,
+            name=project.name,
+            total_compounds=get_project_stats(project).compound_count,
+            deleted_at=now
+        )
+        invalidate_project(project.id, listing=True)
+    return purge
+
+
+def _claimable(now):
+    return Q(finished_at=None) & (Q(locked_until=None) | Q(locked_until__lt=now))
+
+
+def claim_purge() -> ProjectPurge | None:
+    """Lease the oldest unfinished purge that no live worker holds."""
+    now = timezone.now()
+    lease = now + timedelta(seconds=LEASE_SECONDS)
+    candidates = ProjectPurge.objects.filter(_claimable(now)).order_by('id').values_list('id', flat=True)[:10]
+    for purge_id in candidates:
+        if ProjectPurge.objects.filter(_claimable(now), id=purge_id).update(locked_until=lease):
+            return ProjectPurge.objects.get(id=purge_id)
+    return None
+
+
+def _purge_batch(purge: ProjectPurge) -> int:
+    """Delete the project's next batch of compounds; returns how many."""
+    with transaction.atomic():
+        compounds = Compound.objects.filter(project_id=purge.project_id)
+        # The batch's last id, read from the (project, id) index.
+        ids = compounds.order_by('id').values_list('id', flat=True)
+        last_id = next(iter(ids[PURGE_BATCH_SIZE - 1:PURGE_BATCH_SIZE]), None)
+        if last_id is not None:
+            compounds = compounds.filter(id__lte=last_id)
+        deleted, _ = compounds.delete()
+
+        lease = timezone.now() + timedelta(seconds=LEASE_SECONDS)
+        updated = ProjectPurge.objects.filter(id=purge.id, locked_until=purge.locked_until).update(
+            purged_compounds=F('purged_compounds') + deleted,
+            locked_until=lease
+        )
+        if not updated:
+            raise LeaseLost
+    purge.refresh_from_db()
+    return deleted
+
+
+def run_purge(purge: ProjectPurge):
+    """Purge a claimed project's compounds batch by batch, then the project."""
+    try:
+        while _purge_batch(purge) == PURGE_BATCH_SIZE:
+            pass
+        with transaction.atomic():
+            # Compounds an upload still added are removed by the cascade.
+            Project.all_objects.filter(id=purge.project_id).delete()
+            updated = ProjectPurge.objects.filter(id=purge.id, locked_until=purge.locked_until).update(
+                locked_until=None,
+                finished_at=timezone.now()
+            )
+            if not updated:
+                raise LeaseLost
+    except LeaseLost:
+        return
+    except Exception:
+        # Left to its lease, so a worker retries it once that expires.
+        logger.exception("Purge of project %s failed", purge.project_id)
+
+
+def run_pending_purges() -> int:
+    """Run claimable purges until none are left; returns how many were run."""
+    count = 0
+    while (purge := claim_purge()) is not None:
+        run_purge(purge)
+        count += 1
+    return count
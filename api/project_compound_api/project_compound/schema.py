@@ -0,0 +1,39 @@
+"""The GraphQL API: projects and compounds in one schema.
+
+Served at ``graphql/``; ``projects/`` and ``compounds/`` are kept as aliases
+for existing clients. An HTTP POST may carry a list of operations, executed
+with one shared ``loaders.RequestContext``.
+"""
+import strawberry
+from django.conf import settings
+from strawberry.schema.config import StrawberryConfig
+from strawberry.tools import merge_types
+from strawberry_django.optimizer import DjangoOptimizerExtension
+
+from .extensions import DocumentCache, QueryCost, RequestScope, Tracing
+from .schema_compound import COMPOUND_FIELD_COSTS, CompoundMutation, CompoundQuery, CompoundSubscription
+from .schema_project import ProjectMutation, ProjectQuery
+
+Query = merge_types('Query', (ProjectQuery, CompoundQuery))
+Mutation = merge_types('Mutation', (ProjectMutation, CompoundMutation))
+Subscription = merge_types('Subscription', (CompoundSubscription,))
+
+document_cache = DocumentCache.for_schema()
+
+schema = strawberry.Schema(
+    query=Query,
+    mutation=Mutation,
+    subscription=Subscription,
+    # Tracing comes last: strawberry does not unwind the hooks entered before
+    # one that raises (an unknown persisted query, an over-budget operation),
+    # which would leave the operation's trace set on the thread.
+    extensions=[
+        DjangoOptimizerExtension, document_cache, QueryCost.for_schema(COMPOUND_FIELD_COSTS), RequestScope, Tracing
+    ],
+    config=StrawberryConfig(batching_config={'max_operations': settings.GRAPHQL_BATCH_MAX_OPERATIONS})
+)
+
+# The schemas and document caches of the former projects/ and compounds/
+# endpoints, now the unified ones.
+project_schema = compound_schema = schema
+project_document_cache = compound_document_cache = document_cache
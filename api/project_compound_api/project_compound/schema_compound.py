@@ -1,7 +1,26 @@
 import strawberry
-from typing import List
-from .models import Project, Compound
-from .types import CompoundType
+import strawberry_django
+from typing import AsyncGenerator, List
+from django.db import transaction
+from strawberry.types.nodes import SelectedField
+from .cache import cached_result, invalidate_project, project_namespace
+from .cost import FieldCost
+from .models import Project, Compound, ImportJob
+from .types import (
+    CompoundType, CompoundConnection, CompoundEdge, PageInfo, SimilarCompound, SubstructureSearchResult,
+    CompoundProperties, CompoundPropertySlice, PropertyStoreUsage, ImportJobType, CompoundChange,
+    DeleteCompoundsResult, UpdateCompoundsResult, compound_change, summary_stats
+)
+from .ingest import bulk_delete_compounds, bulk_insert_compounds, bulk_update_properties
+from .jobs import enqueue_import
+from .loaders import load_project
+from .stats import PROPERTIES, CompoundSummary, record_deleted, record_inserted
+from .pagination import encode_cursor, keyset_page
+from .search import similarity_search, substructure_search
+from .indexes import index_compounds, unindex_compounds
+from .changes import CHANGE_MESSAGE_TYPE, project_group, publish_deleted, publish_inserted
+from .property_store import property_columns, property_slice
+from .filters import CompoundFilter, CompoundOrder, apply_compound_filter, apply_compound_order
 
 
 @strawberry.input
@@ -12,22 +31,148 @@ class CompoundInput:
     logP: float | None = None
 
 
+@strawberry.input(description="New properties of a compound; omitted ones keep their value, null clears one.")
+class CompoundUpdateInput:
+    id: strawberry.ID
+    mw: float | None = strawberry.UNSET
+    logD: float | None = strawberry.UNSET
+    logP: float | None = strawberry.UNSET
+
+
+def _selects(selections, name: str) -> bool:
+    """Whether ``name`` is selected, directly or through fragments."""
+    for selection in selections:
+        if isinstance(selection, SelectedField):
+            if selection.name == name:
+                return True
+        elif _selects(selection.selections, name):
+            return True
+    return False
+
+
 @strawberry.type
 class CompoundQuery:
-    @strawberry.field
-    def compounds(self, project_id: strawberry.ID, compound_id: strawberry.ID = None) -> List[CompoundType]:
-        project = Project.objects.get(id=project_id)
-        compounds = Compound.objects.filter(project=project)
-        
-        if compound_id:
-            return [compounds.get(id=compound_id)]
-        
-        return list(compounds)
+    @strawberry_django.field
+    def compounds(
+        self,
+        info: strawberry.Info,
+        project_id: strawberry.ID,
+        compound_id: strawberry.ID = None,
+        filter: CompoundFilter | None = None,
+        order_by: List[CompoundOrder] | None = None
+    ) -> List[CompoundType]:
+        def load():
+            project = load_project(info, project_id)
+            compounds = Compound.objects.filter(project=project)
+            
+            if compound_id:
+                return [compounds.select_related('project').get(id=compound_id)]
+            
+            compounds = apply_compound_filter(compounds, filter)
+            return apply_compound_order(compounds, order_by)
+
+        return cached_result(
+            'compounds',
+            (project_id, compound_id, filter, order_by),
+            [project_namespace(project_id)],
+            load,
+            select_related=('project',)
+        )
+
+    @strawberry_django.field
+    def compounds_connection(
+        self,
+        info: strawberry.Info,
+        project_id: strawberry.ID,
+        first: int = 100,
+        after: str | None = None,
+        filter: CompoundFilter | None = None
+    ) -> CompoundConnection:
+        project = load_project(info, project_id)
+        compounds = apply_compound_filter(Compound.objects.filter(project=project), filter)
+        rows, has_next_page = keyset_page(compounds, first, after)
+        for row in rows:
+            row.project = project
+        edges = [CompoundEdge(cursor=encode_cursor(row.pk), node=row) for row in rows]
+
+        return CompoundConnection(
+            edges=edges,
+            page_info=PageInfo(
+                has_next_page=has_next_page,
+                end_cursor=edges[-1].cursor if edges else None
+            ),
+            queryset=compounds
+        )
+
+    @strawberry_django.field
+    def substructure_search(
+        self, info: strawberry.Info, project_id: strawberry.ID, query: str
+    ) -> SubstructureSearchResult:
+        def load():
+            project = load_project(info, project_id)
+            return substructure_search(project, query)
+
+        matches = cached_result(
+            'substructure_search', (project_id, query), [project_namespace(project_id)], load
+        )
+        return SubstructureSearchResult(
+            compounds=matches.compounds,
+            candidates=matches.candidates,
+            screened_out=matches.screened_out
+        )
+
+    @strawberry_django.field
+    def similar_compounds(
+        self,
+        info: strawberry.Info,
+        project_id: strawberry.ID,
+        smiles: str,
+        k: int = 50,
+        threshold: float = 0.0
+    ) -> List[SimilarCompound]:
+        project = load_project(info, project_id)
+        return [
+            SimilarCompound(compound=compound, similarity=similarity)
+            for compound, similarity in similarity_search(project, smiles, k, threshold)
+        ]
+
+    @strawberry_django.field
+    def compound_properties(
+        self,
+        info: strawberry.Info,
+        project_id: strawberry.ID,
+        filter: CompoundFilter | None = None,
+        order_by: List[CompoundOrder] | None = None,
+        first: int = 100
+    ) -> CompoundPropertySlice:
+        project = load_project(info, project_id)
+        result = property_slice(project, filter, order_by, first)
+        return CompoundPropertySlice(
+            total_count=result.total_count,
+            rows=[
+                CompoundProperties(id=id, mw=mw, logD=logD, logP=logP)
+                for id, mw, logD, logP in result.rows
+            ],
+            mw_stats=summary_stats(result.summary.properties['mw']),
+            logD_stats=summary_stats(result.summary.properties['logD']),
+            logP_stats=summary_stats(result.summary.properties['logP'])
+        )
+
+    @strawberry_django.field
+    def property_store_usage(self) -> List[PropertyStoreUsage]:
+        return [
+            PropertyStoreUsage(project_id=index.project_id, rows=index.size, bytes=index.memory_bytes())
+            for index in property_columns.loaded_indexes()
+        ]
+
+    @strawberry_django.field
+    def import_job(self, id: strawberry.ID) -> ImportJobType:
+        return ImportJob.objects.select_related('project').get(id=id)
 
 
 @strawberry.type
 class CompoundMutation:
-    @strawberry.field
+    @strawberry_django.field
     def create_compound(
         self,
         project_id: strawberry.ID,
@@ -37,18 +182,23 @@ class CompoundMutation:
         logP: float = None
     ) -> CompoundType:
         project = Project.objects.get(id=project_id)
-        compound = Compound.objects.create(
-            project=project,
-            smiles=smiles,
-            mw=mw,
-            logD=logD,
-            logP=logP
-        )
+        with transaction.atomic():
+            compound = Compound.objects.create(
+                project=project,
+                smiles=smiles,
+                mw=mw,
+                logD=logD,
+                logP=logP
+            )
+            record_inserted(project.id, CompoundSummary().add([compound]))
+            index_compounds(project.id, [compound])
+            publish_inserted(project.id, [compound])
+            invalidate_project(project.id, listing=True)
         return compound
     
-    @strawberry.field
+    @strawberry_django.field
     def delete_compound(self, id: strawberry.ID) -> CompoundType:
-        compound = Compound.objects.get(id=id)
+        compound = Compound.objects.get(id=id, project__deleted_at=None)
         deleted_compound = CompoundType(
             id=compound.id,
             project=compound.project,
@@ -57,30 +207,125 @@ class CompoundMutation:
             logD=compound.logD,
             logP=compound.logP
         )
-        compound.delete()
+        with transaction.atomic():
+            compound.delete()
+            record_deleted(compound.project_id, CompoundSummary().add([deleted_compound]))
+            unindex_compounds(compound.project_id, [deleted_compound.id])
+            publish_deleted(compound.project_id, [deleted_compound.id])
+            invalidate_project(compound.project_id, listing=True)
         return deleted_compound
     
-    @strawberry.field
+    @strawberry_django.field(description="Delete a project's compounds by ids or by filter.")
+    def delete_compounds(
+        self,
+        info: strawberry.Info,
+        project_id: strawberry.ID,
+        ids: List[strawberry.ID] | None = None,
+        filter: CompoundFilter | None = None,
+        batch_size: int | None = None
+    ) -> DeleteCompoundsResult:
+        project = Project.objects.get(id=project_id)
+        selections = info.selected_fields[0].selections
+        load_structures = _selects(selections, 'compounds')
+        # Deleted rows are only kept when the client reads them.
+        deleted = []
+        count = bulk_delete_compounds(
+            project,
+            ids=ids,
+            compound_filter=filter,
+            batch_size=batch_size,
+            on_deleted=deleted.extend if load_structures or _selects(selections, 'ids') else None,
+            load_structures=load_structures
+        )
+        return DeleteCompoundsResult(
+            deleted_count=count,
+            ids=[compound.pk for compound in deleted],
+            compounds=deleted
+        )
+
+    @strawberry_django.field(description="Set properties of a project's compounds.")
+    def update_compounds(
+        self,
+        project_id: strawberry.ID,
+        compounds: List[CompoundUpdateInput],
+        batch_size: int | None = None
+    ) -> UpdateCompoundsResult:
+        project = Project.objects.get(id=project_id)
+        changes = {}
+        for row in compounds:
+            values = {
+                name: getattr(row, name) for name in PROPERTIES if getattr(row, name) is not strawberry.UNSET
+            }
+            changes.setdefault(int(row.id), {}).update(values)
+        updated = bulk_update_properties(project, changes, batch_size=batch_size)
+        ids = [compound.pk for compound in updated]
+        return UpdateCompoundsResult(
+            updated_count=len(updated),
+            ids=ids,
+            queryset=Compound.objects.filter(project=project, id__in=ids).select_related('project').order_by('id')
+        )
+
+    @strawberry_django.field
     def bulk_create_compounds(
         self,
         project_id: strawberry.ID,
-        compounds: List[CompoundInput]
+        compounds: List[CompoundInput],
+        batch_size: int | None = None,
+        skip_duplicates: bool = False,
+        compute_descriptors: bool = False
     ) -> List[CompoundType]:
         project = Project.objects.get(id=project_id)
-        created_compounds = []
-        
-        for compound_input in compounds:
-            compound = Compound.objects.create(
-                project=project,
-                smiles=compound_input.smiles,
-                mw=compound_input.mw,
-                logD=compound_input.logD,
-                logP=compound_input.logP
-            )
-            created_compounds.append(compound)
-        
-        return created_compounds
+        return bulk_insert_compounds(
+            project,
+            compounds,
+            batch_size=batch_size,
+            skip_duplicates=skip_duplicates,
+            compute_descriptors=compute_descriptors
+        )
 
+    @strawberry_django.field(
+        description="Queue compounds for a background import; poll the returned job with importJob."
+    )
+    def import_compounds(
+        self,
+        project_id: strawberry.ID,
+        compounds: List[CompoundInput],
+        batch_size: int | None = None,
+        skip_duplicates: bool = False,
+        compute_descriptors: bool = False
+    ) -> ImportJobType:
+        project = Project.objects.get(id=project_id)
+        return enqueue_import(
+            project,
+            compounds,
+            batch_size=batch_size,
+            skip_duplicates=skip_duplicates,
+            compute_descriptors=compute_descriptors
+        )
+
+
+@strawberry.type
+class CompoundSubscription:
+    @strawberry.subscription(description="Compound inserts and deletes in a project, as they commit.")
+    async def compound_changes(
+        self, info: strawberry.Info, project_id: strawberry.ID
+    ) -> AsyncGenerator[CompoundChange, None]:
+        project = await Project.objects.aget(id=project_id)
+        consumer = info.context['ws']
+        async with consumer.listen_to_channel(CHANGE_MESSAGE_TYPE, groups=[project_group(project.id)]) as events:
+            async for event in events:
+                yield compound_change(event)
 
-compound_schema = strawberry.Schema(query=CompoundQuery, mutation=CompoundMutation)
 
+# Cost hints for QueryCost, keyed by the type names of the served schema (see
+# schema.py); unlisted lists are assumed to hold DEFAULT_LIST_SIZE items.
+# Mutation inputs are bounded by DATA_UPLOAD_MAX_MEMORY_SIZE instead.
+COMPOUND_FIELD_COSTS = {
+    'Query.compounds': FieldCost(size=1000),
+    'Query.compoundsConnection': FieldCost(size_argument='first', sized_fields=('edges',)),
+    'CompoundConnection.totalCount': FieldCost(weight=10),
+    'Query.substructureSearch': FieldCost(weight=100),
+    'SubstructureSearchResult.compounds': FieldCost(size=1000),
+    'Query.similarCompounds': FieldCost(weight=2, size_argument='k'),
+    'Query.compoundProperties': FieldCost(size_argument='first', sized_fields=('rows',)),
+}
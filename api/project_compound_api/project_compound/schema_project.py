@@ -1,45 +1,54 @@
 import strawberry
+import strawberry_django
 from typing import List
-from .models import Project
-from .types import ProjectType
+from django.db import transaction
+from .cache import PROJECTS_NAMESPACE, cached_result, invalidate, invalidate_project
+from .loaders import load_project
+from .models import Project, ProjectPurge, ProjectStats
+from .purge import soft_delete_project
+from .types import ProjectPurgeType, ProjectType
 
 
 @strawberry.type
 class ProjectQuery:
-    @strawberry.field
-    def projects(self, id: strawberry.ID = None) -> List[ProjectType]:
-        if id:
-            return [Project.objects.get(id=id)]
-        
-        return Project.objects.all()
+    @strawberry_django.field
+    def projects(self, info: strawberry.Info, id: strawberry.ID = None) -> List[ProjectType]:
+        def load():
+            if id:
+                return [load_project(info, id)]
+            
+            return Project.objects.all()
+
+        return cached_result('projects', (id,), [PROJECTS_NAMESPACE], load, select_related=('stats',))
+
+    @strawberry_django.field(description="Progress of the background purge of a deleted project.")
+    def project_purge(self, project_id: strawberry.ID) -> ProjectPurgeType:
+        return ProjectPurge.objects.get(project_id=project_id)
 
 
 @strawberry.type
 class ProjectMutation:
-    @strawberry.field
+    @strawberry_django.field
     def create_project(self, name: str, description: str) -> ProjectType:
-        project = Project.objects.create(name=name, description=description)
+        with transaction.atomic():
+            project = Project.objects.create(name=name, description=description)
+            ProjectStats.objects.create(project=project)
+            invalidate(PROJECTS_NAMESPACE)
         return project
     
-    @strawberry.field
+    @strawberry_django.field
     def update_project(self, id: strawberry.ID, name: str, description: str) -> ProjectType:
         project = Project.objects.get(id=id)
         project.name = name
         project.description = description
         project.save()
+        invalidate_project(project.id, listing=True)
         return project
 
-    @strawberry.field
+    @strawberry_django.field(
+        description="Hides the project at once; its compounds are purged in the background (see projectPurge)."
+    )
     def delete_project(self, id: strawberry.ID) -> ProjectType:
-        project = Project.objects.get(id=id)
-        deleted_project = ProjectType(
-            id=project.id,
-            name=project.name,
-            description=project.description
-        )
-        project.delete()
-        return deleted_project
-
-
-project_schema = strawberry.Schema(query=ProjectQuery, mutation=ProjectMutation)
-
+        project = Project.objects.select_related('stats').get(id=id)
+        soft_delete_project(project)
+        return project
@@ -0,0 +1,102 @@
+"""Structure search over a project's compounds.
+
+Substructure searches screen against the project's pattern fingerprints, held
+in memory as a contiguous ``(n, PATTERN_FP_WORDS)`` ``uint64`` array by a
+``PatternIndex`` (see ``indexes.py`` for how it is built and kept in sync).
+"""
+from typing import NamedTuple
+
+import numpy as np
+from rdkit import Chem
+
+from .fingerprints import PATTERN_FP_WORDS, as_words, morgan_fingerprint, pattern_fingerprint, screen
+from .indexes import IndexRegistry, ProjectIndex
+from .models import Compound
+from .similarity import similarity_indexes
+from .smiles import parse_smiles
+
+MATCH_CHUNK_SIZE = 500
+MAX_SIMILAR_COMPOUNDS = 1000
+MAX_PATTERN_INDEXED_PROJECTS = 32
+
+
+class SubstructureMatches(NamedTuple):
+    compounds: list[Compound]
+    candidates: int
+    screened_out: int
+
+
+class PatternIndex(ProjectIndex):
+    fields = ('fingerprint',)
+    columns = {
+        'fingerprint': (np.uint64, (PATTERN_FP_WORDS,)),
+    }
+
+    def accepts(self, row) -> bool:
+        return row[1] is not None
+
+    def convert(self, rows) -> dict[str, np.ndarray]:
+        fingerprints = np.frombuffer(
+            b''.join(bytes(fingerprint) for _, fingerprint in rows), dtype='<u8'
+        ).reshape(-1, PATTERN_FP_WORDS)
+        return {'fingerprint': fingerprints}
+
+    def screen(self, query: bytes) -> tuple[np.ndarray, int]:
+        """Return the ids, in order, of compounds having every bit of the
+        ``query`` fingerprint, and the number of compounds screened."""
+        with self.lock:
+            survivors = self.column('id')[screen(self.column('fingerprint'), as_words(query))]
+            return survivors, self.size
+
+
+pattern_indexes = IndexRegistry(PatternIndex, MAX_PATTERN_INDEXED_PROJECTS)
+
+
+def substructure_search(project, query: str) -> SubstructureMatches:
+    """Find compounds of ``project`` containing the ``query`` SMILES (or SMARTS).
+
+    Candidates are screened with a vectorized bitwise AND over the project's
+    in-memory pattern fingerprints; only survivors are parsed and matched
+    atom by atom.
+    """
+    query_mol = parse_smiles(query)
+    if query_mol is None:
+        query_mol = Chem.MolFromSmarts(query)
+    if query_mol is None:
+        raise ValueError("Invalid substructure query.")
+
+    compounds = Compound.objects.filter(project=project)
+    survivors, candidates = pattern_indexes.get(project.id).screen(pattern_fingerprint(query_mol))
+
+    matches = []
+    survivor_ids = survivors.tolist()
+    for start in range(0, len(survivor_ids), MATCH_CHUNK_SIZE):
+        chunk = survivor_ids[start:start + MATCH_CHUNK_SIZE]
+        for compound in compounds.filter(id__in=chunk).defer('fingerprint', 'morgan_fingerprint').order_by('id'):
+            mol = parse_smiles(compound.smiles)
+            if mol is not None and mol.HasSubstructMatch(query_mol):
+                compound.project = project
+                matches.append(compound)
+
+    return SubstructureMatches(matches, candidates, candidates - len(survivors))
+
+
+def similarity_search(project, smiles: str, k: int, threshold: float) -> list[tuple[Compound, float]]:
+    """Top ``k`` compounds of ``project`` by Tanimoto similarity to ``smiles``."""
+    if not 1 <= k <= MAX_SIMILAR_COMPOUNDS:
+        raise ValueError(f"k must be between 1 and {MAX_SIMILAR_COMPOUNDS}.")
+    if not 0 <= threshold <= 1:
+        raise ValueError("threshold must be between 0 and 1.")
+    mol = parse_smiles(smiles)
+    if mol is None:
+        raise ValueError("Invalid SMILES.")
+
+    hits, _ = similarity_indexes.get(project.id).search(morgan_fingerprint(mol), k, threshold)
+    compounds = Compound.objects.in_bulk([hit.compound_id for hit in hits])
+    results = []
+    for hit in hits:
+        compound = compounds.get(hit.compound_id)
+        if compound is not None:
+            compound.project = project
+            results.append((compound, hit.similarity))
+    return results
@@ -0,0 +1,78 @@
+"""In-memory Tanimoto similarity index, one per project.
+
+A project's Morgan fingerprints are held as a contiguous ``(n, MORGAN_FP_WORDS)``
+``uint64`` array next to their popcounts. A search computes
+``|A & B| / (|A| + |B| - |A & B|)`` with vectorized popcounts, after pruning
+every compound whose bit count alone rules out the threshold
+(``|B| < t|A|`` or ``|B| > |A|/t``), and selects the top k with a partial sort.
+See ``indexes.py`` for how the index is built and kept in sync.
+"""
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+from .fingerprints import MORGAN_FP_WORDS, as_words
+from .indexes import IndexRegistry, ProjectIndex
+
+MAX_INDEXED_PROJECTS = 32
+
+
+class SimilarityHit(NamedTuple):
+    compound_id: int
+    similarity: float
+
+
+class SimilarityIndex(ProjectIndex):
+    fields = ('morgan_fingerprint',)
+    columns = {
+        'fingerprint': (np.uint64, (MORGAN_FP_WORDS,)),
+        'count': (np.int32, ()),
+    }
+
+    def accepts(self, row) -> bool:
+        return row[1] is not None
+
+    def convert(self, rows) -> dict[str, np.ndarray]:
+        fingerprints = np.frombuffer(
+            b''.join(bytes(fingerprint) for _, fingerprint in rows), dtype='<u8'
+        ).reshape(-1, MORGAN_FP_WORDS)
+        return {'fingerprint': fingerprints, 'count': np.bitwise_count(fingerprints).sum(axis=1)}
+
+    def search(self, query: bytes, k: int, threshold: float) -> tuple[list[SimilarityHit], int]:
+        """Return the top ``k`` hits at or above ``threshold``, most similar
+        first, and the number of compounds pruned by their bit counts."""
+        query = as_words(query)
+        query_count = int(np.bitwise_count(query).sum())
+        with self.lock:
+            if query_count == 0 or self.size == 0:
+                return [], 0
+            ids = self.column('id')
+            counts = self.column('count')
+
+            if threshold > 0:
+                low = math.ceil(threshold * query_count - 1e-9)
+                high = math.floor(query_count / threshold + 1e-9)
+                candidates = np.flatnonzero((counts >= low) & (counts <= high))
+            else:
+                candidates = np.arange(self.size)
+            pruned = self.size - len(candidates)
+
+            common = np.bitwise_count(self.column('fingerprint')[candidates] & query).sum(axis=1)
+            similarities = common / (query_count + counts[candidates] - common)
+            keep = similarities >= threshold
+            candidates, similarities = candidates[keep], similarities[keep]
+            candidate_ids = ids[candidates]
+
+        if len(similarities) > k:
+            top = np.argpartition(-similarities, k - 1)[:k]
+            candidate_ids, similarities = candidate_ids[top], similarities[top]
+        order = np.lexsort((candidate_ids, -similarities))
+        hits = [
+            SimilarityHit(int(candidate_ids[i]), float(similarities[i]))
+            for i in order
+        ]
+        return hits, pruned
+
+
+similarity_indexes = IndexRegistry(SimilarityIndex, MAX_INDEXED_PROJECTS)
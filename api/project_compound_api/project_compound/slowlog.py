@@ -0,0 +1,107 @@
+"""Slow SQL statements of GraphQL operations, logged with their query plan.
+
+``tracing.record_query`` passes every statement of a GraphQL operation slower
+than ``SLOW_QUERY_LOG['THRESHOLD_MS']`` to ``log_slow_query``. The warning
+names the operation and the resolver started last (the one whose queryset is
+being read) and carries the SQL, its parameters and the database's plan for it
+(``EXPLAIN``, ``EXPLAIN QUERY PLAN`` on SQLite), taken right away on the same
+connection.
+
+The log must not become a hot path itself. Each process writes at most
+``MAX_PER_MINUTE`` entries a minute, and each distinct statement at most once
+a minute. SQL, parameters and plans are truncated. Entries dropped by the
+limit are counted, and the count goes out with the next entry.
+"""
+import logging
+import threading
+import time
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+
+from .cache import LRUCache
+
+INTERVAL = 60.0
+MAX_SQL_LENGTH = 2000
+MAX_PARAMS_LENGTH = 500
+MAX_PLAN_LINES = 40
+RECENT_STATEMENTS = 256
+EXPLAINABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH')
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Token bucket refilling ``rate`` entries per ``INTERVAL``, plus a
+    once per ``INTERVAL`` filter on recently logged statements."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tokens = None
+        self.updated = None
+        self.recent = LRUCache(RECENT_STATEMENTS)
+        self.suppressed = 0
+
+    def allow(self, sql: str, rate: int) -> int | None:
+        """Number of entries suppressed since the last one logged, or ``None``
+        when this one is suppressed as well."""
+        now = time.monotonic()
+        with self.lock:
+            if self.tokens is None:
+                self.tokens, self.updated = rate, now
+            self.tokens = min(rate, self.tokens + (now - self.updated) * rate / INTERVAL)
+            self.updated = now
+            logged_at = self.recent.get(sql)
+            if self.tokens < 1 or (logged_at is not None and now - logged_at < INTERVAL):
+                self.suppressed += 1
+                return None
+            self.tokens -= 1
+            self.recent.set(sql, now)
+            suppressed, self.suppressed = self.suppressed, 0
+            return suppressed
+
+
+limiter = RateLimiter()
+
+
+def shorten(text: str, limit: int) -> str:
+    return text if len(text) <= limit else f"{text[:limit]}... ({len(text) - limit} more characters)"
+
+
+def explain(connection, sql: str, params) -> list[str]:
+    """The database's plan for ``sql``, one line per plan row."""
+    # Inside a transaction the plan runs in a savepoint: on PostgreSQL a
+    # failed EXPLAIN would otherwise abort the caller's transaction.
+    atomic = transaction.atomic(using=connection.alias) if connection.in_atomic_block else nullcontext()
+    try:
+        with atomic, connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+            rows = cursor.fetchall()
+    except DatabaseError as exc:
+        return [f"no plan: {exc}"]
+    # SQLite's rows end with the step's detail; PostgreSQL's are one text column.
+    lines = [str(row[-1]) for row in rows]
+    if len(lines) > MAX_PLAN_LINES:
+        lines = [*lines[:MAX_PLAN_LINES], f"... {len(lines) - MAX_PLAN_LINES} more lines"]
+    return lines
+
+
+def log_slow_query(operation: str, field: str | None, seconds: float, sql: str, params, many: bool, connection):
+    options = settings.SLOW_QUERY_LOG
+    suppressed = limiter.allow(sql, options['MAX_PER_MINUTE'])
+    if suppressed is None:
+        return
+    # executemany() has one parameter set per row, so there is no single plan.
+    explainable = not many and sql.lstrip().upper().startswith(EXPLAINABLE)
+    plan = explain(connection, sql, params) if options['EXPLAIN'] and explainable else []
+    logger.warning(
+        "slow query %.1f ms in %s%s: %s params=%s%s%s",
+        seconds * 1000,
+        operation,
+        f" ({field})" if field else "",
+        shorten(sql, MAX_SQL_LENGTH),
+        shorten(repr(params), MAX_PARAMS_LENGTH),
+        "".join(f"\n    {line}" for line in plan),
+        f"\n({suppressed} slow queries not logged since the last entry)" if suppressed else "",
+    )
@@ -0,0 +1,36 @@
+"""Structure keys for duplicate detection.
+
+``smiles_key`` is RDKit's canonical SMILES, so different spellings of the same
+structure (``OCC`` / ``CCO``) share a key. Strings RDKit cannot parse fall back
+to the input with whitespace removed; case is kept because it encodes
+aromaticity. ``smiles_hash`` packs the key into a signed 64-bit integer that
+is indexed per project.
+"""
+import hashlib
+
+from rdkit import Chem, RDLogger
+
+RDLogger.DisableLog('rdApp.*')
+
+
+def parse_smiles(smiles: str):
+    """Return an RDKit molecule, or ``None`` if the SMILES cannot be parsed."""
+    return Chem.MolFromSmiles(''.join(smiles.split()))
+
+
+def smiles_key(smiles: str, mol=None) -> str:
+    if mol is None:
+        mol = parse_smiles(smiles)
+    if mol is None:
+        return ''.join(smiles.split())
+    return Chem.MolToSmiles(mol)
+
+
+def smiles_hash(key: str) -> int:
+    return int.from_bytes(hashlib.sha256(key.encode()).digest()[:8], 'big', signed=True)
+
+
+def structure_key(smiles: str, mol=None) -> tuple[str, int]:
+    """Return ``(smiles_key, smiles_hash)`` for a SMILES string."""
+    key = smiles_key(smiles, mol)
+    return key, smiles_hash(key)
@@ -0,0 +1,187 @@
+"""Incremental maintenance of ``ProjectStats``.
+
+Inserts add their batch aggregates with a single ``UPDATE ... SET x = x + ?``.
+Deletes subtract counts and sums the same way; a min/max is only recomputed
+when the deleted rows held the current extreme, and that recomputation is a
+``MIN``/``MAX`` seek on the ``(project, <property>)`` indexes, never a scan.
+Property updates are a delete of the old values plus an insert of the new ones.
+"""
+from django.db.models import Count, F, Max, Min, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+
+from .models import Compound, ProjectStats
+
+PROPERTIES = ('mw', 'logD', 'logP')
+
+
+class PropertySummary:
+    def __init__(self, count=0, total=0.0, minimum=None, maximum=None):
+        self.count = count
+        self.total = total
+        self.min = minimum
+        self.max = maximum
+
+    def add(self, value):
+        if value is None:
+            return
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+
+class CompoundSummary:
+    """Running count and per-property aggregates of a set of compounds."""
+
+    def __init__(self, count=0, properties=None):
+        self.count = count
+        self.properties = properties or {name: PropertySummary() for name in PROPERTIES}
+
+    def add(self, compounds):
+        """Add objects exposing ``mw``, ``logD`` and ``logP`` to the summary."""
+        for compound in compounds:
+            self.count += 1
+            for name in PROPERTIES:
+                self.properties[name].add(getattr(compound, name))
+        return self
+
+    @classmethod
+    def of_queryset(cls, queryset) -> 'CompoundSummary':
+        """Aggregate compounds in SQL with a single query."""
+        aggregates = {'count': Count('id')}
+        for name in PROPERTIES:
+            aggregates[f'{name}_count'] = Count(name)
+            aggregates[f'{name}_sum'] = Sum(name)
+            aggregates[f'{name}_min'] = Min(name)
+            aggregates[f'{name}_max'] = Max(name)
+        row = queryset.aggregate(**aggregates)
+        return cls(row['count'], {
+            name: PropertySummary(
+                row[f'{name}_count'], row[f'{name}_sum'] or 0.0, row[f'{name}_min'], row[f'{name}_max']
+            )
+            for name in PROPERTIES
+        })
+
+
+def get_project_stats(project) -> ProjectStats:
+    """Return the project's stats row, or an empty unsaved one if it has none."""
+    # A missing reverse one-to-one raises RelatedObjectDoesNotExist, which is
+    # also an AttributeError.
+    stats = getattr(project, 'stats', None)
+    return stats if stats is not None else ProjectStats()
+
+
+def recompute_project_stats(project_id) -> ProjectStats:
+    """Rebuild a project's stats from its compounds with one aggregate query."""
+    current = CompoundSummary.of_queryset(Compound.objects.filter(project_id=project_id))
+    values = {'compound_count': current.count}
+    for name, summary in current.properties.items():
+        values[f'{name}_count'] = summary.count
+        values[f'{name}_sum'] = summary.total
+        values[f'{name}_min'] = summary.min
+        values[f'{name}_max'] = summary.max
+    stats, _ = ProjectStats.objects.update_or_create(project_id=project_id, defaults=values)
+    return stats
+
+
+def _property_increments(added: CompoundSummary) -> dict:
+    updates = {}
+    for name, summary in added.properties.items():
+        if not summary.count:
+            continue
+        updates[f'{name}_count'] = F(f'{name}_count') + summary.count
+        updates[f'{name}_sum'] = F(f'{name}_sum') + summary.total
+        updates[f'{name}_min'] = Least(Coalesce(F(f'{name}_min'), Value(summary.min)), Value(summary.min))
+        updates[f'{name}_max'] = Greatest(Coalesce(F(f'{name}_max'), Value(summary.max)), Value(summary.max))
+    return updates
+
+
+def record_inserted(project_id, inserted: CompoundSummary):
+    """Fold already inserted compounds into the project's stats with one UPDATE."""
+    if not inserted.count:
+        return
+
+    updates = {'compound_count': F('compound_count') + inserted.count, **_property_increments(inserted)}
+    if not ProjectStats.objects.filter(project_id=project_id).update(**updates):
+        # No stats row yet (project created outside the mutations): build it
+        # from the rows, which already include this batch.
+        recompute_project_stats(project_id)
+
+
+def record_filled(project_id, filled: CompoundSummary):
+    """Fold property values newly set on existing compounds (previously null)
+    into the stats and bump the project's property revision."""
+    updates = {'property_revision': F('property_revision') + 1, **_property_increments(filled)}
+    if not ProjectStats.objects.filter(project_id=project_id).update(**updates):
+        recompute_project_stats(project_id)
+
+
+def record_deleted(project_id, deleted: CompoundSummary):
+    """Subtract deleted compounds from the project's stats.
+
+    Min/max are re-read (an index seek) only for properties where a deleted
+    value was the current extreme.
+    """
+    if not deleted.count:
+        return
+
+    updates = {'compound_count': F('compound_count') - deleted.count}
+    for name, summary in deleted.properties.items():
+        if summary.count:
+            updates[f'{name}_count'] = F(f'{name}_count') - summary.count
+            updates[f'{name}_sum'] = F(f'{name}_sum') - summary.total
+
+    if not ProjectStats.objects.filter(project_id=project_id).update(**updates):
+        recompute_project_stats(project_id)
+        return
+    _reread_extremes(project_id, deleted)
+
+
+def record_updated(project_id, before: CompoundSummary, after: CompoundSummary):
+    """Replace the old property values of updated compounds with their new
+    ones in the project's stats and bump its property revision.
+
+    New values widen min/max in the same UPDATE; they are re-read only for
+    properties where an old value was the current extreme.
+    """
+    updates = {'property_revision': F('property_revision') + 1}
+    for name in PROPERTIES:
+        old, new = before.properties[name], after.properties[name]
+        if not (old.count or new.count):
+            continue
+        updates[f'{name}_count'] = F(f'{name}_count') + (new.count - old.count)
+        updates[f'{name}_sum'] = F(f'{name}_sum') + (new.total - old.total)
+        if new.count:
+            updates[f'{name}_min'] = Least(Coalesce(F(f'{name}_min'), Value(new.min)), Value(new.min))
+            updates[f'{name}_max'] = Greatest(Coalesce(F(f'{name}_max'), Value(new.max)), Value(new.max))
+
+    if not ProjectStats.objects.filter(project_id=project_id).update(**updates):
+        recompute_project_stats(project_id)
+        return
+    _reread_extremes(project_id, before)
+
+
+def _reread_extremes(project_id, removed: CompoundSummary):
+    """Re-read min/max of properties where a removed value was the extreme."""
+    stats = ProjectStats.objects.get(project_id=project_id)
+    changed = []
+    remaining = Compound.objects.filter(project_id=project_id)
+    for name, summary in removed.properties.items():
+        if not summary.count:
+            continue
+        if getattr(stats, f'{name}_count') == 0:
+            setattr(stats, f'{name}_sum', 0.0)
+            setattr(stats, f'{name}_min', None)
+            setattr(stats, f'{name}_max', None)
+            changed += [f'{name}_sum', f'{name}_min', f'{name}_max']
+            continue
+        if summary.min <= getattr(stats, f'{name}_min'):
+            setattr(stats, f'{name}_min', remaining.aggregate(value=Min(name))['value'])
+            changed.append(f'{name}_min')
+        if summary.max >= getattr(stats, f'{name}_max'):
+            setattr(stats, f'{name}_max', remaining.aggregate(value=Max(name))['value'])
+            changed.append(f'{name}_max')
+
+    if changed:
+        stats.save(update_fields=changed)
+
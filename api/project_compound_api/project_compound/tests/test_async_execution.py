@@ -0,0 +1,69 @@
+import json
+
+from django.test import AsyncRequestFactory, TestCase
+from strawberry.django.views import AsyncGraphQLView
+from project_compound.models import Project, Compound
+from project_compound.schema import compound_schema, project_schema
+
+
+class AsyncExecutionTest(TestCase):
+    def setUp(self):
+        self.project = Project.objects.create(
+            name="ALZ-2024",
+            description="Beta-amyloid inhibitor for Alzheimer's disease"
+        )
+        self.compound = Compound.objects.create(project=self.project, smiles="CCO", mw=46.07)
+
+    async def test_compounds_query_runs_under_async_execution(self):
+        query = f"""
+        query {{
+            compounds(projectId: "{self.project.id}") {{
+                id
+                smiles
+                project {{
+                    name
+                }}
+            }}
+            compoundsConnection(projectId: "{self.project.id}") {{
+                totalCount
+            }}
+        }}
+        """
+        result = await compound_schema.execute(query)
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['compounds'], [
+            {'id': str(self.compound.id), 'smiles': "CCO", 'project': {'name': "ALZ-2024"}}
+        ])
+        self.assertEqual(result.data['compoundsConnection']['totalCount'], 1)
+
+    async def test_mutations_run_under_async_execution(self):
+        mutation = f"""
+        mutation {{
+            bulkCreateCompounds(projectId: "{self.project.id}", compounds: [{{ smiles: "CCN" }}]) {{
+                id
+            }}
+            deleteCompound(id: "{self.compound.id}") {{
+                id
+            }}
+        }}
+        """
+        result = await compound_schema.execute(mutation)
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['deleteCompound']['id'], str(self.compound.id))
+        self.assertEqual(await Compound.objects.filter(project=self.project).acount(), 1)
+
+    async def test_errors_are_reported_under_async_execution(self):
+        result = await project_schema.execute('query { projects(id: "99999") { id } }')
+        self.assertIsNone(result.data)
+        self.assertEqual(result.errors[0].message, "Project matching query does not exist.")
+
+    async def test_async_view(self):
+        view = AsyncGraphQLView.as_view(schema=project_schema)
+        request = AsyncRequestFactory().post(
+            '/projects/',
+            data=json.dumps({'query': "query { projects { name } }"}),
+            content_type='application/json'
+        )
+        response = await view(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content), {'data': {'projects': [{'name': "ALZ-2024"}]}})
@@ -0,0 +1,79 @@
+import json
+
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from project_compound.models import Project, Compound
+from project_compound.schema import schema
+from project_compound.stats import recompute_project_stats
+from project_compound.views import AsyncGraphQLView
+
+GET_PROJECT = "query GetProject($id: ID!) { projects(id: $id) { id name compoundCount } }"
+GET_COMPOUNDS = "query GetCompounds($projectId: ID!) { compounds(projectId: $projectId) { id smiles } }"
+
+
+class BatchingTest(TestCase):
+    def setUp(self):
+        self.project = Project.objects.create(name="ALZ-2024", description="Beta-amyloid inhibitor")
+        self.compound = Compound.objects.create(project=self.project, smiles="CCO")
+        recompute_project_stats(self.project.id)
+
+    def post(self, body, path='/graphql/'):
+        return self.client.post(path, json.dumps(body), content_type='application/json')
+
+    def project_page(self):
+        return [
+            {'query': GET_PROJECT, 'operationName': "GetProject", 'variables': {'id': self.project.id}},
+            {'query': GET_COMPOUNDS, 'operationName': "GetCompounds", 'variables': {'projectId': self.project.id}},
+        ]
+
+    def test_batch_shares_project_loader(self):
+        # The project (with its stats) is loaded once for both operations.
+        with self.assertNumQueries(2):
+            response = self.post(self.project_page())
+        self.assertEqual(response.status_code, 200)
+        project, compounds = response.json()
+        self.assertEqual(project['data']['projects'], [
+            {'id': str(self.project.id), 'name': "ALZ-2024", 'compoundCount': 1}
+        ])
+        self.assertEqual(compounds['data']['compounds'], [{'id': str(self.compound.id), 'smiles': "CCO"}])
+
+    def test_mutation_clears_loaders(self):
+        create = f'mutation {{ createCompound(projectId: "{self.project.id}", smiles: "CCN") {{ id }} }}'
+        get_project = {'query': GET_PROJECT, 'variables': {'id': self.project.id}}
+        response = self.post([get_project, {'query': create}, get_project])
+        before, created, after = response.json()
+        self.assertIn('id', created['data']['createCompound'])
+        self.assertEqual(before['data']['projects'][0]['compoundCount'], 1)
+        self.assertEqual(after['data']['projects'][0]['compoundCount'], 2)
+
+    @override_settings(GRAPHQL_LIMITS={'MAX_COST': 1500, 'MAX_DEPTH': 8, 'ENFORCE': True})
+    def test_batch_shares_cost_budget(self):
+        operation = {'query': GET_COMPOUNDS, 'variables': {'projectId': self.project.id}}
+        first, second = self.post([operation, operation]).json()
+        self.assertIsNone(first.get('errors'))
+        self.assertEqual(
+            second['errors'][0]['message'],
+            "Query cost 1000 exceeds the 500 left of the request's maximum of 1500."
+        )
+
+    async def test_async_view_batch(self):
+        view = AsyncGraphQLView.as_view(schema=schema)
+        request = AsyncRequestFactory().post(
+            '/graphql/', data=json.dumps(self.project_page()), content_type='application/json'
+        )
+        response = await view(request)
+        project, compounds = json.loads(response.content)
+        self.assertEqual(project['data']['projects'][0]['name'], "ALZ-2024")
+        self.assertEqual(compounds['data']['compounds'][0]['smiles'], "CCO")
+
+    def test_too_many_operations(self):
+        operation = {'query': GET_PROJECT, 'variables': {'id': self.project.id}}
+        response = self.post([operation] * 11)
+        self.assertEqual(response.status_code, 400)
+
+    def test_old_routes_serve_unified_schema(self):
+        for path in ('/projects/', '/compounds/'):
+            response = self.post(self.project_page(), path=path)
+            self.assertEqual([result['data'] is not None for result in response.json()], [True, True])
+
+            response = self.post({'query': GET_COMPOUNDS, 'variables': {'projectId': self.project.id}}, path=path)
+            self.assertEqual(len(response.json()['data']['compounds']), 1)
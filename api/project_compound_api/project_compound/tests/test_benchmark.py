@@ -0,0 +1,47 @@
+import random
+
+from django.core.wsgi import get_wsgi_application
+from django.test import SimpleTestCase, TransactionTestCase
+from project_compound import benchmark
+from project_compound.models import Compound
+from project_compound.smiles import parse_smiles
+
+
+class SyntheticDataTest(SimpleTestCase):
+    def test_rows_are_valid_and_reproducible(self):
+        rows = benchmark.make_rows(500, seed=7)
+        self.assertEqual(rows, benchmark.make_rows(500, seed=7))
+        self.assertTrue(all(parse_smiles(row.smiles) is not None for row in rows))
+        lengths = sorted(len(row.smiles) for row in rows)
+        self.assertGreater(lengths[0], 1)
+        self.assertLess(lengths[-1], 150)
+        self.assertTrue(30 <= lengths[len(lengths) // 2] <= 70)
+        for name in benchmark.NULL_RATES:
+            self.assertTrue(any(getattr(row, name) is None for row in rows), name)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(benchmark.percentile(values, 0.5), 50)
+        self.assertEqual(benchmark.percentile(values, 0.99), 99)
+        self.assertEqual(benchmark.percentile([3], 0.95), 3)
+        self.assertIsNone(benchmark.percentile([], 0.5))
+
+
+class LoadTest(TransactionTestCase):
+    def test_workloads_against_local_server(self):
+        project = benchmark.seed_project("benchmark-50", 50)
+        self.assertEqual(benchmark.seed_project("benchmark-50", 50), project)
+        counter = benchmark.QueryCounter(get_wsgi_application())
+
+        # One client: the shared-cache in-memory test database fails concurrent
+        # writers at once instead of waiting out the busy timeout.
+        with benchmark.local_server(counter) as url:
+            for name, workload in benchmark.WORKLOADS.items():
+                requests = workload.build(project, 4, random.Random(0))
+                result = benchmark.run_load(url, requests, 1, counter)
+                self.assertEqual((result['requests'], result['errors']), (4, 0), name)
+                self.assertGreater(result['sql_queries_per_request'], 0, name)
+                self.assertIsNotNone(result['latency_ms']['p99'], name)
+
+        # 50 seeded, 4 x 100 inserted, 4 inserted and deleted again.
+        self.assertEqual(Compound.objects.filter(project=project).count(), 450)
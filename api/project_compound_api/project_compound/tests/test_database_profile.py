@@ -0,0 +1,52 @@
+import unittest
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from project_compound.ingest import COPY_MIN_ROWS
+from project_compound.models import Compound, ProjectStats
+from project_compound.schema import compound_schema as schema, project_schema
+
+
+class DatabaseProfileTest(TestCase):
+    @unittest.skipUnless(connection.vendor == 'sqlite', "SQLite profile")
+    def test_sqlite_connection_is_tuned(self):
+        with connection.cursor() as cursor:
+            pragmas = {}
+            for name in ('synchronous', 'cache_size', 'busy_timeout', 'temp_store'):
+                cursor.execute(f'PRAGMA {name}')
+                pragmas[name] = cursor.fetchone()[0]
+        # synchronous=NORMAL, a 64 MiB cache, 20 s busy timeout, temp_store=MEMORY
+        self.assertEqual(pragmas, {'synchronous': 1, 'cache_size': -65536, 'busy_timeout': 20000, 'temp_store': 2})
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', "PostgreSQL COPY ingest")
+    def test_postgres_bulk_insert_uses_copy(self):
+        result = project_schema.execute_sync(
+            'mutation { createProject(name: "ALZ-2024", description: "Beta-amyloid inhibitor") { id } }'
+        )
+        project_id = result.data['createProject']['id']
+        compounds = ", ".join(
+            f'{{ smiles: "{"C" * (i % 20 + 1)}O", mw: {i}.5 }}' for i in range(COPY_MIN_ROWS)
+        )
+        with CaptureQueriesContext(connection) as queries:
+            result = schema.execute_sync(f"""
+            mutation {{
+                bulkCreateCompounds(projectId: "{project_id}", compounds: [{compounds}]) {{ id mw }}
+            }}
+            """)
+        self.assertIsNone(result.errors)
+        self.assertTrue(any(q['sql'].startswith('COPY') for q in queries.captured_queries))
+
+        created = result.data['bulkCreateCompounds']
+        ids = [int(c['id']) for c in created]
+        self.assertEqual(ids, sorted(ids))
+        stored = Compound.objects.filter(project_id=project_id).order_by('id')
+        self.assertEqual(list(stored.values_list('id', flat=True)), ids)
+        self.assertEqual(stored[0].mw, 0.5)
+        self.assertIsNotNone(stored[0].fingerprint)
+        self.assertEqual(ProjectStats.objects.get(project_id=project_id).compound_count, COPY_MIN_ROWS)
+
+        # The sequence moved past the copied ids, so ordinary inserts follow on.
+        compound = Compound.objects.create(project_id=project_id, smiles="CCN")
+        self.assertGreater(compound.id, ids[-1])
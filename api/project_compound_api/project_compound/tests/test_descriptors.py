@@ -0,0 +1,111 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from project_compound import cache as result_cache
+from project_compound.cache import LocalResultCache
+from project_compound.descriptors import DescriptorCalculator, compute_descriptors
+from project_compound.models import Project, Compound, ProjectStats
+from project_compound.property_store import property_columns
+from project_compound.schema import compound_schema as schema, project_schema
+from project_compound.stats import recompute_project_stats
+
+
+ASPIRIN = "CC(=O)OC1=CC=CC=C1C(=O)O"
+
+
+class DescriptorTest(TestCase):
+    def setUp(self):
+        property_columns.clear()
+        result = project_schema.execute_sync(
+            'mutation { createProject(name: "ALZ-2024", description: "Beta-amyloid inhibitor") { id } }'
+        )
+        self.project = Project.objects.get(id=result.data['createProject']['id'])
+
+    def test_compute_descriptors(self):
+        mw, logP = compute_descriptors(ASPIRIN)
+        self.assertAlmostEqual(mw, 180.159, places=2)
+        self.assertAlmostEqual(logP, 1.31, places=2)
+        self.assertEqual(compute_descriptors("C1(("), (None, None))
+
+    def test_pool_matches_inline(self):
+        smiles = [ASPIRIN, "CCO", "C1((", "CCN"] * 200
+        with DescriptorCalculator(workers=2, chunk_size=100) as calculator:
+            self.assertEqual(calculator.compute(smiles), [compute_descriptors(s) for s in smiles])
+            self.assertIsNotNone(calculator.executor)
+        self.assertIsNone(calculator.executor)
+
+    def test_bulk_create_computes_missing_values(self):
+        result = schema.execute_sync(f"""
+        mutation {{
+            bulkCreateCompounds(
+                projectId: "{self.project.id}",
+                computeDescriptors: true,
+                compounds: [
+                    {{ smiles: "{ASPIRIN}" }},
+                    {{ smiles: "CCO", mw: 50.0 }},
+                    {{ smiles: "C1((" }}
+                ]
+            ) {{ mw logD logP }}
+        }}
+        """)
+        self.assertIsNone(result.errors)
+        aspirin, ethanol, invalid = result.data['bulkCreateCompounds']
+        self.assertAlmostEqual(aspirin['mw'], 180.159, places=2)
+        self.assertIsNone(aspirin['logD'])
+        self.assertEqual(ethanol['mw'], 50.0)
+        self.assertIsNotNone(ethanol['logP'])
+        self.assertEqual(invalid, {'mw': None, 'logD': None, 'logP': None})
+        self.assertEqual(ProjectStats.objects.get(project=self.project).mw_count, 2)
+
+    def test_command_backfills_existing_compounds(self):
+        aspirin = Compound.objects.create(project=self.project, smiles=ASPIRIN, logP=1.19)
+        Compound.objects.create(project=self.project, smiles="CCO", mw=46.07, logP=-0.31)
+        Compound.objects.create(project=self.project, smiles="C1((")
+        other = Project.objects.create(name="other")
+        untouched = Compound.objects.create(project=other, smiles="CCN")
+        recompute_project_stats(self.project.id)
+
+        out = StringIO()
+        call_command('compute_descriptors', project=[self.project.id], workers=1, stdout=out)
+
+        aspirin.refresh_from_db()
+        self.assertAlmostEqual(aspirin.mw, 180.159, places=2)
+        self.assertEqual(aspirin.logP, 1.19)
+        untouched.refresh_from_db()
+        self.assertIsNone(untouched.mw)
+        self.assertIn(f"{self.project.id:>10} {1:>10}", out.getvalue())
+
+        stats = ProjectStats.objects.get(project=self.project)
+        self.assertEqual(stats.property_revision, 1)
+        self.assertEqual(stats.mw_count, 2)
+        self.assertAlmostEqual(stats.mw_sum, aspirin.mw + 46.07)
+        self.assertEqual(stats.mw_max, aspirin.mw)
+
+    def test_backfill_reloads_property_store(self):
+        Compound.objects.create(project=self.project, smiles=ASPIRIN)
+        recompute_project_stats(self.project.id)
+        query = f'query {{ compoundProperties(projectId: "{self.project.id}") {{ mwStats {{ count }} }} }}'
+        with override_settings(PROPERTY_STORE={'ENABLED': True, 'MAX_PROJECTS': 4}):
+            result = schema.execute_sync(query)
+            self.assertEqual(result.data['compoundProperties']['mwStats']['count'], 0)
+
+            call_command('compute_descriptors', workers=1, stdout=StringIO())
+            result = schema.execute_sync(query)
+        self.assertEqual(result.data['compoundProperties']['mwStats']['count'], 1)
+
+    @override_settings(RESULT_CACHE={'BACKEND': 'local', 'MAXSIZE': 64})
+    def test_backfill_from_command_process_invalidates_result_cache(self):
+        Compound.objects.create(project=self.project, smiles=ASPIRIN)
+        recompute_project_stats(self.project.id)
+        query = f'query {{ compounds(projectId: "{self.project.id}") {{ mw }} }}'
+        self.assertEqual(schema.execute_sync(query).data['compounds'], [{'mw': None}])
+
+        # The command runs in its own process, with its own in-process cache.
+        with mock.patch.object(result_cache, '_result_cache', LocalResultCache()):
+            with self.captureOnCommitCallbacks(execute=True):
+                call_command('compute_descriptors', workers=1, stdout=StringIO())
+
+        mw = schema.execute_sync(query).data['compounds'][0]['mw']
+        self.assertAlmostEqual(mw, 180.159, places=2)
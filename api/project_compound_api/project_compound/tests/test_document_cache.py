@@ -0,0 +1,90 @@
+import hashlib
+import json
+
+from django.test import TestCase
+from project_compound.models import Project
+from project_compound.schema import project_schema as schema, project_document_cache
+
+
+QUERY = "query GetProjects { projects { id name } }"
+QUERY_HASH = hashlib.sha256(QUERY.encode()).hexdigest()
+
+
+def persisted_query(sha256_hash=QUERY_HASH, version=1):
+    return {'persistedQuery': {'version': version, 'sha256Hash': sha256_hash}}
+
+
+class PersistedQueryTest(TestCase):
+    def setUp(self):
+        project_document_cache.documents.clear()
+        project_document_cache.queries.clear()
+        self.project = Project.objects.create(
+            name="ALZ-2024",
+            description="Beta-amyloid inhibitor for Alzheimer's disease"
+        )
+
+    def test_unknown_hash_is_not_found(self):
+        result = schema.execute_sync(None, operation_extensions=persisted_query())
+        self.assertIsNone(result.data)
+        self.assertEqual(result.errors[0].message, "PersistedQueryNotFound")
+        self.assertEqual(result.errors[0].extensions['code'], "PERSISTED_QUERY_NOT_FOUND")
+
+    def test_registered_query_can_be_sent_by_hash(self):
+        result = schema.execute_sync(QUERY, operation_extensions=persisted_query())
+        self.assertIsNone(result.errors)
+
+        result = schema.execute_sync(None, operation_extensions=persisted_query())
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['projects'], [{'id': str(self.project.id), 'name': "ALZ-2024"}])
+
+    def test_hash_must_match_query(self):
+        result = schema.execute_sync(QUERY, operation_extensions=persisted_query("0" * 64))
+        self.assertIsNone(result.data)
+        self.assertEqual(result.errors[0].message, "Provided sha256Hash does not match query.")
+        self.assertEqual(project_document_cache.queries.stats()['size'], 0)
+
+    def test_unsupported_version(self):
+        result = schema.execute_sync(QUERY, operation_extensions=persisted_query(version=2))
+        self.assertEqual(result.errors[0].extensions['code'], "PERSISTED_QUERY_NOT_SUPPORTED")
+
+    def test_persisted_query_over_http(self):
+        body = {'extensions': persisted_query(), 'operationName': "GetProjects"}
+        response = self.client.post('/projects/', json.dumps(body), content_type='application/json')
+        self.assertEqual(response.json()['errors'][0]['message'], "PersistedQueryNotFound")
+
+        response = self.client.post('/projects/', json.dumps({**body, 'query': QUERY}), content_type='application/json')
+        self.assertNotIn('errors', response.json())
+
+        response = self.client.post('/projects/', json.dumps(body), content_type='application/json')
+        self.assertEqual(response.json()['data']['projects'][0]['name'], "ALZ-2024")
+
+
+class DocumentCacheTest(TestCase):
+    def setUp(self):
+        project_document_cache.documents.clear()
+        Project.objects.create(name="ALZ-2024", description="Beta-amyloid inhibitor")
+
+    def test_repeated_query_reuses_parsed_document(self):
+        for _ in range(3):
+            result = schema.execute_sync(QUERY)
+            self.assertIsNone(result.errors)
+            self.assertEqual(len(result.data['projects']), 1)
+
+        stats = project_document_cache.stats()['documents']
+        self.assertEqual(stats['size'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 2)
+
+    def test_validation_errors_are_cached(self):
+        for _ in range(2):
+            result = schema.execute_sync("query { projects { unknownField } }")
+            self.assertIsNone(result.data)
+            self.assertIn("unknownField", result.errors[0].message)
+
+        self.assertEqual(project_document_cache.stats()['documents']['hits'], 1)
+
+    def test_cache_is_bounded(self):
+        documents = project_document_cache.documents
+        for i in range(documents.maxsize + 5):
+            schema.execute_sync(f"query Q{i} {{ projects {{ id }} }}")
+        self.assertEqual(documents.stats()['size'], documents.maxsize)
@@ -0,0 +1,108 @@
+import io
+import json
+import warnings
+from unittest import mock
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+from project_compound import export
+from project_compound.models import Project, Compound
+
+
+ROWS = [
+    ("CC(=O)OC1=CC=CC=C1C(=O)O", 180.16, -0.73, 1.19),
+    ("CCO", None, None, -0.31),
+    ("CN1C=NC2=C1C(=O)N(C(=O)N2C)C", 194.19, -0.07, None),
+]
+
+
+class ExportCompoundsTest(TestCase):
+    def setUp(self):
+        self.project = Project.objects.create(name="ALZ-2024", description="Beta-amyloid inhibitor")
+        other = Project.objects.create(name="other", description="other")
+        Compound.objects.create(project=other, smiles="CCN")
+        self.compounds = [
+            Compound.objects.create(project=self.project, smiles=smiles, mw=mw, logD=logD, logP=logP)
+            for smiles, mw, logD, logP in ROWS
+        ]
+        self.url = reverse('compounds export', args=[self.project.id])
+
+    def export(self, file_format):
+        response = self.client.get(f"{self.url}?format={file_format}")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    def expected(self):
+        return [(c.id, c.smiles, c.mw, c.logD, c.logP) for c in self.compounds]
+
+    def test_csv_uses_upload_layout(self):
+        response, content = self.export('csv')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn(f'project-{self.project.id}-compounds.csv', response['Content-Disposition'])
+        lines = content.decode().splitlines()
+        self.assertEqual(lines[0], "Compound_Name,SMILES,MW,LogD,LogP")
+        self.assertEqual(lines[2], f"{self.compounds[1].id},CCO,,,-0.31")
+        self.assertEqual(len(lines), 4)
+
+    def test_csv_round_trips_through_upload(self):
+        _, content = self.export('csv')
+        target = Project.objects.create(name="copy", description="copy")
+        response = self.client.post(
+            reverse('compounds upload', args=[target.id]),
+            {'file': SimpleUploadedFile("export.csv", content, content_type="text/csv")}
+        )
+        self.assertEqual(response.json()['inserted'], 3)
+        copied = Compound.objects.filter(project=target).order_by('id').values_list('smiles', 'mw', 'logD', 'logP')
+        self.assertEqual(list(copied), ROWS)
+
+    def test_ndjson(self):
+        _, content = self.export('ndjson')
+        rows = [json.loads(line) for line in content.decode().splitlines()]
+        self.assertEqual(rows[1], {'id': str(self.compounds[1].id), 'smiles': "CCO", 'mw': None, 'logD': None, 'logP': -0.31})
+        self.assertEqual(len(rows), 3)
+
+    def test_arrow_stream_in_record_batches(self):
+        with mock.patch.object(export, 'COLUMNAR_CHUNK_ROWS', 2):
+            response, content = self.export('arrow')
+        self.assertEqual(response['Content-Type'], 'application/vnd.apache.arrow.stream')
+        reader = pa.ipc.open_stream(content)
+        batches = list(reader)
+        self.assertEqual([batch.num_rows for batch in batches], [2, 1])
+        table = pa.Table.from_batches(batches)
+        self.assertEqual(table.schema, export.ARROW_SCHEMA)
+        self.assertEqual([tuple(row.values()) for row in table.to_pylist()], self.expected())
+
+    def test_parquet_row_groups(self):
+        with mock.patch.object(export, 'COLUMNAR_CHUNK_ROWS', 2):
+            _, content = self.export('parquet')
+        parquet = pq.ParquetFile(io.BytesIO(content))
+        self.assertEqual(parquet.metadata.num_row_groups, 2)
+        self.assertEqual([tuple(row.values()) for row in parquet.read().to_pylist()], self.expected())
+
+    async def test_streams_without_buffering_under_asgi(self):
+        with warnings.catch_warnings():
+            # Django warns when it has to buffer a sync iterator for ASGI.
+            warnings.simplefilter('error')
+            response = await self.async_client.get(f"{self.url}?format=ndjson")
+            self.assertTrue(response.is_async)
+            content = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(content.decode().splitlines()), 3)
+
+    def test_empty_project(self):
+        empty = Project.objects.create(name="empty", description="empty")
+        response = self.client.get(reverse('compounds export', args=[empty.id]) + "?format=arrow")
+        table = pa.ipc.open_stream(b''.join(response.streaming_content)).read_all()
+        self.assertEqual(table.num_rows, 0)
+
+    def test_unknown_format(self):
+        response = self.client.get(f"{self.url}?format=xlsx")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], "format must be one of csv, ndjson, arrow, parquet.")
+
+    def test_unknown_project(self):
+        response = self.client.get(reverse('compounds export', args=[0]))
+        self.assertEqual(response.status_code, 404)
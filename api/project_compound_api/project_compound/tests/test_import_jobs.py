@@ -0,0 +1,141 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from project_compound import jobs
+from project_compound.models import Project, Compound, ImportBatch, ImportJob, ProjectStats
+from project_compound.schema import compound_schema as schema, project_schema
+
+
+JOB_FIELDS = """
+    id
+    status
+    totalRows
+    processedRows
+    inserted
+    duplicates
+    duplicateRows { line compoundId }
+    error
+    rowsPerSecond
+    startedAt
+    finishedAt
+"""
+
+
+class ImportJobTest(TestCase):
+    def setUp(self):
+        result = project_schema.execute_sync(
+            'mutation { createProject(name: "ALZ-2024", description: "Beta-amyloid inhibitor") { id } }'
+        )
+        self.project_id = result.data['createProject']['id']
+
+    def import_compounds(self, smiles, arguments=""):
+        compounds = ", ".join(f'{{ smiles: "{s}", mw: {i + 1} }}' for i, s in enumerate(smiles))
+        result = schema.execute_sync(f"""
+        mutation {{
+            importCompounds(projectId: "{self.project_id}", compounds: [{compounds}]{arguments}) {{ {JOB_FIELDS} }}
+        }}
+        """)
+        self.assertIsNone(result.errors)
+        return result.data['importCompounds']
+
+    def import_job(self, job_id):
+        result = schema.execute_sync(f'query {{ importJob(id: "{job_id}") {{ {JOB_FIELDS} }} }}')
+        self.assertIsNone(result.errors)
+        return result.data['importJob']
+
+    def test_mutation_queues_without_inserting(self):
+        job = self.import_compounds(["CCO", "CCN", "CCC"], ", batchSize: 2")
+        self.assertEqual(job['status'], 'queued')
+        self.assertEqual(job['totalRows'], 3)
+        self.assertEqual(job['processedRows'], 0)
+        self.assertIsNone(job['startedAt'])
+        self.assertEqual(Compound.objects.count(), 0)
+        self.assertEqual(ImportBatch.objects.filter(job_id=job['id']).count(), 2)
+
+    def test_worker_processes_job_in_batches(self):
+        job = self.import_compounds(["CCO", "CCN", "OCC", "CCC", "CCO"], ", batchSize: 2, skipDuplicates: true")
+        out = StringIO()
+        call_command('run_import_worker', once=True, stdout=out)
+        self.assertIn("Ran 1 import job.", out.getvalue())
+
+        job = self.import_job(job['id'])
+        self.assertEqual(job['status'], 'succeeded')
+        self.assertEqual(job['processedRows'], 5)
+        self.assertEqual(job['inserted'], 3)
+        self.assertEqual(job['duplicates'], 2)
+        ethanol = Compound.objects.get(smiles="CCO")
+        self.assertEqual(job['duplicateRows'], [
+            {'line': 3, 'compoundId': str(ethanol.id)},
+            {'line': 5, 'compoundId': str(ethanol.id)},
+        ])
+        self.assertIsNone(job['error'])
+        self.assertGreater(job['rowsPerSecond'], 0)
+        self.assertIsNotNone(job['finishedAt'])
+        self.assertFalse(ImportBatch.objects.exists())
+        self.assertEqual(ProjectStats.objects.get(project_id=self.project_id).compound_count, 3)
+
+    def test_interrupted_job_resumes_after_last_committed_batch(self):
+        job = self.import_compounds(["CCO", "CCN", "CCC", "CCCC", "CCCCC"], ", batchSize: 2")
+        run_batch = jobs._run_batch
+        calls = []
+
+        def crash_on_second_batch(*args):
+            calls.append(args)
+            if len(calls) == 2:
+                raise SystemExit
+            run_batch(*args)
+
+        with mock.patch.object(jobs, '_run_batch', crash_on_second_batch):
+            with self.assertRaises(SystemExit):
+                jobs.run_pending_jobs()
+
+        self.assertEqual(self.import_job(job['id'])['status'], 'running')
+        self.assertEqual(self.import_job(job['id'])['processedRows'], 2)
+        # The lease is still held, so nobody else picks the job up yet.
+        self.assertEqual(jobs.run_pending_jobs(), 0)
+
+        ImportJob.objects.filter(id=job['id']).update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(jobs.run_pending_jobs(), 1)
+        job = self.import_job(job['id'])
+        self.assertEqual(job['status'], 'succeeded')
+        self.assertEqual(job['inserted'], 5)
+        self.assertEqual(Compound.objects.filter(project_id=self.project_id).count(), 5)
+
+    def test_failed_batch_marks_job_failed(self):
+        job = self.import_compounds(["CCO", "CCN"], ", batchSize: 1")
+        insert = jobs.bulk_insert_compounds
+        calls = []
+
+        def fail_on_second_batch(*args):
+            calls.append(args)
+            if len(calls) == 2:
+                raise ValueError("database is locked")
+            return insert(*args)
+
+        with mock.patch.object(jobs, 'bulk_insert_compounds', fail_on_second_batch):
+            jobs.run_pending_jobs()
+
+        job = self.import_job(job['id'])
+        self.assertEqual(job['status'], 'failed')
+        self.assertEqual(job['error'], "database is locked")
+        self.assertEqual(job['processedRows'], 1)
+        self.assertEqual(Compound.objects.count(), 1)
+
+    def test_workers_do_not_share_jobs(self):
+        self.import_compounds(["CCO"])
+        self.assertIsNotNone(jobs.claim_job())
+        self.assertIsNone(jobs.claim_job())
+
+    def test_unknown_job(self):
+        result = schema.execute_sync('query { importJob(id: "0") { id } }')
+        self.assertEqual(result.errors[0].message, "ImportJob matching query does not exist.")
+
+    def test_jobs_are_deleted_with_project(self):
+        job = self.import_compounds(["CCO"])
+        Project.objects.filter(id=self.project_id).delete()
+        self.assertFalse(ImportJob.objects.filter(id=job['id']).exists())
+        self.assertFalse(ImportBatch.objects.exists())
@@ -0,0 +1,96 @@
+import json
+
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase
+from project_compound import metrics
+from project_compound.models import Project, Compound
+from project_compound.schema import schema
+from project_compound.stats import recompute_project_stats
+from project_compound.views import AsyncGraphQLView
+
+GET_PAGE = """
+query GetPage($projectId: ID!) {
+    projects(id: $projectId) { name compoundCount }
+    compounds(projectId: $projectId) { id smiles }
+}
+"""
+
+
+class TracingTest(TestCase):
+    def setUp(self):
+        for histogram in metrics.REGISTRY:
+            histogram.clear()
+        self.project = Project.objects.create(name="ALZ-2024", description="Beta-amyloid inhibitor")
+        Compound.objects.create(project=self.project, smiles="CCO")
+        Compound.objects.create(project=self.project, smiles="CCN")
+        recompute_project_stats(self.project.id)
+
+    def post(self, body, **headers):
+        return self.client.post('/graphql/', json.dumps(body), content_type='application/json', headers=headers)
+
+    def test_timing_header(self):
+        body = {'query': GET_PAGE, 'variables': {'projectId': self.project.id}}
+        with self.assertNumQueries(2):
+            response = self.post(body, **{'X-GraphQL-Timing': '1'})
+        timing = response.json()['extensions']['timing']
+        self.assertEqual(timing['sqlQueries'], 2)
+        self.assertEqual(
+            set(timing['resolvers']), {'Query.projects', 'Query.compounds', 'ProjectType.compoundCount'}
+        )
+        self.assertEqual(timing['resolvers']['Query.compounds']['calls'], 1)
+        self.assertGreaterEqual(timing['totalMs'], timing['executionMs'])
+        self.assertGreaterEqual(timing['executionMs'], timing['resolversMs'])
+
+        self.assertNotIn('extensions', self.post(body).json())
+
+    def test_metrics_endpoint(self):
+        self.post({'query': GET_PAGE, 'variables': {'projectId': self.project.id}})
+        response = self.client.get('/metrics')
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        lines = response.content.decode().splitlines()
+        labels = 'operation_type="query",operation_name="GetPage"'
+        self.assertIn(f'graphql_operation_duration_seconds_count{{{labels}}} 1', lines)
+        self.assertIn(f'graphql_operation_sql_queries_bucket{{{labels},le="1"}} 0', lines)
+        self.assertIn(f'graphql_operation_sql_queries_bucket{{{labels},le="2"}} 1', lines)
+        self.assertIn('graphql_resolver_duration_seconds_count{field="Query.compounds"} 1', lines)
+        self.assertIn('graphql_response_size_bytes_count 1', lines)
+        self.assertIn('# TYPE graphql_response_size_bytes histogram', lines)
+
+    async def test_async_view_counts_sql_in_worker_threads(self):
+        view = AsyncGraphQLView.as_view(schema=schema)
+        request = AsyncRequestFactory().post(
+            '/graphql/',
+            data=json.dumps({'query': GET_PAGE, 'variables': {'projectId': self.project.id}}),
+            content_type='application/json',
+            headers={'X-GraphQL-Timing': '1'}
+        )
+        response = await view(request)
+        timing = json.loads(response.content)['extensions']['timing']
+        self.assertEqual(timing['sqlQueries'], 2)
+        self.assertIn('Query.compounds', timing['resolvers'])
+
+
+class HistogramTest(SimpleTestCase):
+    def setUp(self):
+        self.histogram = metrics.Histogram('test_seconds', "Test.", ('name',), buckets=(1, 2))
+        self.addCleanup(metrics.REGISTRY.remove, self.histogram)
+
+    def test_render(self):
+        self.histogram.observe(0.5, name='a "quoted"\nname')
+        self.histogram.observe(1.5, name='a "quoted"\nname')
+        self.histogram.observe(3, name='a "quoted"\nname')
+        labels = 'name="a \\"quoted\\"\\nname"'
+        self.assertEqual(self.histogram.render(), [
+            '# HELP test_seconds Test.',
+            '# TYPE test_seconds histogram',
+            f'test_seconds_bucket{{{labels},le="1"}} 1',
+            f'test_seconds_bucket{{{labels},le="2"}} 2',
+            f'test_seconds_bucket{{{labels},le="+Inf"}} 3',
+            f'test_seconds_sum{{{labels}}} 5.0',
+            f'test_seconds_count{{{labels}}} 3',
+        ])
+
+    def test_series_are_capped(self):
+        for index in range(metrics.MAX_SERIES + 5):
+            self.histogram.observe(1, name=f'operation{index}')
+        self.assertEqual(len(self.histogram.series), metrics.MAX_SERIES + 1)
+        self.assertEqual(self.histogram.series[(metrics.OTHER,)][1], 5)
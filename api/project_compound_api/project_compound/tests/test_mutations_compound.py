@@ -1,6 +1,9 @@
+from django.db import connection
 from django.test import TestCase
-from project_compound.models import Project, Compound
-from project_compound.schema_compound import compound_schema as schema
+from django.test.utils import CaptureQueriesContext
+from project_compound.models import Project, Compound, ProjectStats
+from project_compound.schema import compound_schema as schema
+from project_compound.stats import recompute_project_stats
 
 
 class CompoundMutationTest(TestCase):
@@ -271,3 +274,214 @@ class CompoundMutationTest(TestCase):
         self.assertIsNone(result.errors)
         self.assertEqual(len(result.data['bulkCreateCompounds']), 0)
 
+
+    def test_bulk_create_compounds_uses_batched_inserts(self):
+        compounds = ", ".join(f'{{ smiles: "C{"C" * i}O" }}' for i in range(5))
+        mutation = f"""
+        mutation {{
+            bulkCreateCompounds(
+                projectId: "{self.project.id}",
+                batchSize: 2,
+                compounds: [{compounds}]
+            ) {{
+                id
+                smiles
+            }}
+        }}
+        """
+        recompute_project_stats(self.project.id)
+        # project lookup + savepoint/release + three batches of 2, 2 and 1, each
+        # one INSERT + one incremental stats UPDATE; nothing reads duplicates,
+        # so they are not looked up
+        with self.assertNumQueries(7):
+            result = schema.execute_sync(mutation)
+        self.assertIsNone(result.errors)
+        created = result.data['bulkCreateCompounds']
+        self.assertEqual(len(created), 5)
+        self.assertEqual([c['smiles'] for c in created], [f"C{'C' * i}O" for i in range(5)])
+        ids = [int(c['id']) for c in created]
+        self.assertEqual(
+            sorted(ids),
+            list(Compound.objects.filter(id__in=ids).order_by('id').values_list('id', flat=True))
+        )
+
+    def test_bulk_create_compounds_with_invalid_batch_size(self):
+        mutation = f"""
+        mutation {{
+            bulkCreateCompounds(
+                projectId: "{self.project.id}",
+                batchSize: 0,
+                compounds: [{{ smiles: "CCO" }}]
+            ) {{
+                id
+            }}
+        }}
+        """
+        result = schema.execute_sync(mutation)
+        self.assertIsNone(result.data)
+        self.assertEqual(result.errors[0].message, "Batch size must be a positive integer.")
+        self.assertEqual(Compound.objects.filter(project=self.project).count(), 1)
+
+    def test_bulk_create_compounds_skips_duplicates(self):
+        mutation = f"""
+        mutation {{
+            bulkCreateCompounds(
+                projectId: "{self.project.id}",
+                skipDuplicates: true,
+                compounds: [{{ smiles: "OCC" }}, {{ smiles: "CCN" }}, {{ smiles: " C C N " }}]
+            ) {{
+                smiles
+            }}
+        }}
+        """
+        result = schema.execute_sync(mutation)
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['bulkCreateCompounds'], [{'smiles': "CCN"}])
+        self.assertEqual(Compound.objects.filter(project=self.project).count(), 2)
+
+    def add_compounds(self):
+        compounds = [
+            Compound.objects.create(project=self.project, smiles=smiles, mw=mw, logD=0.1 * mw, logP=None)
+            for smiles, mw in [("CCN", 45.08), ("CCC", 44.1), ("CCCl", 64.51), ("CCBr", 108.97)]
+        ]
+        recompute_project_stats(self.project.id)
+        return [self.compound, *compounds]
+
+    def assert_stats_consistent(self):
+        incremental = ProjectStats.objects.get(project=self.project)
+        recomputed = recompute_project_stats(self.project.id)
+        for name in ['compound_count', 'mw_count', 'mw_min', 'mw_max', 'logD_count', 'logD_min', 'logD_max',
+                     'logP_count', 'logP_min', 'logP_max']:
+            self.assertEqual(getattr(incremental, name), getattr(recomputed, name), name)
+        for name in ['mw_sum', 'logD_sum', 'logP_sum']:
+            self.assertAlmostEqual(getattr(incremental, name), getattr(recomputed, name), msg=name)
+
+    def test_delete_compounds_by_ids(self):
+        compounds = self.add_compounds()
+        other = Project.objects.create(name="Other", description="")
+        foreign = Compound.objects.create(project=other, smiles="CCO")
+        ids = ", ".join(f'"{compound.id}"' for compound in [*compounds[1:], foreign])
+        mutation = f"""
+        mutation {{
+            deleteCompounds(projectId: "{self.project.id}", ids: [{ids}], batchSize: 2) {{
+                deletedCount
+                ids
+            }}
+        }}
+        """
+        # project lookup + savepoint/release + three batches of id lookups (the
+        # foreign id matches nothing) + two DELETEs + stats UPDATE + stats read,
+        # the mw min/max and logD max re-reads and their write
+        with self.assertNumQueries(14):
+            result = schema.execute_sync(mutation)
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['deleteCompounds'], {
+            'deletedCount': 4,
+            'ids': [str(compound.id) for compound in compounds[1:]]
+        })
+        self.assertEqual(list(Compound.objects.filter(project=self.project)), [self.compound])
+        self.assertTrue(Compound.objects.filter(id=foreign.id).exists())
+        self.assert_stats_consistent()
+
+    def test_delete_compounds_by_filter(self):
+        self.add_compounds()
+        mutation = f"""
+        mutation {{
+            deleteCompounds(projectId: "{self.project.id}", filter: {{ mw: {{ gte: 50 }} }}) {{
+                deletedCount
+                compounds {{ smiles mw project {{ name }} }}
+            }}
+        }}
+        """
+        result = schema.execute_sync(mutation)
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['deleteCompounds'], {
+            'deletedCount': 2,
+            'compounds': [
+                {'smiles': "CCCl", 'mw': 64.51, 'project': {'name': "ALZ-2024"}},
+                {'smiles': "CCBr", 'mw': 108.97, 'project': {'name': "ALZ-2024"}},
+            ]
+        })
+        self.assertEqual(Compound.objects.filter(project=self.project).count(), 3)
+        self.assert_stats_consistent()
+
+    def test_delete_compounds_by_filter_walks_batches(self):
+        self.add_compounds()
+        mutation = f"""
+        mutation {{
+            deleteCompounds(projectId: "{self.project.id}", filter: {{}}, batchSize: 2) {{ deletedCount }}
+        }}
+        """
+        with CaptureQueriesContext(connection) as queries:
+            result = schema.execute_sync(mutation)
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['deleteCompounds'], {'deletedCount': 5})
+        self.assertFalse(Compound.objects.filter(project=self.project).exists())
+        statements = [query['sql'] for query in queries]
+        # Batches of 2, 2 and 1 in id order, then an empty one ends the walk.
+        reads = [sql for sql in statements if sql.startswith('SELECT') and sql.endswith('LIMIT 2')]
+        self.assertEqual(len(reads), 4)
+        self.assertEqual(len([sql for sql in statements if sql.startswith('DELETE')]), 3)
+        self.assert_stats_consistent()
+
+    def test_delete_compounds_needs_ids_or_filter(self):
+        for arguments in ['', f', ids: ["{self.compound.id}"], filter: {{}}']:
+            result = schema.execute_sync(
+                f'mutation {{ deleteCompounds(projectId: "{self.project.id}"{arguments}) {{ deletedCount }} }}'
+            )
+            self.assertEqual(result.errors[0].message, "Pass either ids or a filter.")
+        self.assertTrue(Compound.objects.filter(id=self.compound.id).exists())
+
+    def test_update_compounds(self):
+        compounds = self.add_compounds()
+        mutation = f"""
+        mutation {{
+            updateCompounds(
+                projectId: "{self.project.id}",
+                batchSize: 2,
+                compounds: [
+                    {{ id: "{compounds[0].id}", mw: 46.1 }},
+                    {{ id: "{compounds[1].id}", logD: null, logP: 1.5 }},
+                    {{ id: "{compounds[2].id}", mw: 44.1 }},
+                    {{ id: "{compounds[4].id}", mw: 30.0 }},
+                    {{ id: "99999", mw: 1.0 }}
+                ]
+            ) {{
+                updatedCount
+                ids
+            }}
+        }}
+        """
+        # project lookup + savepoint/release + three batches of id lookups, two
+        # UPDATE ... CASE for the three changed rows + stats UPDATE + stats read,
+        # the mw max re-read and its write
+        with self.assertNumQueries(12):
+            result = schema.execute_sync(mutation)
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['updateCompounds'], {
+            'updatedCount': 3,
+            'ids': [str(compounds[index].id) for index in (0, 1, 4)]
+        })
+        values = dict(
+            (id, rest) for id, *rest in
+            Compound.objects.filter(project=self.project).values_list('id', 'mw', 'logD', 'logP')
+        )
+        self.assertEqual(values[compounds[0].id], [46.1, 0.31, -0.31])
+        self.assertEqual(values[compounds[1].id], [45.08, None, 1.5])
+        self.assertEqual(values[compounds[4].id], [30.0, compounds[4].logD, None])
+        self.assert_stats_consistent()
+        self.assertEqual(ProjectStats.objects.get(project=self.project).property_revision, 1)
+
+    def test_update_compounds_returns_compounds_when_selected(self):
+        mutation = f"""
+        mutation {{
+            updateCompounds(projectId: "{self.project.id}", compounds: [{{ id: "{self.compound.id}", mw: 46.1 }}]) {{
+                compounds {{ id smiles mw logD }}
+            }}
+        }}
+        """
+        result = schema.execute_sync(mutation)
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['updateCompounds']['compounds'], [
+            {'id': str(self.compound.id), 'smiles': "CCO", 'mw': 46.1, 'logD': 0.31}
+        ])
@@ -0,0 +1,118 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from project_compound import purge
+from project_compound.jobs import enqueue_import
+from project_compound.models import Project, Compound, ImportJob, ProjectPurge, ProjectStats
+from project_compound.parsers import CompoundRow
+from project_compound.schema import schema
+from project_compound.stats import recompute_project_stats
+
+PURGE_FIELDS = "projectId name totalCompounds purgedCompounds deletedAt finishedAt"
+
+
+class ProjectPurgeTest(TestCase):
+    def setUp(self):
+        self.project = Project.objects.create(name="ALZ-2024", description="Beta-amyloid inhibitor")
+        for smiles in ["CCO", "CCN", "OCC", "CCC", "CCCl"]:
+            Compound.objects.create(project=self.project, smiles=smiles)
+        recompute_project_stats(self.project.id)
+        patcher = mock.patch.object(purge, 'PURGE_BATCH_SIZE', 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def delete_project(self):
+        result = schema.execute_sync(
+            f'mutation {{ deleteProject(id: "{self.project.id}") {{ id name compoundCount }} }}'
+        )
+        self.assertIsNone(result.errors)
+        return result.data['deleteProject']
+
+    def project_purge(self):
+        result = schema.execute_sync(f'query {{ projectPurge(projectId: "{self.project.id}") {{ {PURGE_FIELDS} }} }}')
+        self.assertIsNone(result.errors)
+        return result.data['projectPurge']
+
+    def test_delete_hides_project_without_touching_compounds(self):
+        with CaptureQueriesContext(connection) as queries:
+            deleted = self.delete_project()
+        self.assertEqual(deleted, {'id': str(self.project.id), 'name': "ALZ-2024", 'compoundCount': 5})
+        self.assertFalse(any('project_compound_compound' in query['sql'] for query in queries))
+        self.assertEqual(Compound.objects.count(), 5)
+
+        self.assertEqual(schema.execute_sync('{ projects { id } }').data['projects'], [])
+        for query in (
+            f'{{ projects(id: "{self.project.id}") {{ id }} }}',
+            f'{{ compounds(projectId: "{self.project.id}") {{ id }} }}',
+            f'{{ compoundsConnection(projectId: "{self.project.id}") {{ totalCount }} }}',
+            f'mutation {{ createCompound(projectId: "{self.project.id}", smiles: "CC") {{ id }} }}',
+        ):
+            result = schema.execute_sync(query)
+            self.assertEqual(result.errors[0].message, "Project matching query does not exist.", query)
+        compound = Compound.objects.first()
+        result = schema.execute_sync(f'mutation {{ deleteCompound(id: "{compound.id}") {{ id }} }}')
+        self.assertEqual(result.errors[0].message, "Compound matching query does not exist.")
+
+        progress = self.project_purge()
+        self.assertEqual(progress['totalCompounds'], 5)
+        self.assertEqual(progress['purgedCompounds'], 0)
+        self.assertIsNone(progress['finishedAt'])
+
+        result = schema.execute_sync(f'mutation {{ deleteProject(id: "{self.project.id}") {{ id }} }}')
+        self.assertEqual(result.errors[0].message, "Project matching query does not exist.")
+
+    def test_purge_in_batches(self):
+        self.delete_project()
+        job = purge.claim_purge()
+        self.assertIsNone(purge.claim_purge())
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(purge._purge_batch(job), 2)
+        deletes = [query['sql'] for query in queries if query['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 1)
+        self.assertIn('"project_compound_compound"', deletes[0])
+        self.assertEqual(self.project_purge()['purgedCompounds'], 2)
+        self.assertEqual(Compound.objects.count(), 3)
+
+        purge.run_purge(job)
+        progress = self.project_purge()
+        self.assertEqual(progress['purgedCompounds'], 5)
+        self.assertIsNotNone(progress['finishedAt'])
+        self.assertFalse(Compound.objects.exists())
+        self.assertFalse(Project.all_objects.filter(id=self.project.id).exists())
+        self.assertFalse(ProjectStats.objects.filter(project_id=self.project.id).exists())
+        self.assertIsNone(purge.claim_purge())
+
+    def test_expired_lease_is_resumed(self):
+        self.delete_project()
+        job = purge.claim_purge()
+        purge._purge_batch(job)
+        ProjectPurge.objects.filter(id=job.id).update(locked_until=timezone.now() - timedelta(seconds=1))
+
+        resumed = purge.claim_purge()
+        self.assertEqual((resumed.id, resumed.purged_compounds), (job.id, 2))
+        # The first worker lost its lease and stops at its next batch.
+        purge.run_purge(job)
+        self.assertEqual(Compound.objects.count(), 3)
+        purge.run_purge(resumed)
+        self.assertFalse(Compound.objects.exists())
+
+    def test_pending_imports_are_cancelled(self):
+        job = enqueue_import(self.project, [CompoundRow(1, "CCBr", None, None, None)])
+        self.delete_project()
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.Status.FAILED)
+        self.assertEqual(job.error, "The project was deleted.")
+
+    def test_worker_runs_purges(self):
+        self.delete_project()
+        out = StringIO()
+        call_command('run_import_worker', once=True, stdout=out)
+        self.assertIn("Ran 1 project purge.", out.getvalue())
+        self.assertFalse(Compound.objects.exists())
@@ -0,0 +1,129 @@
+from django.test import TestCase
+from project_compound.models import Project, Compound, ProjectStats
+from project_compound.schema import compound_schema, project_schema
+from project_compound.stats import recompute_project_stats
+
+
+STATS_QUERY = """
+query {
+    projects {
+        name
+        compoundCount
+        mwStats { count min max mean }
+        logPStats { count min max mean }
+    }
+}
+"""
+
+
+class ProjectStatsTest(TestCase):
+    def setUp(self):
+        result = project_schema.execute_sync(
+            'mutation { createProject(name: "ALZ-2024", description: "Beta-amyloid inhibitor") { id } }'
+        )
+        self.project_id = result.data['createProject']['id']
+
+    def project_stats(self):
+        result = project_schema.execute_sync(STATS_QUERY)
+        self.assertIsNone(result.errors)
+        return result.data['projects'][0]
+
+    def create_compound(self, smiles, mw=None, logP=None):
+        arguments = f'projectId: "{self.project_id}", smiles: "{smiles}"'
+        if mw is not None:
+            arguments += f', mw: {mw}'
+        if logP is not None:
+            arguments += f', logP: {logP}'
+        result = compound_schema.execute_sync(f'mutation {{ createCompound({arguments}) {{ id }} }}')
+        self.assertIsNone(result.errors)
+        return result.data['createCompound']['id']
+
+    def delete_compound(self, id):
+        result = compound_schema.execute_sync(f'mutation {{ deleteCompound(id: "{id}") {{ id }} }}')
+        self.assertIsNone(result.errors)
+
+    def test_new_project_has_empty_stats(self):
+        stats = self.project_stats()
+        self.assertEqual(stats['compoundCount'], 0)
+        self.assertEqual(stats['mwStats'], {'count': 0, 'min': None, 'max': None, 'mean': None})
+
+    def test_create_and_bulk_create_update_stats(self):
+        self.create_compound("CCO", mw=46.07, logP=-0.31)
+        result = compound_schema.execute_sync(f"""
+        mutation {{
+            bulkCreateCompounds(projectId: "{self.project_id}", compounds: [
+                {{ smiles: "CCN", mw: 45.08 }},
+                {{ smiles: "CCC", mw: 44.1, logP: 2.36 }},
+                {{ smiles: "C" }}
+            ]) {{ id }}
+        }}
+        """)
+        self.assertIsNone(result.errors)
+
+        stats = self.project_stats()
+        self.assertEqual(stats['compoundCount'], 4)
+        self.assertEqual(stats['mwStats']['count'], 3)
+        self.assertEqual(stats['mwStats']['min'], 44.1)
+        self.assertEqual(stats['mwStats']['max'], 46.07)
+        self.assertAlmostEqual(stats['mwStats']['mean'], (46.07 + 45.08 + 44.1) / 3)
+        self.assertEqual(stats['logPStats']['count'], 2)
+        self.assertAlmostEqual(stats['logPStats']['mean'], (-0.31 + 2.36) / 2)
+
+    def test_delete_recomputes_extremes_only_when_needed(self):
+        self.create_compound("CCO", mw=46.07)
+        lightest = self.create_compound("C", mw=16.04)
+        middle = self.create_compound("CC", mw=30.07)
+
+        self.delete_compound(middle)
+        stats = self.project_stats()
+        self.assertEqual(stats['compoundCount'], 2)
+        self.assertEqual((stats['mwStats']['min'], stats['mwStats']['max']), (16.04, 46.07))
+
+        self.delete_compound(lightest)
+        stats = self.project_stats()
+        self.assertEqual((stats['mwStats']['min'], stats['mwStats']['max']), (46.07, 46.07))
+        self.assertAlmostEqual(stats['mwStats']['mean'], 46.07)
+
+    def test_deleting_last_value_clears_property(self):
+        id = self.create_compound("CCO", mw=46.07)
+        self.delete_compound(id)
+        stats = self.project_stats()
+        self.assertEqual(stats['compoundCount'], 0)
+        self.assertEqual(stats['mwStats'], {'count': 0, 'min': None, 'max': None, 'mean': None})
+
+    def test_project_without_stats_row_is_rebuilt_on_insert(self):
+        project = Project.objects.create(name="ONC-789", description="EGFR kinase inhibitor")
+        Compound.objects.create(project=project, smiles="CCO", mw=46.07)
+        result = compound_schema.execute_sync(
+            f'mutation {{ createCompound(projectId: "{project.id}", smiles: "CCN", mw: 45.08) {{ id }} }}'
+        )
+        self.assertIsNone(result.errors)
+
+        stats = ProjectStats.objects.get(project=project)
+        self.assertEqual(stats.compound_count, 2)
+        self.assertEqual((stats.mw_min, stats.mw_max), (45.08, 46.07))
+
+    def test_incremental_stats_match_recompute(self):
+        self.create_compound("CCO", mw=46.07, logP=-0.31)
+        self.create_compound("CCN", mw=45.08)
+        self.delete_compound(self.create_compound("CCC", mw=44.1, logP=2.36))
+
+        incremental = ProjectStats.objects.values().get(project_id=self.project_id)
+        recompute_project_stats(self.project_id)
+        recomputed = ProjectStats.objects.values().get(project_id=self.project_id)
+        self.assertEqual(incremental.keys(), recomputed.keys())
+        for field, value in recomputed.items():
+            if field.endswith('_sum'):
+                self.assertAlmostEqual(incremental[field], value)
+            else:
+                self.assertEqual(incremental[field], value)
+
+    def test_listing_stats_in_a_single_query(self):
+        for i in range(3):
+            project_schema.execute_sync(
+                f'mutation {{ createProject(name: "P{i}", description: "d") {{ id }} }}'
+            )
+        with self.assertNumQueries(1):
+            result = project_schema.execute_sync(STATS_QUERY)
+        self.assertIsNone(result.errors)
+        self.assertEqual(len(result.data['projects']), 4)
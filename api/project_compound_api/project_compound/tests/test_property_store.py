@@ -0,0 +1,134 @@
+from django.test import TestCase, override_settings
+from project_compound.models import Project, Compound
+from project_compound.property_store import property_columns
+from project_compound.schema import compound_schema as schema, project_schema
+
+
+SLICE_FIELDS = """
+    totalCount
+    rows { id mw logD logP }
+    mwStats { count min max mean }
+    logPStats { count min max mean }
+"""
+
+
+class PropertyStoreTest(TestCase):
+    def setUp(self):
+        property_columns.clear()
+        result = project_schema.execute_sync(
+            'mutation { createProject(name: "ALZ-2024", description: "Beta-amyloid inhibitor") { id } }'
+        )
+        self.project_id = result.data['createProject']['id']
+        rows = [
+            ("CC(=O)OC1=CC=CC=C1C(=O)O", 180.16, -0.73, 1.19),
+            ("CC(C)CC1=CC=C(C=C1)C(C)C(=O)O", 206.28, 0.45, 3.97),
+            ("CN1C=NC2=C1C(=O)N(C(=O)N2C)C", 194.19, None, -0.07),
+            ("CCO", None, None, -0.31),
+            ("CCN", 180.16, 2.0, None),
+        ]
+        compounds = ", ".join(
+            "{ smiles: \"%s\", mw: %s, logD: %s, logP: %s }" % tuple(
+                "null" if value is None else value for value in row
+            )
+            for row in rows
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            result = schema.execute_sync(f"""
+            mutation {{
+                bulkCreateCompounds(projectId: "{self.project_id}", compounds: [{compounds}]) {{ id }}
+            }}
+            """)
+        self.assertIsNone(result.errors)
+        self.ids = [c['id'] for c in result.data['bulkCreateCompounds']]
+
+    def query_slice(self, arguments=""):
+        result = schema.execute_sync(f"""
+        query {{
+            compoundProperties(projectId: "{self.project_id}"{arguments}) {{ {SLICE_FIELDS} }}
+        }}
+        """)
+        self.assertIsNone(result.errors)
+        return result.data['compoundProperties']
+
+    def assert_store_matches_sql(self, arguments=""):
+        with override_settings(PROPERTY_STORE={'ENABLED': True, 'MAX_PROJECTS': 4}):
+            from_store = self.query_slice(arguments)
+        from_sql = self.query_slice(arguments)
+        self.assertEqual(from_store['totalCount'], from_sql['totalCount'])
+        self.assertEqual(from_store['rows'], from_sql['rows'])
+        for stats in ('mwStats', 'logPStats'):
+            self.assertEqual(from_store[stats]['count'], from_sql[stats]['count'])
+            self.assertEqual(from_store[stats]['min'], from_sql[stats]['min'])
+            self.assertEqual(from_store[stats]['max'], from_sql[stats]['max'])
+            if from_sql[stats]['mean'] is None:
+                self.assertIsNone(from_store[stats]['mean'])
+            else:
+                self.assertAlmostEqual(from_store[stats]['mean'], from_sql[stats]['mean'])
+        return from_store
+
+    def test_store_matches_sql(self):
+        cases = [
+            "",
+            ", filter: { mw: { gte: 180.16, lt: 200 } }",
+            ", filter: { logD: { isNull: true } }",
+            ", filter: { logP: { gt: 0 } }, orderBy: [{ field: LOG_P, direction: DESC }]",
+            ", orderBy: [{ field: MW }, { field: LOG_D, direction: DESC }]",
+            ", orderBy: [{ field: LOG_D }], first: 2",
+            ", orderBy: [{ field: ID, direction: DESC }]",
+        ]
+        for arguments in cases:
+            with self.subTest(arguments=arguments):
+                self.assert_store_matches_sql(arguments)
+
+    def test_store_answers_without_sql_once_loaded(self):
+        with override_settings(PROPERTY_STORE={'ENABLED': True, 'MAX_PROJECTS': 4}):
+            self.query_slice()
+            # project lookup + the index catch-up and count check
+            with self.assertNumQueries(3):
+                data = self.query_slice(", filter: { mw: { isNull: false } }")
+        self.assertEqual(data['totalCount'], 4)
+        self.assertEqual(data['mwStats']['max'], 206.28)
+
+    def test_store_follows_mutations(self):
+        with override_settings(PROPERTY_STORE={'ENABLED': True, 'MAX_PROJECTS': 4}):
+            self.query_slice()
+            index = property_columns.loaded(self.project_id)
+            with self.captureOnCommitCallbacks(execute=True):
+                schema.execute_sync(
+                    f'mutation {{ createCompound(projectId: "{self.project_id}", smiles: "CCC", mw: 44.1) {{ id }} }}'
+                )
+                schema.execute_sync(f'mutation {{ deleteCompound(id: "{self.ids[1]}") {{ id }} }}')
+            self.assertEqual(index.size, 5)
+            data = self.assert_store_matches_sql(", orderBy: [{ field: MW }]")
+        self.assertEqual(data['rows'][0]['mw'], 44.1)
+        self.assertNotIn(self.ids[1], [row['id'] for row in data['rows']])
+
+    def test_structure_filter_falls_back_to_sql(self):
+        with override_settings(PROPERTY_STORE={'ENABLED': True, 'MAX_PROJECTS': 4}):
+            data = self.query_slice(', filter: { structure: "OCC" }')
+        self.assertEqual([row['id'] for row in data['rows']], [self.ids[3]])
+        self.assertIsNone(property_columns.loaded(self.project_id))
+
+    def test_usage_is_reported_per_project(self):
+        with override_settings(PROPERTY_STORE={'ENABLED': True, 'MAX_PROJECTS': 4}):
+            self.query_slice()
+        result = schema.execute_sync("query { propertyStoreUsage { projectId rows bytes } }")
+        usage = result.data['propertyStoreUsage']
+        self.assertEqual(len(usage), 1)
+        self.assertEqual(usage[0]['projectId'], self.project_id)
+        self.assertEqual(usage[0]['rows'], 5)
+        self.assertGreater(usage[0]['bytes'], 0)
+
+    def test_first_is_bounded(self):
+        result = schema.execute_sync(
+            f'query {{ compoundProperties(projectId: "{self.project_id}", first: 0) {{ totalCount }} }}'
+        )
+        self.assertEqual(result.errors[0].message, "first must be between 1 and 1000.")
+
+    def test_unknown_project(self):
+        Compound.objects.all().delete()
+        Project.objects.all().delete()
+        result = schema.execute_sync(
+            f'query {{ compoundProperties(projectId: "{self.project_id}") {{ totalCount }} }}'
+        )
+        self.assertEqual(result.errors[0].message, "Project matching query does not exist.")
@@ -1,6 +1,6 @@
 from django.test import TestCase
 from project_compound.models import Project, Compound
-from project_compound.schema_compound import compound_schema as schema
+from project_compound.schema import compound_schema as schema
 
 
 class CompoundQueryTest(TestCase):
@@ -136,3 +136,229 @@ class CompoundQueryTest(TestCase):
         self.assertEqual(result.data['compounds'][0]['id'], str(self.compound3.id))
         self.assertEqual(result.data['compounds'][0]['smiles'], self.compound3.smiles)
 
+
+
+class CompoundConnectionQueryTest(TestCase):
+    def setUp(self):
+        self.project = Project.objects.create(
+            name="ALZ-2024",
+            description="Beta-amyloid inhibitor for Alzheimer's disease"
+        )
+        self.other_project = Project.objects.create(
+            name="ONC-789",
+            description="EGFR kinase inhibitor for lung cancer"
+        )
+        self.compounds = [
+            Compound.objects.create(project=self.project, smiles="C" * (i + 1))
+            for i in range(5)
+        ]
+        Compound.objects.create(project=self.other_project, smiles="CCO")
+
+    def query_page(self, first, after=None):
+        after_argument = f', after: "{after}"' if after else ""
+        query = f"""
+        query {{
+            compoundsConnection(projectId: "{self.project.id}", first: {first}{after_argument}) {{
+                totalCount
+                edges {{
+                    cursor
+                    node {{
+                        id
+                        smiles
+                    }}
+                }}
+                pageInfo {{
+                    hasNextPage
+                    endCursor
+                }}
+            }}
+        }}
+        """
+        return schema.execute_sync(query)
+
+    def test_pages_through_all_compounds(self):
+        seen = []
+        after = None
+        while True:
+            result = self.query_page(2, after)
+            self.assertIsNone(result.errors)
+            connection = result.data['compoundsConnection']
+            self.assertEqual(connection['totalCount'], 5)
+            seen.extend(edge['node']['id'] for edge in connection['edges'])
+            if not connection['pageInfo']['hasNextPage']:
+                break
+            after = connection['pageInfo']['endCursor']
+            self.assertEqual(after, connection['edges'][-1]['cursor'])
+
+        self.assertEqual(seen, [str(c.id) for c in self.compounds])
+
+    def test_page_uses_keyset_condition(self):
+        first_page = self.query_page(3).data['compoundsConnection']
+        after = first_page['pageInfo']['endCursor']
+
+        # project lookup + page query (totalCount adds one COUNT)
+        with self.assertNumQueries(3) as context:
+            result = self.query_page(3, after)
+        page_sql = context.captured_queries[1]['sql']
+        self.assertIn('"id" >', page_sql)
+        self.assertNotIn('OFFSET', page_sql)
+
+        connection = result.data['compoundsConnection']
+        self.assertEqual([e['node']['id'] for e in connection['edges']], [str(c.id) for c in self.compounds[3:]])
+        self.assertFalse(connection['pageInfo']['hasNextPage'])
+
+    def test_empty_page(self):
+        Compound.objects.filter(project=self.project).delete()
+        connection = self.query_page(10).data['compoundsConnection']
+        self.assertEqual(connection['edges'], [])
+        self.assertEqual(connection['totalCount'], 0)
+        self.assertFalse(connection['pageInfo']['hasNextPage'])
+        self.assertIsNone(connection['pageInfo']['endCursor'])
+
+    def test_invalid_cursor(self):
+        result = self.query_page(2, "not-a-cursor")
+        self.assertIsNone(result.data)
+        self.assertEqual(result.errors[0].message, "Invalid cursor.")
+
+    def test_page_size_is_bounded(self):
+        result = self.query_page(0)
+        self.assertIsNone(result.data)
+        self.assertEqual(result.errors[0].message, "first must be between 1 and 1000.")
+
+
+class CompoundRelationQueryCountTest(TestCase):
+    def setUp(self):
+        self.project = Project.objects.create(
+            name="ALZ-2024",
+            description="Beta-amyloid inhibitor for Alzheimer's disease"
+        )
+
+    def create_compounds(self, count):
+        Compound.objects.bulk_create(
+            Compound(project=self.project, smiles="C" * (i + 1)) for i in range(count)
+        )
+
+    def assert_query_count_is_constant(self, query, expected):
+        for count in (1, 25):
+            Compound.objects.all().delete()
+            self.create_compounds(count)
+            with self.assertNumQueries(expected):
+                result = schema.execute_sync(query)
+            self.assertIsNone(result.errors)
+
+    def test_compounds_with_project_does_not_issue_a_query_per_compound(self):
+        query = f"""
+        query {{
+            compounds(projectId: "{self.project.id}") {{
+                id
+                project {{
+                    name
+                }}
+            }}
+        }}
+        """
+        # project lookup + one compounds query joined with project
+        self.assert_query_count_is_constant(query, 2)
+
+    def test_compounds_connection_with_project_does_not_issue_a_query_per_compound(self):
+        query = f"""
+        query {{
+            compoundsConnection(projectId: "{self.project.id}", first: 100) {{
+                edges {{
+                    node {{
+                        id
+                        project {{
+                            name
+                        }}
+                    }}
+                }}
+            }}
+        }}
+        """
+        self.assert_query_count_is_constant(query, 2)
+
+
+class CompoundFilterQueryTest(TestCase):
+    def setUp(self):
+        self.project = Project.objects.create(
+            name="ALZ-2024",
+            description="Beta-amyloid inhibitor for Alzheimer's disease"
+        )
+        self.aspirin = Compound.objects.create(
+            project=self.project, smiles="CC(=O)OC1=CC=CC=C1C(=O)O", mw=180.16, logD=-0.73, logP=1.19
+        )
+        self.ibuprofen = Compound.objects.create(
+            project=self.project, smiles="CC(C)CC1=CC=C(C=C1)C(C)C(=O)O", mw=206.28, logD=0.45, logP=3.97
+        )
+        self.atorvastatin = Compound.objects.create(
+            project=self.project, smiles="CC(C)C1=C(C(=C(N1CCC(CC(CC(=O)O)O)O)C2=CC=C(C=C2)F)", mw=558.64, logD=1.21, logP=4.06
+        )
+        self.unknown = Compound.objects.create(project=self.project, smiles="CCO")
+
+    def query_ids(self, arguments):
+        query = f"""
+        query {{
+            compounds(projectId: "{self.project.id}", {arguments}) {{
+                id
+            }}
+        }}
+        """
+        result = schema.execute_sync(query)
+        self.assertIsNone(result.errors)
+        return [c['id'] for c in result.data['compounds']]
+
+    def test_filter_by_property_ranges_sorted(self):
+        ids = self.query_ids(
+            "filter: { mw: { lt: 500 }, logP: { lt: 5 } }, orderBy: [{ field: LOG_D, direction: DESC }]"
+        )
+        self.assertEqual(ids, [str(self.ibuprofen.id), str(self.aspirin.id)])
+
+    def test_filter_with_inclusive_bounds(self):
+        ids = self.query_ids("filter: { mw: { gte: 206.28, lte: 558.64 } }")
+        self.assertCountEqual(ids, [str(self.ibuprofen.id), str(self.atorvastatin.id)])
+
+    def test_filter_null_and_not_null(self):
+        self.assertEqual(self.query_ids("filter: { mw: { isNull: true } }"), [str(self.unknown.id)])
+        self.assertEqual(len(self.query_ids("filter: { logD: { isNull: false } }")), 3)
+
+    def test_multi_key_order_puts_nulls_last(self):
+        duplicate = Compound.objects.create(project=self.project, smiles="CCN", mw=180.16, logD=2.0)
+        ids = self.query_ids("orderBy: [{ field: MW }, { field: LOG_D, direction: DESC }]")
+        self.assertEqual(ids, [
+            str(duplicate.id),
+            str(self.aspirin.id),
+            str(self.ibuprofen.id),
+            str(self.atorvastatin.id),
+            str(self.unknown.id),
+        ])
+
+    def test_filter_on_compounds_connection(self):
+        query = f"""
+        query {{
+            compoundsConnection(projectId: "{self.project.id}", filter: {{ logP: {{ gt: 2 }} }}) {{
+                totalCount
+                edges {{
+                    node {{
+                        id
+                    }}
+                }}
+            }}
+        }}
+        """
+        result = schema.execute_sync(query)
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['compoundsConnection']['totalCount'], 2)
+
+    def test_filter_by_structure_matches_any_spelling(self):
+        aspirin_kekule = "O=C(O)c1ccccc1OC(C)=O"
+        self.assertEqual(self.query_ids(f'filter: {{ structure: "{aspirin_kekule}" }}'), [str(self.aspirin.id)])
+        self.assertEqual(self.query_ids('filter: { structure: "OCC", mw: { isNull: true } }'), [str(self.unknown.id)])
+        self.assertEqual(self.query_ids('filter: { structure: "CCN" }'), [])
+
+    def test_structure_lookup_uses_hash_index(self):
+        queryset = Compound.objects.filter(project=self.project, smiles_hash=self.unknown.smiles_hash)
+        self.assertIn('compound_project_hash_idx', queryset.explain())
+
+    def test_property_range_uses_project_index(self):
+        queryset = Compound.objects.filter(project=self.project, mw__lt=500)
+        self.assertIn('compound_project_mw_idx', queryset.explain())
@@ -0,0 +1,99 @@
+import json
+
+from django.test import TestCase, override_settings
+from project_compound.models import Project, Compound
+from project_compound.schema import compound_schema as schema, project_schema
+from project_compound.stats import recompute_project_stats
+
+LIMITS = {'MAX_COST': 10000, 'MAX_DEPTH': 8, 'ENFORCE': True}
+
+
+def aliased_compounds(project_id, count):
+    fields = " ".join(f'c{i}: compounds(projectId: "{project_id}") {{ id }}' for i in range(count))
+    return f"query Aliased {{ {fields} }}"
+
+
+@override_settings(GRAPHQL_LIMITS=LIMITS)
+class QueryCostTest(TestCase):
+    def setUp(self):
+        self.project = Project.objects.create(name="ALZ-2024", description="Beta-amyloid inhibitor")
+        Compound.objects.create(project=self.project, smiles="CCO", mw=46.07)
+        recompute_project_stats(self.project.id)
+
+    def test_cost_is_logged(self):
+        query = """
+        query GetCompounds($projectId: ID!) {
+            compounds(projectId: $projectId) { id smiles project { name mwStats { min } } }
+        }
+        """
+        with self.assertLogs('project_compound.extensions', 'INFO') as logs:
+            result = schema.execute_sync(query, variable_values={'projectId': self.project.id})
+        self.assertIsNone(result.errors)
+        self.assertEqual(logs.output, ["INFO:project_compound.extensions:query GetCompounds cost=3000 depth=3"])
+
+    def test_aliases_are_rejected_before_execution(self):
+        with self.assertNumQueries(0), self.assertLogs('project_compound.extensions', 'WARNING'):
+            result = schema.execute_sync(aliased_compounds(self.project.id, 11))
+        self.assertIsNone(result.data)
+        self.assertEqual(result.errors[0].message, "Query cost 11000 exceeds the maximum of 10000.")
+        self.assertEqual(
+            result.errors[0].extensions,
+            {'code': 'QUERY_TOO_COMPLEX', 'cost': 11000, 'maximumCost': 10000}
+        )
+
+        result = schema.execute_sync(aliased_compounds(self.project.id, 10))
+        self.assertIsNone(result.errors)
+
+    def test_size_argument_comes_from_variables(self):
+        query = """
+        query Page($projectId: ID!, $first: Int!) {
+            compoundsConnection(projectId: $projectId, first: $first) {
+                edges { node { id project { name } } }
+                ...Count
+            }
+        }
+        fragment Count on CompoundConnection { totalCount }
+        """
+        with override_settings(GRAPHQL_LIMITS={**LIMITS, 'MAX_COST': 500}):
+            # 1 for the connection, 10 for totalCount, 3 per edge
+            with self.assertLogs('project_compound.extensions', 'INFO') as logs:
+                result = schema.execute_sync(query, variable_values={'projectId': self.project.id, 'first': 100})
+            self.assertIsNone(result.errors)
+            self.assertIn("cost=311", logs.output[0])
+
+            result = schema.execute_sync(query, variable_values={'projectId': self.project.id, 'first': 1000})
+            self.assertEqual(result.errors[0].extensions['code'], 'QUERY_TOO_COMPLEX')
+            self.assertEqual(result.errors[0].extensions['cost'], 3011)
+
+    @override_settings(GRAPHQL_LIMITS={**LIMITS, 'MAX_DEPTH': 2})
+    def test_depth_limit(self):
+        result = schema.execute_sync(
+            f'{{ compounds(projectId: "{self.project.id}") {{ project {{ mwStats {{ min }} }} }} }}'
+        )
+        self.assertEqual(result.errors[0].message, "Query depth 3 exceeds the maximum of 2.")
+        self.assertEqual(result.errors[0].extensions['code'], 'QUERY_TOO_DEEP')
+
+    def test_introspection_is_free(self):
+        with self.assertLogs('project_compound.extensions', 'INFO') as logs:
+            result = schema.execute_sync("{ __schema { types { name fields { name type { name } } } } }")
+        self.assertIsNone(result.errors)
+        self.assertIn("cost=0 depth=0", logs.output[0])
+
+    @override_settings(GRAPHQL_LIMITS={**LIMITS, 'ENFORCE': False})
+    def test_over_budget_operations_are_only_logged_when_not_enforced(self):
+        with self.assertLogs('project_compound.extensions', 'WARNING') as logs:
+            result = schema.execute_sync(aliased_compounds(self.project.id, 11))
+        self.assertIsNone(result.errors)
+        self.assertEqual(len(result.data), 11)
+        self.assertEqual(
+            logs.output, ["WARNING:project_compound.extensions:query Aliased cost=11000 depth=1 over budget"]
+        )
+
+    @override_settings(GRAPHQL_LIMITS={**LIMITS, 'MAX_COST': 100})
+    def test_project_schema_over_http(self):
+        query = "{ " + " ".join(f"p{i}: projects {{ id }}" for i in range(2)) + " }"
+        response = self.client.post('/projects/', json.dumps({'query': query}), content_type='application/json')
+        self.assertEqual(response.json()['errors'][0]['extensions']['code'], 'QUERY_TOO_COMPLEX')
+
+        result = project_schema.execute_sync("{ projects { id } }")
+        self.assertIsNone(result.errors)
@@ -0,0 +1,153 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from project_compound import cache as result_cache
+from project_compound.cache import LocalResultCache, get_result_cache
+from project_compound.jobs import enqueue_import, run_pending_jobs
+from project_compound.models import Project, Compound
+from project_compound.parsers import CompoundRow
+from project_compound.stats import recompute_project_stats
+from project_compound.schema import compound_schema, project_schema
+
+
+@override_settings(RESULT_CACHE={'BACKEND': 'local', 'MAXSIZE': 64})
+class LocalResultCacheTest(TestCase):
+    def setUp(self):
+        get_result_cache().results.clear()
+        self.project = Project.objects.create(
+            name="ALZ-2024",
+            description="Beta-amyloid inhibitor for Alzheimer's disease"
+        )
+        Compound.objects.create(project=self.project, smiles="CCO", mw=46.07)
+        self.compounds_query = f"""
+        query {{
+            compounds(projectId: "{self.project.id}") {{
+                smiles
+                project {{
+                    name
+                }}
+            }}
+        }}
+        """
+
+    def execute_mutation(self, schema, mutation):
+        with self.captureOnCommitCallbacks(execute=True):
+            result = schema.execute_sync(mutation)
+        self.assertIsNone(result.errors)
+        return result
+
+    def compound_smiles(self):
+        result = compound_schema.execute_sync(self.compounds_query)
+        self.assertIsNone(result.errors)
+        return [c['smiles'] for c in result.data['compounds']]
+
+    def test_repeated_read_is_served_from_cache(self):
+        self.assertEqual(self.compound_smiles(), ["CCO"])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.compound_smiles(), ["CCO"])
+        self.assertEqual(get_result_cache().stats()['hits'], 1)
+
+    def test_writes_from_another_process_invalidate(self):
+        recompute_project_stats(self.project.id)
+        self.compound_smiles()
+        query = "query { projects { compoundCount } }"
+        self.assertEqual(project_schema.execute_sync(query).data['projects'], [{'compoundCount': 1}])
+
+        # The import worker: its own process, so its own in-process cache.
+        job = enqueue_import(self.project, [CompoundRow(1, "CCN", None, None, None)])
+        with mock.patch.object(result_cache, '_result_cache', LocalResultCache()):
+            with self.captureOnCommitCallbacks(execute=True):
+                run_pending_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.inserted, 1)
+
+        self.assertEqual(self.compound_smiles(), ["CCO", "CCN"])
+        self.assertEqual(project_schema.execute_sync(query).data['projects'], [{'compoundCount': 2}])
+
+    def test_different_arguments_are_cached_separately(self):
+        self.compound_smiles()
+        query = f'query {{ compounds(projectId: "{self.project.id}", filter: {{ mw: {{ gt: 100 }} }}) {{ smiles }} }}'
+        result = compound_schema.execute_sync(query)
+        self.assertEqual(result.data['compounds'], [])
+
+    def test_compound_mutations_invalidate_project(self):
+        self.compound_smiles()
+
+        self.execute_mutation(compound_schema, f"""
+        mutation {{ createCompound(projectId: "{self.project.id}", smiles: "CCN") {{ id }} }}
+        """)
+        self.assertEqual(self.compound_smiles(), ["CCO", "CCN"])
+
+        self.execute_mutation(compound_schema, f"""
+        mutation {{
+            bulkCreateCompounds(projectId: "{self.project.id}", compounds: [{{ smiles: "CCC" }}]) {{ id }}
+        }}
+        """)
+        self.assertEqual(self.compound_smiles(), ["CCO", "CCN", "CCC"])
+
+        compound = Compound.objects.get(smiles="CCO")
+        self.execute_mutation(compound_schema, f'mutation {{ deleteCompound(id: "{compound.id}") {{ id }} }}')
+        self.assertEqual(self.compound_smiles(), ["CCN", "CCC"])
+
+    def test_mutation_on_other_project_keeps_cache(self):
+        other = Project.objects.create(name="ONC-789", description="EGFR kinase inhibitor")
+        self.compound_smiles()
+
+        self.execute_mutation(compound_schema, f"""
+        mutation {{ createCompound(projectId: "{other.id}", smiles: "CCN") {{ id }} }}
+        """)
+        with self.assertNumQueries(0):
+            self.compound_smiles()
+
+    def test_project_mutations_invalidate_listing(self):
+        query = "query { projects { name } }"
+        self.assertEqual(len(project_schema.execute_sync(query).data['projects']), 1)
+        with self.assertNumQueries(0):
+            project_schema.execute_sync(query)
+
+        self.execute_mutation(project_schema, 'mutation { createProject(name: "ONC-789", description: "EGFR") { id } }')
+        self.assertEqual(len(project_schema.execute_sync(query).data['projects']), 2)
+
+        self.execute_mutation(project_schema, f"""
+        mutation {{ updateProject(id: "{self.project.id}", name: "Renamed", description: "d") {{ id }} }}
+        """)
+        names = [p['name'] for p in project_schema.execute_sync(query).data['projects']]
+        self.assertIn("Renamed", names)
+
+    def test_project_update_invalidates_compounds(self):
+        self.compound_smiles()
+        self.execute_mutation(project_schema, f"""
+        mutation {{ updateProject(id: "{self.project.id}", name: "Renamed", description: "d") {{ id }} }}
+        """)
+        result = compound_schema.execute_sync(self.compounds_query)
+        self.assertEqual(result.data['compounds'][0]['project']['name'], "Renamed")
+
+    def test_errors_are_not_cached(self):
+        query = 'query { compounds(projectId: "99999") { id } }'
+        for _ in range(2):
+            result = compound_schema.execute_sync(query)
+            self.assertEqual(result.errors[0].message, "Project matching query does not exist.")
+
+
+@override_settings(RESULT_CACHE={'BACKEND': 'django', 'ALIAS': 'default', 'TIMEOUT': None})
+class DjangoResultCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.project = Project.objects.create(name="ALZ-2024", description="Beta-amyloid inhibitor")
+
+    def test_shared_cache_backend(self):
+        query = "query { projects { name } }"
+        project_schema.execute_sync(query)
+        with self.assertNumQueries(0):
+            result = project_schema.execute_sync(query)
+        self.assertEqual(result.data['projects'], [{'name': "ALZ-2024"}])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            project_schema.execute_sync('mutation { createProject(name: "ONC-789", description: "EGFR") { id } }')
+        self.assertEqual(len(project_schema.execute_sync(query).data['projects']), 2)
+
+
+class DisabledResultCacheTest(TestCase):
+    def test_cache_is_off_by_default(self):
+        self.assertIsNone(get_result_cache())
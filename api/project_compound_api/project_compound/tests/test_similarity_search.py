@@ -0,0 +1,132 @@
+from django.test import TestCase
+from project_compound.fingerprints import morgan_fingerprint
+from project_compound.models import Project, Compound
+from project_compound.schema import compound_schema as schema, project_schema
+from project_compound.similarity import similarity_indexes
+from project_compound.smiles import parse_smiles
+
+
+ASPIRIN = "CC(=O)OC1=CC=CC=C1C(=O)O"
+
+
+class SimilaritySearchTest(TestCase):
+    def setUp(self):
+        similarity_indexes.clear()
+        result = project_schema.execute_sync(
+            'mutation { createProject(name: "ALZ-2024", description: "Beta-amyloid inhibitor") { id } }'
+        )
+        self.project = Project.objects.get(id=result.data['createProject']['id'])
+        self.aspirin = self.create_compound(ASPIRIN)
+        self.methyl_salicylate = self.create_compound("COC(=O)C1=CC=CC=C1O")
+        self.ibuprofen = self.create_compound("CC(C)CC1=CC=C(C=C1)C(C)C(=O)O")
+        self.ethanol = self.create_compound("CCO")
+
+    def create_compound(self, smiles):
+        with self.captureOnCommitCallbacks(execute=True):
+            result = schema.execute_sync(
+                f'mutation {{ createCompound(projectId: "{self.project.id}", smiles: "{smiles}") {{ id }} }}'
+            )
+        self.assertIsNone(result.errors)
+        return result.data['createCompound']['id']
+
+    def similar(self, smiles, arguments=""):
+        result = schema.execute_sync(f"""
+        query {{
+            similarCompounds(projectId: "{self.project.id}", smiles: "{smiles}"{arguments}) {{
+                similarity
+                compound {{
+                    id
+                    project {{
+                        name
+                    }}
+                }}
+            }}
+        }}
+        """)
+        self.assertIsNone(result.errors)
+        return result.data['similarCompounds']
+
+    def test_ranks_by_tanimoto_similarity(self):
+        hits = self.similar(ASPIRIN, ", k: 3")
+        self.assertEqual(len(hits), 3)
+        self.assertEqual(hits[0]['compound']['id'], self.aspirin)
+        self.assertEqual(hits[0]['similarity'], 1.0)
+        self.assertEqual(hits[1]['compound']['id'], self.methyl_salicylate)
+        self.assertEqual(hits[0]['compound']['project']['name'], "ALZ-2024")
+        similarities = [hit['similarity'] for hit in hits]
+        self.assertEqual(similarities, sorted(similarities, reverse=True))
+
+    def test_threshold_prunes_by_bit_count(self):
+        hits = self.similar(ASPIRIN, ", threshold: 0.9")
+        self.assertEqual([hit['compound']['id'] for hit in hits], [self.aspirin])
+
+        index = similarity_indexes.get(self.project.id)
+        query = morgan_fingerprint(parse_smiles(ASPIRIN))
+        _, pruned = index.search(query, 10, 0.9)
+        self.assertGreater(pruned, 0)
+        exhaustive, _ = index.search(query, 10, 0.0)
+        expected = [hit for hit in exhaustive if hit.similarity >= 0.9]
+        self.assertEqual(index.search(query, 10, 0.9)[0], expected)
+
+    def test_index_is_updated_incrementally(self):
+        self.similar(ASPIRIN)
+        index = similarity_indexes.loaded(self.project.id)
+        self.assertEqual(index.size, 4)
+
+        salicylic_acid = self.create_compound("OC(=O)C1=CC=CC=C1O")
+        self.assertEqual(index.size, 5)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            schema.execute_sync(f'mutation {{ deleteCompound(id: "{self.aspirin}") {{ id }} }}')
+        self.assertEqual(index.size, 4)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            schema.execute_sync(f"""
+            mutation {{
+                bulkCreateCompounds(projectId: "{self.project.id}", compounds: [{{ smiles: "CCN" }}]) {{ id }}
+            }}
+            """)
+        self.assertEqual(index.size, 5)
+
+        hits = self.similar(ASPIRIN, ", k: 1")
+        self.assertEqual(hits[0]['compound']['id'], salicylic_acid)
+        self.assertIs(similarity_indexes.loaded(self.project.id), index)
+
+    def test_index_catches_up_with_writes_from_elsewhere(self):
+        self.similar(ASPIRIN)
+        propanol = Compound.objects.create(project=self.project, smiles="CCCO")
+        hits = self.similar("CCCO", ", k: 1")
+        self.assertEqual(hits[0]['compound']['id'], str(propanol.id))
+
+        Compound.objects.filter(id=self.aspirin).delete()
+        hits = self.similar(ASPIRIN, ", k: 1")
+        self.assertNotEqual(hits[0]['compound']['id'], self.aspirin)
+
+    def test_property_updates_keep_the_index(self):
+        self.similar(ASPIRIN)
+        index = similarity_indexes.loaded(self.project.id)
+        fingerprints = index.arrays['fingerprint']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = schema.execute_sync(f"""
+            mutation {{
+                updateCompounds(projectId: "{self.project.id}", compounds: [{{ id: "{self.aspirin}", mw: 180.16 }}]) {{
+                    updatedCount
+                }}
+            }}
+            """)
+        self.assertIsNone(result.errors)
+        self.similar(ASPIRIN)
+        self.assertIs(index.arrays['fingerprint'], fingerprints)
+
+    def test_invalid_arguments(self):
+        cases = [
+            (f'smiles: "{ASPIRIN}", k: 0', "k must be between 1 and 1000."),
+            (f'smiles: "{ASPIRIN}", threshold: 1.5', "threshold must be between 0 and 1."),
+            ('smiles: "C1(("', "Invalid SMILES."),
+        ]
+        for arguments, message in cases:
+            result = schema.execute_sync(
+                f'query {{ similarCompounds(projectId: "{self.project.id}", {arguments}) {{ similarity }} }}'
+            )
+            self.assertEqual(result.errors[0].message, message)
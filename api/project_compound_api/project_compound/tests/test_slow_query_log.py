@@ -0,0 +1,89 @@
+import json
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from project_compound import slowlog
+from project_compound.models import Project, Compound
+from project_compound.schema import schema
+
+LOG_ALL = {'THRESHOLD_MS': 0, 'EXPLAIN': True, 'MAX_PER_MINUTE': 10}
+
+GET_COMPOUNDS = """
+query GetCompounds($projectId: ID!, $filter: CompoundFilter) {
+    compounds(projectId: $projectId, filter: $filter) { id smiles }
+}
+"""
+
+
+@override_settings(SLOW_QUERY_LOG=LOG_ALL)
+class SlowQueryLogTest(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(slowlog, 'limiter', slowlog.RateLimiter())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.project = Project.objects.create(name="ALZ-2024", description="Beta-amyloid inhibitor")
+        Compound.objects.create(project=self.project, smiles="CCO", mw=46.07)
+
+    def test_statement_is_logged_with_plan(self):
+        variables = {'projectId': self.project.id, 'filter': {'mw': {'gte': 40}}}
+        with self.assertLogs('project_compound.slowlog') as logs:
+            result = schema.execute_sync(GET_COMPOUNDS, variable_values=variables)
+        self.assertIsNone(result.errors)
+        # The project, then its compounds.
+        self.assertEqual(len(logs.records), 2)
+        entry = logs.records[1]
+        message = entry.getMessage()
+        self.assertEqual(entry.levelname, 'WARNING')
+        self.assertTrue(message.startswith("slow query "))
+        self.assertIn(" ms in query GetCompounds (Query.compounds): SELECT ", message)
+        self.assertIn(f"params=({self.project.id}, 40.0)", message)
+        self.assertRegex(message, r"\n    (SCAN|SEARCH) project_compound_compound")
+
+    def test_statement_is_logged_once_a_minute(self):
+        with self.assertLogs('project_compound.slowlog') as logs:
+            for mw in (40, 41):
+                schema.execute_sync(
+                    GET_COMPOUNDS, variable_values={'projectId': self.project.id, 'filter': {'mw': {'gte': mw}}}
+                )
+        self.assertEqual(len(logs.records), 2)
+
+    def test_plan_is_not_counted(self):
+        response = self.client.post(
+            '/graphql/',
+            json.dumps({'query': GET_COMPOUNDS, 'variables': {'projectId': self.project.id}}),
+            content_type='application/json',
+            headers={'X-GraphQL-Timing': '1'}
+        )
+        self.assertEqual(response.json()['extensions']['timing']['sqlQueries'], 2)
+
+    def test_only_graphql_statements_are_logged(self):
+        with self.assertNoLogs('project_compound.slowlog'):
+            Compound.objects.filter(project=self.project).count()
+
+    def test_rejected_operations_leave_no_trace(self):
+        unknown_persisted_query = {'extensions': {'persistedQuery': {'version': 1, 'sha256Hash': "0" * 64}}}
+        response = self.client.post('/graphql/', json.dumps(unknown_persisted_query), content_type='application/json')
+        self.assertEqual(response.json()['errors'][0]['message'], "PersistedQueryNotFound")
+        with self.assertNoLogs('project_compound.slowlog'):
+            Compound.objects.filter(project=self.project).count()
+
+    @override_settings(SLOW_QUERY_LOG={**LOG_ALL, 'THRESHOLD_MS': None})
+    def test_disabled(self):
+        with self.assertNoLogs('project_compound.slowlog'):
+            schema.execute_sync(GET_COMPOUNDS, variable_values={'projectId': self.project.id})
+
+
+class RateLimiterTest(SimpleTestCase):
+    def test_rate_and_suppressed_count(self):
+        limiter = slowlog.RateLimiter()
+        with mock.patch('project_compound.slowlog.time.monotonic', return_value=1000.0) as monotonic:
+            self.assertEqual(limiter.allow("SELECT 1", 2), 0)
+            self.assertEqual(limiter.allow("SELECT 2", 2), 0)
+            self.assertIsNone(limiter.allow("SELECT 3", 2))
+            self.assertIsNone(limiter.allow("SELECT 1", 2))
+
+            # Half a minute refills one entry; the logged statement is still recent.
+            monotonic.return_value = 1030.0
+            self.assertIsNone(limiter.allow("SELECT 1", 2))
+            self.assertEqual(limiter.allow("SELECT 3", 2), 3)
+            self.assertIsNone(limiter.allow("SELECT 4", 2))
@@ -0,0 +1,135 @@
+import asyncio
+import json
+
+from asgiref.testing import ApplicationCommunicator
+from channels.layers import get_channel_layer
+from django.test import TransactionTestCase
+from strawberry.channels import GraphQLWSConsumer
+from strawberry.subscriptions import GRAPHQL_TRANSPORT_WS_PROTOCOL
+from project_compound.changes import MAX_DELTA_COMPOUNDS, project_group
+from project_compound.models import Project
+from project_compound.schema import compound_schema as schema
+
+
+CHANGE_FIELDS = "kind projectId ids compounds { id smiles mw logD logP }"
+
+
+class WebsocketClient(ApplicationCommunicator):
+    """Minimal JSON websocket client for an ASGI consumer."""
+
+    def __init__(self, application, path: str, subprotocol: str):
+        super().__init__(application, {
+            'type': 'websocket',
+            'path': path,
+            'headers': [],
+            'subprotocols': [subprotocol],
+        })
+
+    async def connect(self) -> bool:
+        await self.send_input({'type': 'websocket.connect'})
+        return (await self.receive_output(timeout=2))['type'] == 'websocket.accept'
+
+    async def send_json_to(self, data):
+        await self.send_input({'type': 'websocket.receive', 'text': json.dumps(data)})
+
+    async def receive_json_from(self, timeout: float = 2):
+        return json.loads((await self.receive_output(timeout))['text'])
+
+    async def disconnect(self):
+        await self.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await self.wait(timeout=2)
+
+
+class CompoundSubscriptionTest(TransactionTestCase):
+    def setUp(self):
+        self.project = Project.objects.create(name="ALZ-2024", description="Beta-amyloid inhibitor")
+
+    async def connect(self):
+        self.communicator = WebsocketClient(
+            GraphQLWSConsumer.as_asgi(schema=schema), '/compounds/', GRAPHQL_TRANSPORT_WS_PROTOCOL
+        )
+        self.assertTrue(await self.communicator.connect())
+        await self.communicator.send_json_to({'type': 'connection_init'})
+        self.assertEqual((await self.communicator.receive_json_from())['type'], 'connection_ack')
+
+    async def subscribe(self, project_id):
+        await self.connect()
+        await self.communicator.send_json_to({
+            'id': '1',
+            'type': 'subscribe',
+            'payload': {'query': f'subscription {{ compoundChanges(projectId: "{project_id}") {{ {CHANGE_FIELDS} }} }}'},
+        })
+        # Wait until the subscription has joined the project's group.
+        groups = get_channel_layer().groups
+        for _ in range(100):
+            if groups.get(project_group(project_id)):
+                return
+            await asyncio.sleep(0.01)
+        self.fail("Subscription did not join the project group.")
+
+    async def next_change(self):
+        message = await self.communicator.receive_json_from()
+        self.assertEqual(message['type'], 'next')
+        return message['payload']['data']['compoundChanges']
+
+    async def execute(self, mutation):
+        result = await schema.execute(mutation)
+        self.assertIsNone(result.errors)
+        return result.data
+
+    async def test_pushes_inserts_and_deletes(self):
+        await self.subscribe(self.project.id)
+
+        data = await self.execute(
+            f'mutation {{ createCompound(projectId: "{self.project.id}", smiles: "CCO", mw: 46.07) {{ id }} }}'
+        )
+        compound_id = data['createCompound']['id']
+        self.assertEqual(await self.next_change(), {
+            'kind': 'INSERTED',
+            'projectId': str(self.project.id),
+            'ids': [compound_id],
+            'compounds': [{'id': compound_id, 'smiles': "CCO", 'mw': 46.07, 'logD': None, 'logP': None}],
+        })
+
+        data = await self.execute(f"""
+        mutation {{
+            bulkCreateCompounds(projectId: "{self.project.id}", compounds: [{{ smiles: "CCN" }}, {{ smiles: "CCC" }}]) {{ id }}
+        }}
+        """)
+        change = await self.next_change()
+        self.assertEqual(change['ids'], [c['id'] for c in data['bulkCreateCompounds']])
+        self.assertEqual([c['smiles'] for c in change['compounds']], ["CCN", "CCC"])
+
+        await self.execute(f'mutation {{ deleteCompound(id: "{compound_id}") {{ id }} }}')
+        change = await self.next_change()
+        self.assertEqual((change['kind'], change['ids'], change['compounds']), ('DELETED', [compound_id], []))
+        await self.communicator.disconnect()
+
+    async def test_large_inserts_ask_for_resync(self):
+        await self.subscribe(self.project.id)
+        compounds = ", ".join('{ smiles: "CCO" }' for _ in range(MAX_DELTA_COMPOUNDS + 1))
+        await self.execute(
+            f'mutation {{ bulkCreateCompounds(projectId: "{self.project.id}", compounds: [{compounds}]) {{ id }} }}'
+        )
+        change = await self.next_change()
+        self.assertEqual((change['kind'], change['ids']), ('RESYNC', []))
+        await self.communicator.disconnect()
+
+    async def test_changes_are_scoped_to_the_project(self):
+        other = await Project.objects.acreate(name="other", description="other")
+        await self.subscribe(self.project.id)
+        await self.execute(f'mutation {{ createCompound(projectId: "{other.id}", smiles: "CCO") {{ id }} }}')
+        self.assertTrue(await self.communicator.receive_nothing(timeout=0.2))
+        await self.communicator.disconnect()
+
+    async def test_unknown_project(self):
+        await self.connect()
+        await self.communicator.send_json_to({
+            'id': '1',
+            'type': 'subscribe',
+            'payload': {'query': 'subscription { compoundChanges(projectId: "0") { kind } }'},
+        })
+        message = await self.communicator.receive_json_from()
+        self.assertEqual(message['type'], 'next')
+        self.assertEqual(message['payload']['errors'][0]['message'], "Project matching query does not exist.")
+        await self.communicator.disconnect()
@@ -0,0 +1,96 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from project_compound.fingerprints import PATTERN_FP_BITS
+from project_compound.models import Project, Compound
+from project_compound.schema import compound_schema as schema
+from project_compound.search import pattern_indexes
+
+
+class SubstructureSearchTest(TestCase):
+    def setUp(self):
+        pattern_indexes.clear()
+        self.project = Project.objects.create(
+            name="ALZ-2024",
+            description="Beta-amyloid inhibitor for Alzheimer's disease"
+        )
+        self.aspirin = Compound.objects.create(project=self.project, smiles="CC(=O)OC1=CC=CC=C1C(=O)O")
+        self.ibuprofen = Compound.objects.create(project=self.project, smiles="CC(C)CC1=CC=C(C=C1)C(C)C(=O)O")
+        self.ethanol = Compound.objects.create(project=self.project, smiles="CCO")
+        self.methane = Compound.objects.create(project=self.project, smiles="C")
+        other = Project.objects.create(name="ONC-789", description="EGFR kinase inhibitor")
+        Compound.objects.create(project=other, smiles="c1ccccc1")
+
+    def search(self, query):
+        result = schema.execute_sync(f"""
+        query {{
+            substructureSearch(projectId: "{self.project.id}", query: "{query}") {{
+                candidates
+                screenedOut
+                compounds {{
+                    id
+                    project {{
+                        name
+                    }}
+                }}
+            }}
+        }}
+        """)
+        self.assertIsNone(result.errors)
+        return result.data['substructureSearch']
+
+    def test_fingerprints_are_stored_packed(self):
+        self.assertEqual(len(self.aspirin.fingerprint), PATTERN_FP_BITS // 8)
+        index = pattern_indexes.get(self.project.id)
+        self.assertEqual(index.column('fingerprint').shape, (4, PATTERN_FP_BITS // 64))
+        ids = index.column('id').tolist()
+        self.assertEqual(ids, sorted(ids))
+
+    def test_fingerprints_are_loaded_once(self):
+        self.search("c1ccccc1")
+        index = pattern_indexes.loaded(self.project.id)
+        with CaptureQueriesContext(connection) as queries:
+            data = self.search("c1ccccc1")
+        # Only the catch-up for rows inserted since the index was loaded.
+        reads = [query['sql'] for query in queries if '"fingerprint"' in query['sql']]
+        self.assertEqual(len(reads), 1)
+        self.assertIn(f'"id" > {self.methane.id}', reads[0])
+        self.assertEqual(data['candidates'], 4)
+        self.assertIs(pattern_indexes.loaded(self.project.id), index)
+
+        propanol = Compound.objects.create(project=self.project, smiles="CCCO")
+        self.assertIn(str(propanol.id), [c['id'] for c in self.search("CCCO")['compounds']])
+        self.assertEqual(index.size, 5)
+
+    def test_benzene_ring_matches_aromatic_compounds(self):
+        data = self.search("c1ccccc1")
+        self.assertEqual(
+            [c['id'] for c in data['compounds']],
+            [str(self.aspirin.id), str(self.ibuprofen.id)]
+        )
+        self.assertEqual(data['compounds'][0]['project']['name'], "ALZ-2024")
+        self.assertEqual(data['candidates'], 4)
+        self.assertEqual(data['screenedOut'], 2)
+
+    def test_carboxylic_acid_smarts(self):
+        data = self.search("C(=O)[OH]")
+        self.assertEqual(
+            [c['id'] for c in data['compounds']],
+            [str(self.aspirin.id), str(self.ibuprofen.id)]
+        )
+
+    def test_screen_never_drops_a_match(self):
+        data = self.search("C")
+        self.assertEqual(len(data['compounds']), 4)
+        self.assertEqual(data['screenedOut'], 0)
+
+    def test_invalid_query(self):
+        result = schema.execute_sync(
+            f'query {{ substructureSearch(projectId: "{self.project.id}", query: "C1((") {{ candidates }} }}'
+        )
+        self.assertEqual(result.errors[0].message, "Invalid substructure query.")
+
+    def test_unparseable_compounds_are_not_candidates(self):
+        Compound.objects.create(project=self.project, smiles="not-a-smiles")
+        self.assertIsNone(Compound.objects.get(smiles="not-a-smiles").fingerprint)
+        self.assertEqual(self.search("CC")['candidates'], 4)
@@ -0,0 +1,165 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+from project_compound.models import Project, Compound
+
+
+CSV_CONTENT = b"""Compound_Name,SMILES,MW,LogD,LogP
+Aspirin,CC(=O)OC1=CC=CC=C1C(=O)O,180.16, -0.73,1.19
+Caffeine,CN1C=NC2=C1C(=O)N(C(=O)N2C)C,194.19,-0.07,-0.07
+Missing,,10.0,1.0,1.0
+Ethanol,CCO,,n/a,-0.31
+"""
+
+SDF_CONTENT = b"""Aspirin
+  manual
+
+  0  0  0  0  0  0  0  0  0  0999 V2000
+M  END
+> <SMILES>
+CC(=O)OC1=CC=CC=C1C(=O)O
+
+> <MW>
+180.16
+
+$$$$
+NoSmiles
+
+  0  0  0  0  0  0  0  0  0  0999 V2000
+M  END
+> <MW>
+12.0
+
+$$$$
+"""
+
+
+class UploadCompoundsTest(TestCase):
+    def setUp(self):
+        self.project = Project.objects.create(
+            name="ALZ-2024",
+            description="Beta-amyloid inhibitor for Alzheimer's disease"
+        )
+        self.url = reverse('compounds upload', args=[self.project.id])
+
+    def test_upload_csv_multipart(self):
+        upload = SimpleUploadedFile("library.csv", CSV_CONTENT, content_type="text/csv")
+        response = self.client.post(self.url, {'file': upload})
+
+        self.assertEqual(response.status_code, 200)
+        summary = response.json()['files'][0]
+        self.assertEqual(summary['filename'], "library.csv")
+        self.assertEqual(summary['format'], "csv")
+        self.assertEqual(summary['rows'], 4)
+        self.assertEqual(summary['inserted'], 3)
+        self.assertEqual(summary['rejected'], 1)
+        self.assertEqual(summary['errors'], [{'line': 4, 'reason': "Missing SMILES."}])
+
+        ethanol = Compound.objects.get(project=self.project, smiles="CCO")
+        self.assertIsNone(ethanol.mw)
+        self.assertIsNone(ethanol.logD)
+        self.assertEqual(ethanol.logP, -0.31)
+        aspirin = Compound.objects.get(project=self.project, smiles="CC(=O)OC1=CC=CC=C1C(=O)O")
+        self.assertEqual(aspirin.logD, -0.73)
+
+    def test_upload_csv_without_header(self):
+        content = b"Aspirin,CC(=O)OC1=CC=CC=C1C(=O)O,180.16,-0.73,1.19\nEthanol,CCO,46.07,,-0.31\n"
+        upload = SimpleUploadedFile("library.csv", content, content_type="text/csv")
+        response = self.client.post(self.url, {'file': upload})
+
+        self.assertEqual(response.status_code, 200)
+        summary = response.json()['files'][0]
+        self.assertEqual(summary['rows'], 2)
+        self.assertEqual(summary['inserted'], 2)
+        aspirin = Compound.objects.get(project=self.project, smiles="CC(=O)OC1=CC=CC=C1C(=O)O")
+        self.assertEqual(aspirin.mw, 180.16)
+
+    def test_upload_multiple_files(self):
+        response = self.client.post(self.url, {
+            'file': [
+                SimpleUploadedFile("a.csv", CSV_CONTENT),
+                SimpleUploadedFile("b.smi", b"CCN ethylamine\n# comment\nCCC propane\n"),
+            ]
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['inserted'], 5)
+        self.assertEqual([f['format'] for f in response.json()['files']], ["csv", "smi"])
+        self.assertEqual(Compound.objects.filter(project=self.project).count(), 5)
+
+    def test_upload_raw_sdf_body(self):
+        response = self.client.post(
+            f"{self.url}?batchSize=1",
+            data=SDF_CONTENT,
+            content_type="chemical/x-mdl-sdfile"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        summary = response.json()['files'][0]
+        self.assertEqual(summary['format'], "sdf")
+        self.assertEqual(summary['inserted'], 1)
+        self.assertEqual(summary['errors'], [{'line': 13, 'reason': "Missing SMILES."}])
+        compound = Compound.objects.get(project=self.project)
+        self.assertEqual(compound.mw, 180.16)
+
+    def test_upload_raw_body_with_format_parameter(self):
+        response = self.client.post(
+            f"{self.url}?format=smi",
+            data=b"CCO\nCCN\n",
+            content_type="text/plain"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['inserted'], 2)
+
+    def test_reupload_reports_duplicates(self):
+        self.client.post(f"{self.url}?format=smi", data=b"CCO\nCCN\n", content_type="text/plain")
+        ethanol = Compound.objects.get(project=self.project, smiles="CCO")
+
+        response = self.client.post(
+            f"{self.url}?format=smi",
+            data=b"OCC ethanol\nCCC propane\nCCC propane again\n",
+            content_type="text/plain"
+        )
+        summary = response.json()['files'][0]
+        self.assertEqual(summary['inserted'], 3)
+        self.assertEqual(summary['duplicates'], 2)
+        self.assertEqual(summary['duplicateRows'][0], {'line': 1, 'compoundId': str(ethanol.id)})
+        self.assertEqual(summary['duplicateRows'][1]['line'], 3)
+
+    def test_reupload_skips_duplicates(self):
+        upload = SimpleUploadedFile("library.csv", CSV_CONTENT, content_type="text/csv")
+        self.client.post(self.url, {'file': upload})
+
+        upload = SimpleUploadedFile("library.csv", CSV_CONTENT, content_type="text/csv")
+        response = self.client.post(f"{self.url}?duplicates=skip&batchSize=2", {'file': upload})
+
+        self.assertEqual(response.status_code, 200)
+        summary = response.json()['files'][0]
+        self.assertEqual(summary['inserted'], 0)
+        self.assertEqual(summary['duplicates'], 3)
+        self.assertEqual(Compound.objects.filter(project=self.project).count(), 3)
+
+    def test_upload_with_invalid_duplicates_mode(self):
+        response = self.client.post(f"{self.url}?duplicates=merge", data=b"CCO\n", content_type="text/plain")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], "duplicates must be 'allow' or 'skip'.")
+
+    def test_upload_unsupported_format(self):
+        upload = SimpleUploadedFile("library.xlsx", b"PK")
+        response = self.client.post(self.url, {'file': upload})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['files'][0]['error'], "Unsupported file format.")
+        self.assertFalse(Compound.objects.exists())
+
+    def test_upload_with_invalid_project_id(self):
+        url = reverse('compounds upload', args=[99999])
+        response = self.client.post(url, data=b"CCO\n", content_type="chemical/x-daylight-smiles")
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()['error'], "Project matching query does not exist.")
+
+    def test_upload_requires_post(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 405)
@@ -0,0 +1,89 @@
+"""Per-operation accounting of resolver and SQL time.
+
+``record_query`` is installed on every database connection when it is created
+(see ``apps.py``) and charges each query to the ``Trace`` in ``current_trace``.
+A context variable rather than a ``connection.execute_wrapper`` block, because
+under the async view resolvers run their ORM work in worker threads, each with
+its own connection, and asgiref carries the context over to them. Statements
+slower than ``SLOW_QUERY_LOG['THRESHOLD_MS']`` also go to ``slowlog``.
+"""
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+
+from .slowlog import log_slow_query
+
+
+class Trace:
+    def __init__(self):
+        self.start = time.perf_counter()
+        # Operation type and name, e.g. 'query GetCompounds', once parsed.
+        self.operation = 'operation'
+        # 'Type.field' of the resolver started last. Lazy querysets run once
+        # the resolver has returned, while graphql-core completes its result.
+        self.field = None
+        self.sql_queries = 0
+        self.sql_seconds = 0.0
+        self.resolver_seconds = 0.0
+        # 'Type.field' -> [calls, seconds]
+        self.resolvers = {}
+
+    def record_resolver(self, field: str, seconds: float):
+        # A resolver returns before its children are resolved, so summing
+        # does not count nested time twice.
+        calls = self.resolvers.setdefault(field, [0, 0.0])
+        calls[0] += 1
+        calls[1] += seconds
+        self.resolver_seconds += seconds
+
+    def breakdown(self, seconds: float, execution_seconds: float) -> dict:
+        return {
+            'totalMs': milliseconds(seconds),
+            'executionMs': milliseconds(execution_seconds),
+            'resolversMs': milliseconds(self.resolver_seconds),
+            'sqlMs': milliseconds(self.sql_seconds),
+            'sqlQueries': self.sql_queries,
+            'resolvers': {
+                field: {'calls': calls, 'ms': milliseconds(seconds)}
+                for field, (calls, seconds) in sorted(self.resolvers.items(), key=lambda item: -item[1][1])
+            },
+        }
+
+
+current_trace: ContextVar[Trace | None] = ContextVar('current_trace', default=None)
+
+
+def milliseconds(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+def record_query(execute, sql, params, many, context):
+    trace = current_trace.get()
+    if trace is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        result = execute(sql, params, many, context)
+    finally:
+        seconds = time.perf_counter() - start
+        trace.sql_seconds += seconds
+        trace.sql_queries += 1
+
+    threshold = settings.SLOW_QUERY_LOG['THRESHOLD_MS']
+    if threshold is not None and seconds * 1000 >= threshold:
+        # The plan query is neither charged to the operation nor logged itself.
+        token = current_trace.set(None)
+        try:
+            log_slow_query(trace.operation, trace.field, seconds, sql, params, many, context['connection'])
+        finally:
+            current_trace.reset(token)
+    return result
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """``connection_created`` receiver adding ``record_query`` to the connection."""
+    # First, so it stays outermost and execute_wrapper() blocks, which pop
+    # the last wrapper, never remove it.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
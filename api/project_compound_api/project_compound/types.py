@@ -1,6 +1,42 @@
 import strawberry
+import strawberry_django
+from datetime import datetime
+from enum import Enum
+from typing import List
+from django.db.models import QuerySet
 from strawberry_django import type
-from .models import Project, Compound
+from .models import Project, Compound, ImportJob, ProjectPurge
+from .stats import get_project_stats
+
+
+@strawberry.type
+class PropertyStats:
+    count: int
+    min: float | None
+    max: float | None
+    mean: float | None
+
+
+def property_stats(project, name: str) -> PropertyStats:
+    stats = get_project_stats(project)
+    count = getattr(stats, f'{name}_count')
+    return PropertyStats(
+        count=count,
+        min=getattr(stats, f'{name}_min'),
+        max=getattr(stats, f'{name}_max'),
+        mean=getattr(stats, f'{name}_sum') / count if count else None
+    )
+
+
+def summary_stats(summary) -> PropertyStats:
+    """``PropertyStats`` from a ``stats.PropertySummary``."""
+    return PropertyStats(
+        count=summary.count,
+        min=summary.min,
+        max=summary.max,
+        mean=summary.total / summary.count if summary.count else None
+    )
+
 
 @type(Project)
 class ProjectType:
@@ -8,6 +44,22 @@ class ProjectType:
     name: str
     description: str
 
+    @strawberry_django.field(select_related=['stats'])
+    def compound_count(self) -> int:
+        return get_project_stats(self).compound_count
+
+    @strawberry_django.field(select_related=['stats'])
+    def mw_stats(self) -> PropertyStats:
+        return property_stats(self, 'mw')
+
+    @strawberry_django.field(select_related=['stats'])
+    def logD_stats(self) -> PropertyStats:
+        return property_stats(self, 'logD')
+
+    @strawberry_django.field(select_related=['stats'])
+    def logP_stats(self) -> PropertyStats:
+        return property_stats(self, 'logP')
+
 
 @type(Compound)
 class CompoundType:
@@ -16,4 +68,172 @@ class CompoundType:
     smiles: str
     mw: float | None
     logD: float | None
-    logP: float | None
\ No newline at end of file
+    logP: float | None
+
+
+@strawberry.type
+class DeleteCompoundsResult:
+    deleted_count: int
+    ids: List[strawberry.ID] = strawberry.field(description="Only collected when selected.")
+    compounds: List[CompoundType] = strawberry.field(
+        description="The deleted compounds; only collected, with their SMILES, when selected."
+    )
+
+
+@strawberry.type
+class UpdateCompoundsResult:
+    updated_count: int = strawberry.field(
+        description="Compounds with at least one property changed; unknown ids and unchanged rows are not counted."
+    )
+    ids: List[strawberry.ID] = strawberry.field(description="Ids of the changed compounds.")
+    queryset: strawberry.Private[QuerySet]
+
+    @strawberry_django.field(description="The updated compounds, read back when selected.")
+    def compounds(self) -> List[CompoundType]:
+        return self.queryset
+
+
+@strawberry.type
+class PageInfo:
+    has_next_page: bool
+    end_cursor: str | None
+
+
+@strawberry.type
+class CompoundEdge:
+    cursor: str
+    node: CompoundType
+
+
+@strawberry.type
+class CompoundConnection:
+    edges: List[CompoundEdge]
+    page_info: PageInfo
+    queryset: strawberry.Private[QuerySet]
+
+    @strawberry_django.field
+    def total_count(self) -> int:
+        return self.queryset.count()
+
+
+@strawberry.type
+class SubstructureSearchResult:
+    compounds: List[CompoundType]
+    candidates: int = strawberry.field(description="Compounds with a fingerprint in the project.")
+    screened_out: int = strawberry.field(
+        description="Candidates eliminated by the fingerprint screen without an atom-level match."
+    )
+
+
+@strawberry.type
+class SimilarCompound:
+    compound: CompoundType
+    similarity: float = strawberry.field(description="Tanimoto similarity of Morgan fingerprints.")
+
+
+@strawberry.type
+class CompoundProperties:
+    id: strawberry.ID
+    mw: float | None
+    logD: float | None
+    logP: float | None
+
+
+@strawberry.type
+class CompoundPropertySlice:
+    total_count: int
+    rows: List[CompoundProperties]
+    mw_stats: PropertyStats
+    logD_stats: PropertyStats
+    logP_stats: PropertyStats
+
+
+@strawberry.type
+class PropertyStoreUsage:
+    project_id: strawberry.ID
+    rows: int
+    bytes: int
+
+
+@strawberry.type
+class DuplicateRow:
+    line: int
+    compound_id: strawberry.ID
+
+
+@type(ImportJob)
+class ImportJobType:
+    id: strawberry.ID
+    project: ProjectType
+    status: str = strawberry_django.field(description="queued, running, succeeded or failed.")
+    total_rows: int
+    processed_rows: int = strawberry_django.field(description="Rows in committed batches.")
+    inserted: int
+    duplicates: int
+    elapsed_seconds: float
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+
+    @strawberry_django.field(description="The first duplicate rows found, by line in the input.")
+    def duplicate_rows(self) -> List[DuplicateRow]:
+        return [DuplicateRow(line=row['line'], compound_id=row['compoundId']) for row in self.duplicate_rows]
+
+    @strawberry_django.field
+    def error(self) -> str | None:
+        return self.error or None
+
+    @strawberry_django.field
+    def rows_per_second(self) -> float | None:
+        return self.processed_rows / self.elapsed_seconds if self.elapsed_seconds else None
+
+
+@strawberry.enum
+class CompoundChangeKind(Enum):
+    INSERTED = 'inserted'
+    DELETED = 'deleted'
+    RESYNC = 'resync'
+
+
+@strawberry.type
+class ChangedCompound:
+    id: strawberry.ID
+    smiles: str
+    mw: float | None
+    logD: float | None
+    logP: float | None
+
+
+@strawberry.type
+class CompoundChange:
+    kind: CompoundChangeKind = strawberry.field(
+        description="RESYNC means many compounds changed at once; refetch the project's compounds."
+    )
+    project_id: strawberry.ID
+    ids: List[strawberry.ID] = strawberry.field(description="Compounds inserted or deleted.")
+    compounds: List[ChangedCompound] = strawberry.field(description="The inserted compounds.")
+
+
+def compound_change(event: dict) -> CompoundChange:
+    """``CompoundChange`` from a ``changes`` event."""
+    return CompoundChange(
+        kind=CompoundChangeKind(event['kind']),
+        project_id=event['project_id'],
+        ids=event['ids'],
+        compounds=[
+            ChangedCompound(id=id, smiles=smiles, mw=mw, logD=logD, logP=logP)
+            for id, smiles, mw, logD, logP in event['compounds']
+        ]
+    )
+
+
+@type(ProjectPurge)
+class ProjectPurgeType:
+    project_id: strawberry.ID
+    name: str
+    total_compounds: int = strawberry_django.field(description="Compounds in the project when it was deleted.")
+    purged_compounds: int = strawberry_django.field(description="Compounds deleted in committed batches.")
+    deleted_at: datetime
+    finished_at: datetime | None = strawberry_django.field(
+        description="When the project row itself was removed; null while the purge runs."
+    )
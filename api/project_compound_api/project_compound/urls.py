@@ -1,11 +1,21 @@
+from django.conf import settings
 from django.urls import path
 from django.views.decorators.csrf import csrf_exempt
 
-from strawberry.django.views import GraphQLView
-from .schema_project import project_schema
-from .schema_compound import compound_schema
+from .schema import compound_schema, project_schema, schema
+from .views import AsyncGraphQLView, GraphQLView, export_compounds, metrics_view, upload_compounds
+
+
+def graphql_view(schema):
+    return csrf_exempt((AsyncGraphQLView if settings.GRAPHQL_ASYNC else GraphQLView).as_view(schema=schema))
+
 
 urlpatterns = [
-    path('projects/', csrf_exempt(GraphQLView.as_view(schema=project_schema)), name='projects graphql api'),
-    path('compounds/', csrf_exempt(GraphQLView.as_view(schema=compound_schema)), name='compounds graphql api'),
+    path('graphql/', graphql_view(schema), name='graphql api'),
+    # Aliases of graphql/ from when projects and compounds had separate schemas.
+    path('projects/', graphql_view(project_schema), name='projects graphql api'),
+    path('compounds/', graphql_view(compound_schema), name='compounds graphql api'),
+    path('compounds/upload/<int:project_id>/', upload_compounds, name='compounds upload'),
+    path('compounds/export/<int:project_id>/', export_compounds, name='compounds export'),
+    path('metrics', metrics_view, name='metrics'),
 ]
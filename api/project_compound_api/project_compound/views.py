@@ -1 +1,199 @@
-from django.shortcuts import render
\ No newline at end of file
+import codecs
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from strawberry.django.views import AsyncGraphQLView as BaseAsyncGraphQLView, GraphQLView as BaseGraphQLView
+
+from . import metrics
+from .export import EXPORTERS
+from .ingest import get_batch_size, stream_insert_compounds
+from .loaders import RequestContext
+from .models import Project
+from .parsers import PARSERS, RejectedRow, detect_format
+
+MAX_REPORTED_ERRORS = 100
+
+
+def ingest_file(
+    project,
+    lines,
+    file_format: str,
+    filename: str | None,
+    batch_size: int,
+    skip_duplicates: bool = False,
+    compute_descriptors: bool = False
+) -> dict:
+    """Stream one uploaded file into the project and return its ingest summary."""
+    summary = {
+        'filename': filename,
+        'format': file_format,
+        'rows': 0,
+        'inserted': 0,
+        'rejected': 0,
+        'duplicates': 0,
+        'errors': [],
+        'duplicateRows': [],
+    }
+
+    def record_duplicate(duplicate):
+        summary['duplicates'] += 1
+        if len(summary['duplicateRows']) < MAX_REPORTED_ERRORS:
+            summary['duplicateRows'].append({
+                'line': duplicate.row.line,
+                'compoundId': str(duplicate.compound_id),
+            })
+
+    def accepted_rows():
+        for record in PARSERS[file_format](codecs.iterdecode(lines, 'utf-8-sig')):
+            summary['rows'] += 1
+            if isinstance(record, RejectedRow):
+                summary['rejected'] += 1
+                if len(summary['errors']) < MAX_REPORTED_ERRORS:
+                    summary['errors'].append({'line': record.line, 'reason': record.reason})
+                continue
+            yield record
+
+    start = time.perf_counter()
+    try:
+        summary['inserted'] = stream_insert_compounds(
+            project, accepted_rows(), batch_size, skip_duplicates, record_duplicate, compute_descriptors
+        )
+    except UnicodeDecodeError:
+        summary['error'] = "File is not valid UTF-8 text."
+    summary['seconds'] = round(time.perf_counter() - start, 3)
+    return summary
+
+
+@csrf_exempt
+@require_POST
+def upload_compounds(request, project_id):
+    """Ingest compound library files into a project.
+
+    Accepts either ``multipart/form-data`` with one or more files (format taken
+    from the file extension) or a raw CSV/SMILES/SDF request body (format taken
+    from the content type or the ``format`` query parameter). Files are parsed
+    line by line and inserted in batches, so memory use does not grow with the
+    upload size. Rows whose structure is already in the project are reported
+    per file; ``?duplicates=skip`` leaves them out instead of inserting them.
+    ``?descriptors=compute`` fills blank ``mw``/``logP`` values from the SMILES.
+    """
+    try:
+        project = Project.objects.get(id=project_id)
+    except Project.DoesNotExist:
+        return JsonResponse({'error': "Project matching query does not exist."}, status=404)
+
+    try:
+        batch_size = get_batch_size(
+            int(request.GET['batchSize']) if 'batchSize' in request.GET else None
+        )
+    except ValueError:
+        return JsonResponse({'error': "Batch size must be a positive integer."}, status=400)
+
+    duplicates = request.GET.get('duplicates', 'allow')
+    if duplicates not in ('allow', 'skip'):
+        return JsonResponse({'error': "duplicates must be 'allow' or 'skip'."}, status=400)
+
+    descriptors = request.GET.get('descriptors', 'keep')
+    if descriptors not in ('keep', 'compute'):
+        return JsonResponse({'error': "descriptors must be 'keep' or 'compute'."}, status=400)
+
+    if request.content_type == 'multipart/form-data':
+        uploads = [
+            (upload.name, upload.content_type, upload)
+            for key in request.FILES
+            for upload in request.FILES.getlist(key)
+        ]
+    else:
+        uploads = [(request.GET.get('filename'), request.content_type, request)]
+
+    files = []
+    for filename, content_type, stream in uploads:
+        file_format = request.GET.get('format') or detect_format(filename, content_type)
+        if file_format not in PARSERS:
+            files.append({'filename': filename, 'error': "Unsupported file format."})
+            continue
+        files.append(ingest_file(
+            project,
+            stream,
+            file_format,
+            filename,
+            batch_size,
+            skip_duplicates=duplicates == 'skip',
+            compute_descriptors=descriptors == 'compute'
+        ))
+
+    if not files:
+        return JsonResponse({'error': "No files uploaded."}, status=400)
+
+    return JsonResponse({
+        'projectId': str(project.id),
+        'inserted': sum(f.get('inserted', 0) for f in files),
+        'files': files,
+    })
+
+
+async def iterate_in_sync_thread(iterator):
+    """Async iterator over a sync one, advanced in the request's sync thread
+    (where its database cursor lives). Under ASGI, Django would otherwise
+    buffer a sync streaming body in full before sending it."""
+    step = sync_to_async(next)
+    done = object()
+    while (chunk := await step(iterator, done)) is not done:
+        yield chunk
+
+
+@require_GET
+def export_compounds(request, project_id):
+    """Stream every compound of a project in id order.
+
+    ``?format=`` selects ``csv`` (the upload template layout, the default),
+    ``ndjson``, ``arrow`` (an Arrow IPC stream) or ``parquet``. Rows are read
+    from a database cursor and encoded in chunks, so memory use does not grow
+    with the project size.
+    """
+    try:
+        project = Project.objects.get(id=project_id)
+    except Project.DoesNotExist:
+        return JsonResponse({'error': "Project matching query does not exist."}, status=404)
+
+    file_format = request.GET.get('format', 'csv')
+    if file_format not in EXPORTERS:
+        return JsonResponse({'error': f"format must be one of {', '.join(EXPORTERS)}."}, status=400)
+
+    exporter, content_type, extension = EXPORTERS[file_format]
+    content = exporter(project)
+    if isinstance(request, ASGIRequest):
+        content = iterate_in_sync_thread(content)
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="project-{project.id}-compounds.{extension}"'
+    return response
+
+
+class ResponseSizeMixin:
+    """Records the size of GraphQL response bodies in ``metrics.RESPONSE_SIZE``."""
+
+    def encode_json(self, data) -> str:
+        body = super().encode_json(data)
+        # json.dumps escapes non-ASCII, so characters are bytes.
+        metrics.RESPONSE_SIZE.observe(len(body))
+        return body
+
+
+class GraphQLView(ResponseSizeMixin, BaseGraphQLView):
+    def get_context(self, request, response) -> RequestContext:
+        return RequestContext(request=request, response=response)
+
+
+class AsyncGraphQLView(ResponseSizeMixin, BaseAsyncGraphQLView):
+    async def get_context(self, request, response) -> RequestContext:
+        return RequestContext(request=request, response=response)
+
+
+@require_GET
+def metrics_view(request):
+    """The process's GraphQL metrics in the Prometheus text format."""
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
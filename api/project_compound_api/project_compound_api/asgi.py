@@ -3,6 +3,11 @@ ASGI config for project_compound_api project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Run it with an ASGI server, e.g. ``uvicorn project_compound_api.asgi:application``.
+The GraphQL endpoints are then served by strawberry's AsyncGraphQLView, and
+``graphql/`` (and its ``compounds/`` alias) also accepts GraphQL subscriptions
+over WebSocket.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 """
@@ -12,5 +17,24 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project_compound_api.settings')
+os.environ.setdefault('GRAPHQL_ASYNC', '1')
+
+django_application = get_asgi_application()
+
+# Imported after the app registry is ready.
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from channels.security.websocket import AllowedHostsOriginValidator  # noqa: E402
+from django.urls import path  # noqa: E402
+from strawberry.channels import GraphQLWSConsumer  # noqa: E402
+
+from project_compound.schema import schema  # noqa: E402
+
+graphql_ws_consumer = GraphQLWSConsumer.as_asgi(schema=schema)
 
-application = get_asgi_application()
+application = ProtocolTypeRouter({
+    'http': django_application,
+    'websocket': AllowedHostsOriginValidator(URLRouter([
+        path('graphql/', graphql_ws_consumer),
+        path('compounds/', graphql_ws_consumer),
+    ])),
+})
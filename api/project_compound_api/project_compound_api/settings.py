@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -76,12 +79,61 @@ WSGI_APPLICATION = 'project_compound_api.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DATABASE_ENGINE picks the profile:
+#
+# 'sqlite' (default): WAL journal so readers do not block the writer,
+# synchronous=NORMAL (safe with WAL), a 64 MiB page cache, a busy timeout so
+# writers wait for the lock instead of failing, and IMMEDIATE transactions so
+# a write transaction takes the lock up front rather than failing to upgrade.
+#
+# 'postgres': psycopg 3 with a per-process connection pool, or persistent
+# connections (DATABASE_CONN_MAX_AGE) when POSTGRES_POOL=0. Large compound
+# inserts use COPY (see ingest.insert_batch).
+DATABASE_ENGINE = os.environ.get('DATABASE_ENGINE', 'sqlite')
+
+if DATABASE_ENGINE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'compounds'),
+            'USER': os.environ.get('POSTGRES_USER', 'compounds'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            'OPTIONS': {},
+        }
     }
-}
+    if os.environ.get('POSTGRES_POOL', '1') == '1':
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('POSTGRES_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('POSTGRES_POOL_MAX_SIZE', 10)),
+            'timeout': int(os.environ.get('POSTGRES_POOL_TIMEOUT', 10)),
+        }
+    else:
+        DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('DATABASE_CONN_MAX_AGE', 60))
+        DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+elif DATABASE_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': int(os.environ.get('DATABASE_CONN_MAX_AGE', 0)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 20)),
+                'transaction_mode': 'IMMEDIATE',
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    'PRAGMA cache_size=-65536;'
+                    'PRAGMA temp_store=MEMORY;'
+                    'PRAGMA mmap_size=268435456'
+                ),
+            },
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"DATABASE_ENGINE must be 'sqlite' or 'postgres', not {DATABASE_ENGINE!r}.")
 
 
 # Password validation
@@ -126,3 +178,102 @@ CORS_ALLOWED_ORIGINS = [
 ]
 
 CORS_ALLOW_CREDENTIALS = True
+
+# Serve the GraphQL endpoints with strawberry's AsyncGraphQLView. asgi.py turns
+# this on; resolvers then run their ORM work in per-request worker threads so a
+# slow mutation does not block the event loop.
+GRAPHQL_ASYNC = os.environ.get('GRAPHQL_ASYNC', '') == '1'
+
+# Most operations accepted in one batched (JSON array) GraphQL POST. They share
+# the request's loaders and one GRAPHQL_LIMITS['MAX_COST'] budget.
+GRAPHQL_BATCH_MAX_OPERATIONS = int(os.environ.get('GRAPHQL_BATCH_MAX_OPERATIONS', 10))
+
+# Django's cache. Point CACHE_REDIS_URL at a Redis (install the 'broker' extra)
+# to share it between the server, the import worker and management commands.
+if os.environ.get('CACHE_REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['CACHE_REDIS_URL'],
+        },
+    }
+
+# Versioned GraphQL result cache for the projects/compounds reads. 'local' keeps
+# results in an in-process LRU, 'django' stores them in the CACHES alias; 'off'
+# disables it. Either way the versions live in that alias, and writes from
+# other processes (import worker, compute_descriptors) only invalidate entries
+# when it is shared: set CACHE_REDIS_URL, and RESULT_CACHE in every process.
+# Versions are bumped by the application's write paths, so only enable it when
+# all writes go through them.
+RESULT_CACHE = {
+    'BACKEND': os.environ.get('RESULT_CACHE', 'off'),
+    'MAXSIZE': int(os.environ.get('RESULT_CACHE_MAXSIZE', 1024)),
+    'ALIAS': 'default',
+    'TIMEOUT': None,
+}
+
+# Per-project in-memory columns of mw/logD/logP answering compoundProperties
+# with NumPy instead of SQL. Each loaded project costs about 35 bytes per
+# compound; at most MAX_PROJECTS stay loaded per process.
+PROPERTY_STORE = {
+    'ENABLED': os.environ.get('PROPERTY_STORE', '') == '1',
+    'MAX_PROJECTS': int(os.environ.get('PROPERTY_STORE_MAX_PROJECTS', 16)),
+}
+
+# Channel layer carrying compound change events to GraphQL subscriptions. The
+# in-memory layer only reaches subscribers in the publishing process; with
+# several ASGI workers, or writes from WSGI and the import worker, point
+# CHANNEL_REDIS_URL at a local Redis (install the 'broker' extra).
+if os.environ.get('CHANNEL_REDIS_URL'):
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {'hosts': [os.environ['CHANNEL_REDIS_URL']]},
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'},
+    }
+
+# Worker processes for descriptor calculation (mw/logP from SMILES); None
+# uses one per core.
+DESCRIPTOR_WORKERS = int(os.environ['DESCRIPTOR_WORKERS']) if 'DESCRIPTOR_WORKERS' in os.environ else None
+
+# Limits on the estimated cost of a GraphQL operation, checked before it runs
+# (see extensions.QueryCost and COMPOUND_FIELD_COSTS in schema_compound.py).
+# With GRAPHQL_LIMITS_ENFORCE=0 over-budget operations are logged but served.
+GRAPHQL_LIMITS = {
+    'MAX_COST': int(os.environ.get('GRAPHQL_MAX_COST', 10000)),
+    'MAX_DEPTH': int(os.environ.get('GRAPHQL_MAX_DEPTH', 8)),
+    'ENFORCE': os.environ.get('GRAPHQL_LIMITS_ENFORCE', '1') == '1',
+}
+
+# SQL statements of GraphQL operations slower than THRESHOLD_MS are logged by
+# project_compound.slowlog with their parameters, the operation and resolver,
+# and the query plan (EXPLAIN). At most MAX_PER_MINUTE entries a minute, each
+# statement at most once a minute. SLOW_QUERY_MS=off disables the log.
+SLOW_QUERY_LOG = {
+    'THRESHOLD_MS': (
+        None if os.environ.get('SLOW_QUERY_MS') == 'off' else float(os.environ.get('SLOW_QUERY_MS', 200))
+    ),
+    'EXPLAIN': os.environ.get('SLOW_QUERY_EXPLAIN', '1') == '1',
+    'MAX_PER_MINUTE': int(os.environ.get('SLOW_QUERY_LOG_MAX_PER_MINUTE', 10)),
+}
+
+# Console logging for the app. Per-operation GraphQL costs are logged at INFO,
+# over-budget operations and slow queries at WARNING; set LOG_LEVEL=INFO to
+# collect costs.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'project_compound': {
+            'handlers': ['console'],
+            'level': os.environ.get('LOG_LEVEL', 'WARNING'),
+        },
+    },
+}
@@ -1,12 +1,5 @@
-import { ApolloClient, InMemoryCache, ApolloLink } from '@apollo/client'
-import { HttpLink } from '@apollo/client/link/http'
-
-const compoundOperations = [
-    'GetCompounds',
-    'CreateCompound',
-    'DeleteCompound',
-    'BulkCreateCompounds',
-]
+import { ApolloClient, InMemoryCache } from '@apollo/client'
+import { BatchHttpLink } from '@apollo/client/link/batch-http'
 
 const getBaseUrl = () => {
     const protocol = window.location.protocol
@@ -17,28 +10,16 @@ const getBaseUrl = () => {
 
 const baseUrl = getBaseUrl()
 
-const projectsHttpLink = new HttpLink({
-    uri: `${baseUrl}/projects/`,
-})
-
-const compoundsHttpLink = new HttpLink({
-    uri: `${baseUrl}/compounds/`,
-})
-
-const routingLink = new ApolloLink((operation, forward) => {
-    const { operationName } = operation
-
-    const isCompoundOperation = compoundOperations.some(op =>
-        operationName?.includes(op)
-    )
-
-    return (isCompoundOperation ? compoundsHttpLink : projectsHttpLink).request(
-        operation,
-        forward
-    )
+// Operations issued together (e.g. a project page's project and compound
+// queries) go out as one batched POST; batchMax matches the server's
+// GRAPHQL_BATCH_MAX_OPERATIONS default.
+const batchHttpLink = new BatchHttpLink({
+    uri: `${baseUrl}/graphql/`,
+    batchMax: 10,
+    batchInterval: 10,
 })
 
 export const apolloClient = new ApolloClient({
-    link: routingLink,
+    link: batchHttpLink,
     cache: new InMemoryCache(),
 })